@@ -1,7 +1,6 @@
 from donbot import Donbot
+from donbot.watcher import ThreadWatcher
 from math import ceil
-import schedule
-import time
 
 content = """ beep boop \n 
 This space is reserved for a vote count! \n 
@@ -15,27 +14,27 @@ class PageTopper(Donbot):
         self.frequency = frequency  # polling rate
         self.currPage = currPage    # most recent page that was page topped
         self.postPerPage = 25
+        # probes only the trailing page, polling less often while the thread is quiet
+        self.watcher = ThreadWatcher(
+            self, thread, self.pagetop, min_interval=frequency, max_interval=frequency * 4
+        )
 
 
-    def pagetop(self):
+    def pagetop(self, newPosts):
         # get the current number of posts
         # figure out what page the NEXT post would be on
         # if it's on a different page, reserve the post
 
         print('pagetop called')
-        currPosts = self.getNumberOfPosts()
-        pageOfNextPost =  ceil((currPosts + 1) / 25)
+        currPosts = newPosts[-1].number + 1
+        pageOfNextPost =  ceil((currPosts + 1) / self.postPerPage)
         print(self.currPage)
         print(pageOfNextPost)
 
         if pageOfNextPost > self.currPage:
-            self.makePost(content)
+            self.make_post(content)
             self.currPage = pageOfNextPost
 
 
     def run(self):
-        schedule.every(self.frequency).seconds.do(self.pagetop)
-
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
\ No newline at end of file
+        self.watcher.run()
@@ -0,0 +1,112 @@
+"""Measures how many posts per second `operations.get_posts` parses.
+
+Compares the compiled single-pass parser with the per-post XPath queries it
+replaced, on saved thread pages if any are given and otherwise on a synthetic
+page in the forum's markup. Only parsing is timed, not building the DOM.
+
+    python dev/parser_benchmark.py [page.html ...] [--rounds N] [--processes N]
+
+With --processes, also measures `bulk.parse_pages` over copies of the pages,
+which includes building the DOM in each process.
+"""
+from donbot.bulk import parse_pages
+from donbot.operations import Post, get_posts, string_to_html
+from lxml import html
+import argparse
+import time
+
+POST = """<div class="postbody"><div id="post_content{id}">
+<h3 class="first"><a href="#p{id}">Re: Benchmark thread</a></h3>
+<p class="author modified"><a href="./viewtopic.php?p={id}#p{id}">Post</a>
+<span class="post-number-bolded">#{number}</span> by <strong><a href="./memberlist.php?mode=viewprofile&amp;u={user_id}" class="username">user{user_id}</a></strong> » Sat Aug 22, 2020 1:00 pm</p>
+<div class="content"><blockquote><div><cite>someone wrote:</cite>a quoted <a href="https://example.com">link</a></div></blockquote>{body}</div>
+</div></div>
+"""
+
+PAGE = """<html><head><title>Benchmark thread</title></head><body>
+<div class="pagination">{count} posts</div>
+{posts}
+</body></html>"""
+
+
+def make_page(posts_per_page: int = 200) -> str:
+    """Returns a synthetic thread page with a few hundred words in each post."""
+    body = "Some <b>bold</b> words and <a href='https://example.com'>a link</a>.<br>" * 20
+    posts = "".join(
+        POST.format(id=1000 + n, number=n, user_id=n % 12, body=body)
+        for n in range(posts_per_page)
+    )
+    return PAGE.format(count=posts_per_page, posts=posts)
+
+
+def xpath_get_posts(thread_page_html, page_url: str = "") -> list[Post]:
+    """The parser as it was: six uncompiled XPath queries per post."""
+    posts = []
+    for post_html in thread_page_html.xpath("//div[@class='postbody']"):
+        post = {}
+        post["number"] = int(post_html.xpath(".//span[contains(@class, 'post-number-bolded')]//text()")[0][1:])
+        post["id"] = post_html.xpath(".//a/@href")[0]
+        post["id"] = post["id"][post["id"].rfind("#") + 2 :]
+        post["user"] = post_html.xpath(".//a[@class='username' or @class='username-coloured']/text()")[0]
+        post["user_id"] = post_html.xpath(".//a[@class='username' or @class='username-coloured']/@href")[0]
+        post["user_id"] = post["user_id"][post["user_id"].rfind("=") + 1 :]
+        post["content"] = html.tostring(post_html.xpath(".//div[@class='content']")[0])
+        post["content"] = post["content"].decode("UTF-8").strip()[21:-6]
+        post["time"] = post_html.xpath(".//p[@class='author modified']/text()")[-1]
+        post["time"] = post["time"][post["time"].find("» ") + 2 :].strip()
+        post["page"] = page_url
+        post["forum"] = page_url[page_url.find("f=") + 2 : page_url.find("&t=")]
+        post["thread"] = page_url[page_url.find("&t=") + 3 : page_url.find("&start")]
+        posts.append(Post(**post))
+    return posts
+
+
+def posts_per_second(parse, pages: list, rounds: int) -> float:
+    """Returns the posts parsed per second by the best of several rounds over the pages."""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        count = sum(len(parse(page)) for page in pages)
+        best = min(best, time.perf_counter() - started)
+    return count / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="saved thread pages to parse")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.pages:
+        bodies = []
+        for path in args.pages:
+            with open(path, "rb") as file:
+                bodies.append(file.read())
+    else:
+        bodies = [make_page().encode("utf-8")]
+    pages = [string_to_html(body) for body in bodies]
+
+    assert xpath_get_posts(pages[0]) == get_posts(pages[0]), "parsers disagree"
+    before = posts_per_second(xpath_get_posts, pages, args.rounds)
+    after = posts_per_second(get_posts, pages, args.rounds)
+    print(f"before: {before:10,.0f} posts/s")
+    print(f"after:  {after:10,.0f} posts/s  ({after / before:.1f}x)")
+
+    # metadata scans that never read content, and plain text extraction
+    lazy = posts_per_second(lambda page: get_posts(page, lazy=True), pages, args.rounds)
+    text = posts_per_second(lambda page: get_posts(page, text_only=True), pages, args.rounds)
+    print(f"lazy:   {lazy:10,.0f} posts/s  ({lazy / before:.1f}x, content unread)")
+    print(f"text:   {text:10,.0f} posts/s  ({text / before:.1f}x)")
+
+    if args.processes:
+        archive = [("", body) for body in bodies] * max(1, 100 // len(bodies))
+        for processes in sorted({1, args.processes}):
+            started = time.perf_counter()
+            count = sum(1 for _ in parse_pages(archive, max_workers=processes))
+            rate = count / (time.perf_counter() - started)
+            print(f"bulk, {processes} process(es): {rate:10,.0f} posts/s, with DOM building")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
 __all__ = ['Donbot']
 
-from .donbot import Donbot
\ No newline at end of file
+from .donbot import Donbot
+
+try:
+    from .async_donbot import AsyncDonbot
+    __all__.append('AsyncDonbot')
+except ImportError:  # aiohttp is only installed with the "async" extra
+    pass
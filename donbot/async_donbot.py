@@ -0,0 +1,471 @@
+from typing import Iterable, Optional
+from .donbot import FORUM_URL
+from .operations import (
+    make_login_form,
+    count_posts,
+    get_user_id,
+    get_activity_overview,
+    get_posts,
+    make_submit_post_form,
+    get_edit_post_form,
+    get_send_pm_form,
+    get_thread_page_urls,
+    get_page_start,
+    plan_thread_page_urls,
+    set_posts_per_page,
+    string_to_html,
+    Post
+)
+from .concurrency import AdaptiveLimiter, get_default_limiter
+from .scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_READ,
+    PRIORITY_WRITE,
+    RequestScheduler,
+    get_default_scheduler,
+)
+from .transport import RETRY_STATUSES, jittered_backoff
+from lxml.html import HtmlElement
+import aiohttp
+import asyncio
+import time
+
+__all__ = ["AsyncDonbot"]
+
+
+class AsyncDonbot:
+    """Asyncio-native bot for interacting with the MafiaScum forum.
+
+    Mirrors the `Donbot` API with coroutine methods. All requests share one pooled
+    `aiohttp.ClientSession`, which can also be shared between several bots.
+    Requests wait on the same scheduler and limiter as `Donbot` (by default the
+    ones shared by every bot in the process), so async and sync bots in one
+    process share their rate limits.
+
+    Attributes:
+        postdelay: Minimum time between POST requests (seconds). Prevents rate limiting.
+        thread: Optional thread associated with the AsyncDonbot instance.
+        username: Username associated with the AsyncDonbot instance.
+        max_workers: Default number of thread pages fetched concurrently by multi-page reads.
+        forum_url: Base URL of the forum the instance talks to.
+        session: ClientSession for making requests; created on first use if not given.
+        scheduler: Rate limiter every request of the instance waits on.
+        limiter: Adaptive cap on the instance's requests in flight at once.
+        posts_per_page: Number of posts requested per thread page.
+        timeout: Timeout applied to each request.
+        retries: Number of times a failing request is retried.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        thread: Optional[str] = None,
+        post_delay: float = 3.0,
+        max_workers: int = 4,
+        forum_url: str = FORUM_URL,
+        session: Optional[aiohttp.ClientSession] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        posts_per_page: int = 25,
+        timeout: Optional[tuple[float, float]] = (5.0, 30.0),
+        retries: int = 3,
+    ):
+        """Initializes the instance; call `login` or use `async with` to authenticate.
+
+        Args:
+            username: The username associated with the AsyncDonbot instance.
+            password: The password associated with the AsyncDonbot instance.
+            thread: The thread associated with the AsyncDonbot instance, if specified.
+            post_delay: Minimum time between POST requests to the forum (seconds). The
+                scheduler holds every bot sharing it to the longest delay any of them
+                was given, and never to less than its own default. Prevents rate limiting.
+            max_workers: Default number of thread pages fetched concurrently by multi-page
+                reads; the limiter may allow fewer at a time.
+            forum_url: Base URL of the forum; defaults to mafiascum.net.
+            session: A ClientSession to share with other bots; one is created if not given.
+            scheduler: Rate limiter for the instance's requests; defaults to the one
+                shared by every Donbot and AsyncDonbot in the process.
+            limiter: Adaptive cap on requests in flight at once; defaults to the one
+                shared by every Donbot and AsyncDonbot in the process.
+            posts_per_page: Number of posts requested per thread page; larger pages mean
+                fewer requests for bulk reads. The site's default is 25.
+            timeout: Seconds to wait for a connection to the forum and for each read
+                from it before the request fails, or None to wait indefinitely.
+            retries: Number of times a request failing to connect, or a GET failing
+                with a 429 or 5xx status or a read error, is retried with jittered
+                exponential backoff before giving up.
+        """
+        self.postdelay = post_delay
+        self.thread = thread or ""
+        self.username = username
+        self.max_workers = max_workers
+        self.forum_url = forum_url.rstrip("/")
+        self.session = session
+        self.scheduler = scheduler or get_default_scheduler()
+        self.limiter = limiter or get_default_limiter()
+        self.posts_per_page = posts_per_page
+        self.timeout = timeout
+        self.retries = retries
+        self.scheduler.require_interval(self.forum_url, "POST", post_delay)
+        if timeout is None:
+            self._client_timeout = aiohttp.ClientTimeout(total=None)
+        else:
+            self._client_timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=timeout[0], sock_read=timeout[1]
+            )
+        self._password = password
+        self._owns_session = session is None
+
+    async def __aenter__(self) -> "AsyncDonbot":
+        await self.login(self.username, self._password)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Closes the instance's ClientSession, unless it was passed in by the caller."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=max(self.limiter.max_limit, self.max_workers))
+            # unsafe=True keeps cookies from forums addressed by IP, such as local mirrors
+            cookie_jar = aiohttp.CookieJar(unsafe=True)
+            self.session = aiohttp.ClientSession(
+                connector=connector, cookie_jar=cookie_jar, timeout=self._client_timeout
+            )
+        return self.session
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        priority: int = PRIORITY_READ,
+        post_delay: Optional[float] = None,
+        **kwargs,
+    ) -> bytes:
+        """Returns the body of a successful response, retrying transient failures.
+
+        Each attempt waits its turn on the scheduler and the limiter, whose
+        blocking waits run in worker threads so the event loop is never held up.
+        Connection errors are retried for any request; read errors and
+        `RETRY_STATUSES` only for GETs, honoring any Retry-After header, so a
+        POST is never sent twice. An error status left once the retries are used
+        up raises `aiohttp.ClientResponseError`.
+
+        Args:
+            method: "GET" or "POST".
+            url: URL to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+            post_delay: If specified, also waits this long after the forum's previous
+                request of the same kind, for this call only.
+            kwargs: Passed on to `aiohttp.ClientSession.request`.
+        """
+        session = self._get_session()
+        attempt = 0
+        while True:
+            await asyncio.to_thread(self.scheduler.acquire, url, method, priority, post_delay)
+            started = await asyncio.to_thread(self.limiter.acquire, priority)
+            ok, latency, retry_in = False, None, None
+            try:
+                sent_at = time.perf_counter()
+                async with session.request(
+                    method, url, timeout=self._client_timeout, **kwargs
+                ) as response:
+                    body = await response.read()
+                ok = response.status != 429 and response.status < 500
+                latency = time.perf_counter() - sent_at
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                # only a request that never reached the forum is safe to send again
+                reached_forum = not isinstance(error, aiohttp.ClientConnectorError)
+                if attempt >= self.retries or (reached_forum and method != "GET"):
+                    raise
+                retry_in = jittered_backoff(attempt)
+            finally:
+                self.limiter.release(started, ok, latency)
+
+            if retry_in is None:
+                if response.status not in RETRY_STATUSES or method != "GET" or (
+                    attempt >= self.retries
+                ):
+                    response.raise_for_status()
+                    return body
+                retry_after = response.headers.get("Retry-After", "")
+                retry_in = float(retry_after) if retry_after.isdigit() else jittered_backoff(attempt)
+            attempt += 1
+            await asyncio.sleep(retry_in)
+
+    async def _get_html(self, url: str, priority: int = PRIORITY_READ) -> HtmlElement:
+        """Returns the parsed HTML of a page.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+        """
+        return string_to_html(await self._request("GET", url, priority))
+
+    async def _post(self, url: str, data: dict, post_delay: Optional[float] = None, **kwargs):
+        """Submits a form once the scheduler's POST budget for the forum allows it.
+
+        Args:
+            url: URL to submit the form to.
+            data: The form fields.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+            kwargs: Passed on to `aiohttp.ClientSession.request`.
+        """
+        data = {name: str(value) for name, value in data.items()}
+        await self._request("POST", url, PRIORITY_WRITE, post_delay, data=data, **kwargs)
+
+    async def login(self, username: str, password: str, post_delay: Optional[float] = None):
+        """Authenticates the AsyncDonbot instance with the specified username and password.
+
+        Args:
+            username: The username to authenticate with.
+            password: The password to authenticate with.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        start_url = f"{self.forum_url}/index.php"
+        login_url = f"{self.forum_url}/ucp.php?mode=login"
+        login_page_html = await self._get_html(start_url, PRIORITY_WRITE)
+        login_form = make_login_form(login_page_html, username, password)
+        await self._post(login_url, login_form, post_delay, headers={"Referer": start_url})
+
+    async def count_posts(self, thread: Optional[str] = None) -> int:
+        """Returns the number of posts in the specified thread.
+
+        Args:
+            thread: The thread to count posts in.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        return count_posts(await self._get_html(thread))
+
+    async def get_user_id(self, username: Optional[str]) -> str:
+        """Returns the user ID of the specified username.
+
+        Args:
+            username: mafiascum username to retrieve an ID for; defaults to the instance username.
+        """
+        username = username or self.username
+        if len(username) == 0:
+            raise ValueError("No username specified!")
+
+        username = username.replace(" ", "+")
+        user_url = f"{self.forum_url}/search.php?keywords=&terms=all&author={username}"
+        return get_user_id(await self._get_html(user_url))
+
+    async def get_activity_overview(self, thread: Optional[str] = None) -> list:
+        """Returns the activity overview of the specified thread.
+
+        Args:
+            thread: thread url to get the activity overview of; defaults to the instance thread.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        thread_number = thread[thread.rfind("=") + 1 :]
+        activity_overview_html = await self._get_html(
+            f"{self.forum_url}/app.php/activity_overview/{thread_number}"
+        )
+        return get_activity_overview(activity_overview_html)
+
+    async def get_posts(
+        self,
+        thread: Optional[str] = None,
+        start: int = 0,
+        end: int = -1,
+        max_workers: Optional[int] = None,
+    ) -> list[Post]:
+        """Returns the posts in the specified thread.
+
+        Args:
+            thread: The thread to get posts from.
+            start: The starting post number.
+            end: The ending post number.
+            max_workers: Number of pages to fetch concurrently; defaults to the instance setting.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        ppp = self.posts_per_page
+        paged_thread = set_posts_per_page(thread, ppp)
+        first_page_url = f"{paged_thread}&start={get_page_start(start, ppp)}"
+        first_page_html = await self._get_html(first_page_url)
+        thread_page_urls = get_thread_page_urls(paged_thread, first_page_html, start, end, ppp)
+        return await self._get_page_posts(
+            thread_page_urls, start, end, max_workers, {first_page_url: first_page_html}
+        )
+
+    async def get_posts_by_numbers(
+        self,
+        thread: Optional[str] = None,
+        numbers: Iterable[int] = (),
+        max_workers: Optional[int] = None,
+    ) -> list[Post]:
+        """Returns the posts with the specified numbers, requesting each page at most once.
+
+        Args:
+            thread: The thread to get posts from.
+            numbers: The post numbers to get; need not be contiguous.
+            max_workers: Number of pages to fetch concurrently; defaults to the instance setting.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        numbers = set(numbers)
+        thread_page_urls = plan_thread_page_urls(
+            set_posts_per_page(thread, self.posts_per_page), numbers, self.posts_per_page
+        )
+        posts = await self._get_page_posts(thread_page_urls, max_workers=max_workers)
+        return [post for post in posts if post.number in numbers]
+
+    async def get_user_posts(
+        self,
+        thread: Optional[str] = None,
+        user: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> list[Post]:
+        """Returns the posts of the specified user in the specified thread.
+
+        Args:
+            thread: The thread to get posts from.
+            user: The user to get posts from.
+            max_workers: Number of pages to fetch concurrently; defaults to the instance setting.
+        """
+        thread = thread or self.thread
+        user = user or self.username
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        user_id = await self.get_user_id(user)
+        ppp = self.posts_per_page
+        user_iso_url = f"{thread}&ppp={ppp}&user_select%5B%5D={user_id}"
+        first_page_url = f"{user_iso_url}&start=0"
+        first_page_html = await self._get_html(first_page_url)
+        user_iso_page_urls = get_thread_page_urls(user_iso_url, first_page_html, 0, -1, ppp)
+        return await self._get_page_posts(
+            user_iso_page_urls, 0, -1, max_workers, {first_page_url: first_page_html}
+        )
+
+    async def _get_page_posts(
+        self,
+        page_urls: list[str],
+        start: int = 0,
+        end: int = -1,
+        max_workers: Optional[int] = None,
+        fetched: Optional[dict[str, HtmlElement]] = None,
+    ) -> list[Post]:
+        """Returns the posts on each page, fetching pages concurrently but in page order.
+
+        Args:
+            page_urls: URLs of the thread pages to retrieve posts from.
+            start: Lowest post number to retrieve.
+            end: Highest post number to retrieve.
+            max_workers: Number of pages to fetch concurrently; defaults to the instance setting.
+            fetched: Already-downloaded pages by URL, reused instead of requested again.
+        """
+        fetched = fetched or {}
+        slots = asyncio.Semaphore(max_workers or self.max_workers)
+
+        async def fetch(page_url: str) -> list[Post]:
+            page_html = fetched.get(page_url)
+            if page_html is None:
+                async with slots:
+                    page_html = await self._get_html(page_url, PRIORITY_BULK)
+            return get_posts(page_html, start, end, page_url)
+
+        page_posts = await asyncio.gather(*(fetch(url) for url in page_urls))
+        return [post for posts in page_posts for post in posts]
+
+    async def get_post(self, post_number: int = 0, thread: Optional[str] = None) -> Post:
+        """Returns a post in the specified thread.
+
+        Args:
+            post_number: The post number to get.
+            thread: The thread to get the post from.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        return (await self.get_posts_by_numbers(thread, [post_number]))[0]
+
+    async def make_post(
+        self,
+        content: str = ".",
+        thread: Optional[str] = None,
+        post_delay: Optional[float] = None,
+    ):
+        """Makes a post in the specified thread.
+
+        Args:
+            thread: url of thread to make a post in.
+            content: The content of the post.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+
+        thread_id = thread[thread.find("t=") + 2 :]
+        make_post_url = f"{self.forum_url}/posting.php?mode=reply&t={thread_id}"
+        make_post_page_html = await self._get_html(make_post_url, PRIORITY_WRITE)
+        make_post_form = make_submit_post_form(make_post_page_html, content)
+        await self._post(make_post_url, make_post_form, post_delay)
+
+    async def edit_post(
+        self,
+        post_number: int,
+        content: str,
+        thread: Optional[str] = None,
+        post_delay: Optional[float] = None,
+    ):
+        """Edits a post in the specified thread.
+
+        Args:
+            post_number: index of the post to edit.
+            content: the revised content of the post.
+            thread: thread to edit a post in; defaults to the instance thread.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+
+        post_id = (await self.get_post(post_number, thread)).id
+        edit_post_url = f"{self.forum_url}/posting.php?mode=edit&p={post_id}"
+        edit_post_page_html = await self._get_html(edit_post_url, PRIORITY_WRITE)
+        edit_post_form = get_edit_post_form(edit_post_page_html, content)
+        await self._post(edit_post_url, edit_post_form, post_delay)
+
+    async def send_pm(
+        self,
+        recipients: str | list[str],
+        subject: str = "Re: ",
+        content: str = ".",
+        post_delay: Optional[float] = None,
+    ):
+        """Sends a private message to a recipient.
+
+        Args:
+            recipient: recipient(s) of the private message.
+            subject: subject heading for the private message; defaults to "Re: ".
+            content: content of the private message; defaults to a period.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        recipients = recipients if isinstance(recipients, list) else [recipients]
+        recipient_uids = await asyncio.gather(
+            *(self.get_user_id(recipient) for recipient in recipients)
+        )
+        pm_url = f"{self.forum_url}/ucp.php?i=pm&mode=compose"
+        pm_page_html = await self._get_html(pm_url, PRIORITY_WRITE)
+        send_pm_form = get_send_pm_form(pm_page_html, recipient_uids, content, subject)
+        await self._post(pm_url, send_pm_form, post_delay)
@@ -0,0 +1,125 @@
+from typing import Iterable, Iterator, Union
+from .operations import Post
+from array import array
+
+__all__ = ["PostBatch"]
+
+
+class PostBatch:
+    """Posts stored column by column, for holding a large archive in little memory.
+
+    Post numbers and ids are kept in integer arrays. Authors (user and user id)
+    and pages (page, forum and thread) are dictionary-encoded: each distinct
+    value is stored once, and each post holds only its index in an array of
+    codes. `Post` objects are built on demand when the batch is indexed or
+    iterated, so code written against lists of posts works unchanged:
+
+        batch = PostBatch(bot.get_posts(thread))
+        votes = [post for post in batch if "VOTE" in post.content]
+
+    Post ids must be numeric, or empty as in the printable view.
+
+    Attributes:
+        numbers: Number of each post.
+        ids: Id of each post as an integer, or -1 for a post without one.
+        authors: Distinct (user, user_id) pairs.
+        author_codes: Index in `authors` of each post's author.
+        pages: Distinct (page, forum, thread) triples.
+        page_codes: Index in `pages` of each post's page.
+        contents: Content of each post.
+        times: Time of each post.
+    """
+
+    def __init__(self, posts: Iterable[Post] = ()):
+        """Initializes the batch with the specified posts, in order.
+
+        Args:
+            posts: Posts to add to the batch.
+        """
+        self.numbers = array("q")
+        self.ids = array("q")
+        self.authors: list[tuple[str, str]] = []
+        self.author_codes = array("L")
+        self.pages: list[tuple[str, str, str]] = []
+        self.page_codes = array("L")
+        self.contents: list[str] = []
+        self.times: list[str] = []
+        self._author_index: dict[tuple[str, str], int] = {}
+        self._page_index: dict[tuple[str, str, str], int] = {}
+        self.extend(posts)
+
+    def append(self, post: Post):
+        """Adds a post to the end of the batch.
+
+        Args:
+            post: The post to add.
+        """
+        self.numbers.append(post.number)
+        self.ids.append(int(post.id) if post.id else -1)
+        self.author_codes.append(
+            self._encode(self.authors, self._author_index, (post.user, post.user_id))
+        )
+        self.page_codes.append(
+            self._encode(self.pages, self._page_index, (post.page, post.forum, post.thread))
+        )
+        self.contents.append(post.content)
+        self.times.append(post.time)
+
+    def extend(self, posts: Iterable[Post]):
+        """Adds posts to the end of the batch, in order.
+
+        Args:
+            posts: The posts to add.
+        """
+        for post in posts:
+            self.append(post)
+
+    @staticmethod
+    def _encode(values: list, index: dict, value: tuple) -> int:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    @property
+    def users(self) -> list[str]:
+        """The name of each post's author, without building the posts."""
+        return [self.authors[code][0] for code in self.author_codes]
+
+    def user_counts(self) -> dict[str, int]:
+        """Returns the number of posts by each user, counted from the author codes."""
+        counts = [0] * len(self.authors)
+        for code in self.author_codes:
+            counts[code] += 1
+        return {self.authors[code][0]: count for code, count in enumerate(counts) if count}
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Post, "PostBatch"]:
+        if isinstance(index, slice):
+            return PostBatch(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        user, user_id = self.authors[self.author_codes[index]]
+        page, forum, thread = self.pages[self.page_codes[index]]
+        post_id = self.ids[index]
+        return Post(
+            number=self.numbers[index],
+            id=str(post_id) if post_id != -1 else "",
+            user=user,
+            user_id=user_id,
+            content=self.contents[index],
+            time=self.times[index],
+            page=page,
+            forum=forum,
+            thread=thread,
+        )
+
+    def __iter__(self) -> Iterator[Post]:
+        return (self[index] for index in range(len(self)))
+
+    def to_posts(self) -> list[Post]:
+        """Returns the posts in the batch as a list."""
+        return list(self)
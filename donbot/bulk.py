@@ -0,0 +1,179 @@
+from typing import Iterable, Iterator, Optional, Union
+from .operations import Post, get_posts, string_to_html
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+import json
+import os
+
+__all__ = [
+    "is_thread_page_url",
+    "page_sort_key",
+    "iter_page_files",
+    "parse_page_chunk",
+    "parse_pages",
+    "drop_repeated_posts",
+]
+
+
+def is_thread_page_url(url: str) -> bool:
+    """Returns whether a URL is an explicitly paged view of a whole thread.
+
+    The thread's bare URL duplicates its first page, and printable views and
+    user iso pages don't hold the thread's posts under their own numbers, so
+    none of them belong in an archive reparsed with `parse_pages`.
+
+    Args:
+        url: The URL of a page.
+    """
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    return (
+        parts.path.endswith("viewtopic.php")
+        and "start" in query
+        and query.get("view") != ["print"]
+        and not any(key.startswith("user_select") for key in query)
+    )
+
+
+def page_sort_key(url: str) -> tuple[str, int]:
+    """Returns a key that sorts page URLs by thread and then by position in the thread.
+
+    Args:
+        url: URL of a thread page.
+    """
+    query = parse_qs(urlsplit(url).query)
+    return query.get("t", [""])[0], int(query.get("start", ["0"])[0])
+
+
+def iter_page_files(directory: str) -> Iterator[tuple[str, bytes]]:
+    """Yields the URL and body of each page saved in a directory, in thread order.
+
+    Files in `PageCache` format (a JSON header line with the page's URL,
+    then the body) are ordered by thread and by their page's `start`; those
+    whose URL fails `is_thread_page_url` are skipped. Other files are taken
+    as bare HTML pages with no URL and follow in name order. Bodies are only
+    read as they are yielded.
+
+    Args:
+        directory: Directory holding the pages, e.g. a `PageCache` directory.
+    """
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.startswith(".tmp-") or not os.path.isfile(path):
+            continue
+        with open(path, "rb") as file:
+            try:
+                url = json.loads(file.readline())["url"]
+            except (ValueError, KeyError, TypeError):
+                url = None
+        if url is None:
+            entries.append(((1, "", 0), path, "", False))
+        elif is_thread_page_url(url):
+            entries.append(((0, *page_sort_key(url)), path, url, True))
+
+    for _, path, url, has_header in sorted(entries, key=lambda entry: entry[0]):
+        with open(path, "rb") as file:
+            if has_header:
+                file.readline()
+            yield url, file.read()
+
+
+def parse_page_chunk(pages: list[tuple[str, bytes]], text_only: bool = False) -> list[Post]:
+    """Returns the posts on each of a list of thread pages, in order.
+
+    This is the unit of work sent to each process by `parse_pages`.
+
+    Args:
+        pages: The URL and body of each page.
+        text_only: Whether post content is read as plain text rather than HTML.
+    """
+    posts = []
+    for url, body in pages:
+        posts += get_posts(string_to_html(body), page_url=url, text_only=text_only)
+    return posts
+
+
+def parse_pages(
+    pages: Union[str, Iterable[tuple[str, bytes]]],
+    max_workers: Optional[int] = None,
+    pages_per_chunk: int = 32,
+    text_only: bool = False,
+) -> Iterator[Post]:
+    """Yields the posts on many saved thread pages, parsed across processes.
+
+    Pages are handed to the processes `pages_per_chunk` at a time, so that
+    pickling pages and posts costs little next to parsing them. Posts are
+    yielded in the pages' order as soon as their chunk and every chunk before
+    it is done; only a couple of chunks per process are read ahead, so an
+    archive of any size is parsed in bounded memory.
+
+    An archive may hold several page layouts of one thread, e.g. pages saved
+    by bots with different `posts_per_page`, whose posts overlap. Each post of
+    a thread is yielded only the first time it is met, so the pages of each
+    thread must be consecutive, as `iter_page_files` and
+    `PageStore.iter_pages` give them. Posts from pages without a URL are
+    yielded as they are.
+
+    Args:
+        pages: A directory of saved pages, read with `iter_page_files`, or the
+            URL and body of each page in the order its posts should be yielded.
+        max_workers: Number of processes; defaults to the number of CPUs. With
+            one, pages are parsed in this process.
+        pages_per_chunk: Number of pages in each unit of work.
+        text_only: Whether post content is read as plain text rather than HTML.
+    """
+    if isinstance(pages, str):
+        pages = iter_page_files(pages)
+    pages = iter(pages)
+    chunks = iter(lambda: list(islice(pages, pages_per_chunk)), [])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    yield from drop_repeated_posts(_parse_chunks(chunks, max_workers, text_only))
+
+
+def _parse_chunks(
+    chunks: Iterator[list[tuple[str, bytes]]], max_workers: int, text_only: bool
+) -> Iterator[Post]:
+    """Yields the posts on each chunk of pages in order, parsing chunks across processes."""
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from parse_page_chunk(chunk, text_only)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(parse_page_chunk, chunk, text_only))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def drop_repeated_posts(posts: Iterable[Post]) -> Iterator[Post]:
+    """Yields each post of a thread the first time it is met, skipping later copies.
+
+    Posts are told apart by the thread and post number of their page URL, and
+    only the numbers of the current thread are remembered, so the posts of
+    each thread must be consecutive. Posts without a page URL are all yielded.
+
+    Args:
+        posts: Posts read from pages grouped by thread.
+    """
+    thread, seen = None, set()
+    page, page_thread = None, ""
+    for post in posts:
+        if post.page != page:
+            page = post.page
+            page_thread = page_sort_key(page)[0] if page else ""
+        if not page_thread:
+            yield post
+            continue
+        if page_thread != thread:
+            thread, seen = page_thread, set()
+        if post.number not in seen:
+            seen.add(post.number)
+            yield post
@@ -0,0 +1,252 @@
+from typing import Optional
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+__all__ = ["normalize_url", "PageCache", "CachingAdapter"]
+
+POSTBODY_MARKER = b'class="postbody"'
+PRINT_POST_MARKER = b'<div class="post">'
+LOGIN_FORM_MARKER = b'id="login"'
+
+
+def normalize_url(url: str) -> str:
+    """Returns a canonical form of a URL for use as a cache key.
+
+    Lowercases the scheme and host, sorts the query parameters, and drops the
+    fragment and any phpBB session id so equivalent requests share one entry.
+
+    Args:
+        url: The URL to normalize.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name != "sid"
+    )
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), "")
+    )
+
+
+class PageCache:
+    """Size-bounded on-disk cache of thread page responses.
+
+    Each entry is one file holding a JSON header line followed by the response
+    body. Files are written to a temporary name and atomically renamed, so
+    several processes can share one directory; readers only ever see complete
+    entries and eviction tolerates files removed by another process.
+
+    Attributes:
+        directory: Directory holding the cache entries.
+        max_bytes: Total size the cache is trimmed back to when exceeded.
+        full_page_ttl: Seconds a page holding a full page of posts stays fresh.
+        partial_page_ttl: Seconds any other cached page stays fresh.
+        posts_per_page: Posts on a full page when the URL does not set `ppp`.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        full_page_ttl: float = 30 * 24 * 60 * 60,
+        partial_page_ttl: float = 60.0,
+        posts_per_page: int = 25,
+    ):
+        """Initializes the cache, creating its directory if needed.
+
+        Args:
+            directory: Directory holding the cache entries.
+            max_bytes: Total size the cache is trimmed back to when exceeded.
+            full_page_ttl: Seconds a page holding a full page of posts stays fresh.
+            partial_page_ttl: Seconds any other cached page stays fresh.
+            posts_per_page: Posts on a full page when the URL does not set `ppp`.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.full_page_ttl = full_page_ttl
+        self.partial_page_ttl = partial_page_ttl
+        self.posts_per_page = posts_per_page
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def is_cacheable(self, url: str) -> bool:
+        """Returns whether responses for a URL belong in the cache.
+
+        Only thread pages are cached; forms, searches and user iso pages are not.
+
+        Args:
+            url: The requested URL.
+        """
+        parts = urlsplit(url)
+        return parts.path.endswith("viewtopic.php") and "user_select" not in parts.query
+
+    def ttl(self, url: str, body: bytes) -> float:
+        """Returns how long a response stays fresh.
+
+        A page holding a full page of posts, other than the thread's unpaginated
+        base URL, only changes if a post is edited or deleted, so it is kept for
+        `full_page_ttl`. The trailing partial page gets `partial_page_ttl`.
+
+        Args:
+            url: The requested URL.
+            body: The response body.
+        """
+        query = dict(parse_qsl(urlsplit(url).query))
+        posts_per_page = int(query.get("ppp", self.posts_per_page))
+        marker = PRINT_POST_MARKER if query.get("view") == "print" else POSTBODY_MARKER
+        if "start" in query and body.count(marker) >= posts_per_page:
+            return self.full_page_ttl
+        return self.partial_page_ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key: str) -> Optional[tuple[dict, bytes]]:
+        """Returns the metadata and body stored for a key, if any.
+
+        Args:
+            key: The normalized URL of the entry.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                meta = json.loads(file.readline())
+                body = file.read()
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta, body
+
+    def set(self, key: str, meta: dict, body: bytes):
+        """Stores an entry, replacing any previous entry for the key atomically.
+
+        Args:
+            key: The normalized URL of the entry.
+            meta: JSON-serializable metadata describing the response.
+            body: The response body.
+        """
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(json.dumps(meta).encode() + b"\n")
+                file.write(body)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._writes += 1
+        if self._writes % 50 == 1:
+            self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits within `max_bytes`."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        for entry in os.scandir(self.directory):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class CachingAdapter(HTTPAdapter):
+    """Transport adapter that serves thread pages from a `PageCache`.
+
+    Fresh entries are returned without touching the network. Stale entries are
+    revalidated with a conditional GET when the server sent an ETag or
+    Last-Modified header, and refreshed in place on a 304 response.
+
+    Mount it on a session to cache every thread page read through it:
+
+        session.mount("https://", CachingAdapter(PageCache(".donbot-cache")))
+    """
+
+    def __init__(self, cache: PageCache, **kwargs):
+        """Initializes the adapter.
+
+        Args:
+            cache: The cache to read and store thread pages in.
+            kwargs: Passed on to `requests.adapters.HTTPAdapter`.
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        if request.method != "GET" or not self.cache.is_cacheable(request.url):
+            return super().send(request, **kwargs)
+
+        key = normalize_url(request.url)
+        cached = self.cache.get(key)
+        if cached is not None:
+            meta, body = cached
+            if meta["expires"] > time.time():
+                return self._build_cached_response(request, meta, body)
+            if meta.get("etag"):
+                request.headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request.headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            meta["expires"] = time.time() + self.cache.ttl(request.url, body)
+            self.cache.set(key, meta, body)
+            return self._build_cached_response(request, meta, body)
+        # a login prompt served in place of the page must not outlive the session
+        if response.status_code == 200 and LOGIN_FORM_MARKER not in response.content:
+            body = response.content
+            meta = {
+                "url": request.url,
+                "headers": dict(response.headers),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "expires": time.time() + self.cache.ttl(request.url, body),
+            }
+            self.cache.set(key, meta, body)
+        return response
+
+    def _build_cached_response(
+        self, request: PreparedRequest, meta: dict, body: bytes
+    ) -> Response:
+        response = Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response.headers["Content-Length"] = str(len(body))
+        response.headers.pop("Content-Encoding", None)
+        response.headers.pop("Transfer-Encoding", None)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response._content = body
+        response.from_cache = True
+        return response
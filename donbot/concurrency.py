@@ -0,0 +1,164 @@
+from typing import Optional
+from .scheduler import PRIORITY_READ
+import heapq
+import itertools
+import math
+import threading
+import time
+
+__all__ = ["MAX_CONCURRENT_REQUESTS", "AdaptiveLimiter", "get_default_limiter"]
+
+# Ceiling on the window of the limiter shared by every Donbot in the process,
+# so that parallel reads stay polite no matter how many bots are running.
+MAX_CONCURRENT_REQUESTS = 8
+
+# latency below baseline + this many seconds never counts as slow, so that a
+# baseline near zero (e.g. a nearby mirror) doesn't turn jitter into back-off
+MIN_LATENCY_SLACK = 0.05
+
+
+class AdaptiveLimiter:
+    """Caps the number of requests in flight at a window that adapts to the server.
+
+    The window grows additively, by about `increase` per window's worth of
+    responses, while it is fully used and response latency stays within
+    `latency_tolerance` times the baseline. It is multiplied by `decrease` on a
+    slow response, a 429 or 5xx status, or a connection error. Only one cut is
+    made per round of requests: failures of requests sent before the last cut
+    are not counted again. The baseline is the lowest recent latency, rising
+    slowly so it can follow a server that has become slower for everyone.
+    Requests waiting for room are admitted in priority order, as by
+    `RequestScheduler`, so a form fetched for a write is not stuck behind a
+    bulk read.
+
+    Attributes:
+        limit: The current window; `window` is the number of requests it allows.
+        min_limit: Smallest the window is cut to.
+        max_limit: Largest the window grows to.
+        increase: Growth of the window per window's worth of good responses.
+        decrease: Factor the window is multiplied by on a bad response.
+        latency_tolerance: Multiple of the baseline latency a response may take
+            before it counts as slow.
+        baseline: Estimated latency of a request to an unloaded server, or None
+            before the first response.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: int = 1,
+        max_limit: int = MAX_CONCURRENT_REQUESTS,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+    ):
+        """Initializes the limiter with no requests in flight.
+
+        Args:
+            initial_limit: The window to start with.
+            min_limit: Smallest the window is cut to.
+            max_limit: Largest the window grows to.
+            increase: Growth of the window per window's worth of good responses.
+            decrease: Factor the window is multiplied by on a bad response.
+            latency_tolerance: Multiple of the baseline latency a response may
+                take before it counts as slow.
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.baseline: Optional[float] = None
+        self._in_flight = 0
+        self._last_cut = -math.inf
+        self._last_full = -math.inf
+        self._waiters: list[tuple[int, int]] = []
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def window(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return max(self.min_limit, math.floor(self.limit))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight."""
+        return self._in_flight
+
+    def acquire(self, priority: int = PRIORITY_READ) -> float:
+        """Blocks until the window has room for a request and returns its start time.
+
+        Pass the returned `time.monotonic()` value to `release` once the
+        response has been read.
+
+        Args:
+            priority: Lower values are admitted first; see the PRIORITY_ constants
+                in `donbot.scheduler`.
+        """
+        ticket = (priority, next(self._tickets))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while self._waiters[0] != ticket or self._in_flight >= self.window:
+                    self._condition.wait()
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+            self._in_flight += 1
+            now = time.monotonic()
+            if self._in_flight >= self.window:
+                self._last_full = now
+            return now
+
+    def release(self, started: float, ok: bool = True, latency: Optional[float] = None):
+        """Frees a request's place in the window and adjusts the window to its outcome.
+
+        Args:
+            started: The value `acquire` returned for the request.
+            ok: False if the request failed, or got a 429 or 5xx response.
+            latency: Seconds the server took to respond, or None if unknown, e.g.
+                for a response served from a local cache; such responses leave
+                the window as it is.
+        """
+        with self._condition:
+            # only grow a window that filled up while this request was in flight
+            window_was_full = self._last_full >= started
+            self._in_flight -= 1
+            slow = False
+            if ok and latency is not None:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    self.baseline += 0.05 * (latency - self.baseline)
+                slow = latency > max(
+                    self.latency_tolerance * self.baseline, self.baseline + MIN_LATENCY_SLACK
+                )
+
+            if not ok or slow:
+                if started >= self._last_cut:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_cut = time.monotonic()
+            elif latency is not None and window_was_full:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the window, the requests in flight and the baseline latency."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "window": self.window,
+                "in_flight": self._in_flight,
+                "baseline_latency": self.baseline,
+            }
+
+
+_default_limiter = AdaptiveLimiter()
+
+
+def get_default_limiter() -> AdaptiveLimiter:
+    """Returns the limiter shared by every Donbot in the process."""
+    return _default_limiter
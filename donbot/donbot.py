@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 from .operations import (
     make_login_form,
     count_posts,
@@ -8,25 +8,67 @@ from .operations import (
     make_submit_post_form,
     get_edit_post_form,
     get_send_pm_form,
+    get_thread_id,
+    is_login_page,
+    is_posting_form,
     get_thread_page_urls,
+    get_page_start,
+    get_print_posts,
+    plan_thread_page_urls,
+    set_posts_per_page,
     string_to_html,
     Post
 )
-from requests import Session
+from .cache import CachingAdapter, PageCache, normalize_url
+from .concurrency import AdaptiveLimiter, get_default_limiter
+from .metrics import Metrics, ParseEvent, RequestEvent, get_endpoint
+from .prewarm import WarmForms
+from .resolver import PostIdCache, UserIdResolver
+from .store import PageStore
+from .streaming import CHUNK_SIZE, StreamingPageParser
+from .transport import IncompleteReadError, make_retry
+from .scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_READ,
+    PRIORITY_WRITE,
+    RequestScheduler,
+    get_default_scheduler,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+from lxml.html import HtmlElement
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+from threading import Lock
+import json
+import os
 import time
 
 __all__ = ["Donbot"]
 
+FORUM_URL = "https://forum.mafiascum.net"
 
 
 class Donbot:
     """Bot for interacting with the MafiaScum forum.
 
     Attributes:
-        postdelay: Time delay before POST requests (seconds). Prevents rate limiting.
+        postdelay: Minimum time between POST requests (seconds). Prevents rate limiting.
         thread: Optional thread associated with the Donbot instance.
         username: Username associated with the Donbot instance.
         session: Session object for making requests to the MafiaScum forum.
+        max_workers: Default number of thread pages fetched in parallel by multi-page reads.
+        forum_url: Base URL of the forum the instance talks to.
+        cache: On-disk cache that thread pages are served from, if any.
+        scheduler: Rate limiter every request of the instance waits on.
+        limiter: Adaptive cap on the instance's page requests in flight at once.
+        posts_per_page: Number of posts requested per thread page.
+        print_view: Whether range reads use the thread's lighter printable view.
+        user_ids: Resolver caching the ids of usernames seen by the instance.
+        post_ids: Cache of the ids of posts seen by the instance, by thread and number.
+        warm_forms: Posting and edit forms kept ready by `prewarm`.
+        session_path: JSON file the session's cookies are persisted to, if any.
+        logged_in: Whether the session is believed to be authenticated.
+        metrics: Counters for the instance's requests and parsing; see `stats`.
     """
 
     def __init__(
@@ -35,35 +77,189 @@ class Donbot:
         password: str,
         thread: Optional[str] = None,
         post_delay: float = 3.0,
+        max_workers: int = 1,
+        forum_url: str = FORUM_URL,
+        cache: Optional[PageCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        posts_per_page: int = 25,
+        print_view: bool = False,
+        user_ids: Optional[UserIdResolver] = None,
+        session_path: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        post_ids: Optional[PostIdCache] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        timeout: Optional[tuple[float, float]] = (5.0, 30.0),
+        retries: int = 3,
+        lazy_content: bool = False,
+        text_only: bool = False,
+        stream_pages: bool = False,
+        store: Optional[PageStore] = None,
     ):
         """Initializes the instance based on account credentials, thread, and POST request delay.
 
+        No requests are made here: the instance logs in the first time it needs an
+        authenticated page, and again whenever the forum reports the session expired.
+
         Args:
             username: The username associated with the Donbot instance.
             password: The password associated with the Donbot instance.
             thread: The thread associated with the Donbot instance, if specified.
-            post_delay: Time delay before POST requests (seconds). Prevents rate limiting.
+            post_delay: Minimum time between POST requests to the forum (seconds). The
+                scheduler holds every Donbot sharing it to the longest delay any of them
+                was given, and never to less than its own default. Prevents rate limiting.
+            max_workers: Default number of thread pages fetched in parallel by multi-page
+                reads; the limiter may allow fewer at a time.
+            forum_url: Base URL of the forum; defaults to mafiascum.net.
+            cache: On-disk cache to serve thread pages from, if specified.
+            scheduler: Rate limiter for the instance's requests; defaults to the one
+                shared by every Donbot in the process.
+            posts_per_page: Number of posts requested per thread page; larger pages mean
+                fewer requests for bulk reads. The site's default is 25.
+            print_view: Whether `get_posts` reads the thread's printable view, which sends
+                less HTML per post but leaves post and user ids empty.
+            user_ids: Resolver caching the ids of usernames, e.g. one persisted to disk;
+                defaults to an in-memory resolver.
+            session_path: JSON file to restore the session's cookies from and save them
+                to after logging in, so later instances can skip logging in.
+            metrics: Counters to record requests and parsing in, e.g. one shared by
+                several instances or with export hooks; defaults to a new one.
+            post_ids: Cache of post ids, e.g. one persisted to disk so that edits of
+                known posts skip looking them up; defaults to an in-memory cache.
+            limiter: Adaptive cap on page requests in flight at once; defaults to the
+                one shared by every Donbot in the process, which allows at most
+                `donbot.concurrency.MAX_CONCURRENT_REQUESTS`.
+            timeout: Seconds to wait for a connection to the forum and for each read
+                from it before the request fails, or None to wait indefinitely.
+            retries: Number of times a request failing to connect, or a GET failing
+                with a 429 or 5xx status or a read error, is retried with jittered
+                exponential backoff before giving up.
+            lazy_content: Whether posts serialize their content only when it is first
+                read, so reads using only the other fields skip that work. Each unread
+                post keeps its page's HTML in memory.
+            text_only: Whether post content is read as plain text rather than HTML.
+            stream_pages: Whether multi-page reads parse each page as it downloads,
+                keeping about one post's HTML in memory at a time instead of the
+                page's whole tree. Streamed pages are not shared with identical
+                requests in flight, and their content is never lazy. With a `cache`,
+                each response body is downloaded whole before it is parsed, so only
+                the tree is kept small.
+            store: Archive to save the raw body of every thread page downloaded
+                in, so that it can be parsed again later without the network.
         """
         self.postdelay = post_delay
         self.thread = thread or ""
         self.username = username
+        self.max_workers = max_workers
+        self.forum_url = forum_url.rstrip("/")
+        self.cache = cache
+        self.scheduler = scheduler or get_default_scheduler()
+        self.limiter = limiter or get_default_limiter()
+        self.posts_per_page = posts_per_page
+        self.print_view = print_view
+        self.lazy_content = lazy_content
+        self.text_only = text_only
+        self.stream_pages = stream_pages
+        self.store = store
+        self.user_ids = user_ids if user_ids is not None else UserIdResolver()
+        self.post_ids = post_ids if post_ids is not None else PostIdCache()
+        self.warm_forms = WarmForms(self)
+        self.session_path = session_path
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.timeout = timeout
         self.session = Session()
-        self.login(username, password, post_delay)
+        # one pooled connection per request the limiter can have in flight
+        adapter_options = dict(
+            pool_connections=1,
+            pool_maxsize=max(self.limiter.max_limit, max_workers),
+            max_retries=make_retry(retries),
+        )
+        for prefix in ("http://", "https://"):
+            if cache is not None:
+                self.session.mount(prefix, CachingAdapter(cache, **adapter_options))
+            else:
+                self.session.mount(prefix, HTTPAdapter(**adapter_options))
+        self.scheduler.require_interval(self.forum_url, "POST", post_delay)
+        self._password = password
+        self._login_lock = Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._in_flight_lock = Lock()
+        self._logins = 0
+        self.logged_in = self._load_session()
 
-    def login(self, username: str, password: str, post_delay: float):
+    def login(self, username: str, password: str, post_delay: Optional[float] = None):
         """Authenticates the Donbot instance with the specified username and password.
 
         Args:
             username: The username to authenticate with.
             password: The password to authenticate with.
-            post_delay: Time delay before POST requests (seconds). Prevents rate limiting.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        start_url = f"{self.forum_url}/index.php"
+        login_url = f"{self.forum_url}/ucp.php?mode=login"
+        login_page_html = self._fetch_html(start_url, PRIORITY_WRITE, coalesce=False)
+        login_form = self._parse(make_login_form, login_page_html, username, password)
+        self._post(login_url, login_form, post_delay, headers={"Referer": start_url})
+        self.username, self._password = username, password
+        self.logged_in = True
+        self._logins += 1
+        self._save_session()
+
+    def _ensure_login(self, logins_seen: Optional[int] = None):
+        """Logs in unless already logged in, once across threads.
+
+        Args:
+            logins_seen: Login count when a request found the session expired; the
+                instance logs in again unless another thread already has since.
         """
-        start_url = "https://forum.mafiascum.net/index.php"
-        login_url = "https://forum.mafiascum.net/ucp.php?mode=login"
-        login_page_html = string_to_html(self.session.get(start_url).content)
-        time.sleep(post_delay)
-        login_form = make_login_form(login_page_html, username, password)
-        self.session.post(login_url, data=login_form, headers={"Referer": start_url})
+        with self._login_lock:
+            if logins_seen is None and self.logged_in:
+                return
+            if logins_seen is not None and self._logins != logins_seen:
+                return
+            self.login(self.username, self._password)
+
+    def _load_session(self) -> bool:
+        """Restores cookies saved by `_save_session`, returning whether there were any."""
+        if self.session_path is None:
+            return False
+        try:
+            with open(self.session_path, encoding="utf-8") as file:
+                cookies = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return False
+        for cookie in cookies:
+            self.session.cookies.set(**cookie)
+        return len(cookies) > 0
+
+    def _save_session(self):
+        """Writes the session's cookies to `session_path`, readable only by the owner."""
+        if self.session_path is None:
+            return
+        cookies = [
+            {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path,
+                "expires": cookie.expires,
+                "secure": cookie.secure,
+            }
+            for cookie in self.session.cookies
+        ]
+        temp_path = f"{self.session_path}.{os.getpid()}.tmp"
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(cookies, file)
+        os.replace(temp_path, self.session_path)
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the instance's request and parsing metrics.
+
+        See `donbot.metrics.Metrics.stats` for the layout; the "concurrency" entry
+        holds the limiter's current window, see `AdaptiveLimiter.stats`.
+        """
+        return {**self.metrics.stats(), "concurrency": self.limiter.stats()}
 
     def count_posts(self, thread: Optional[str] = None) -> int:
         """Returns the number of posts in the specified thread.
@@ -74,8 +270,8 @@ class Donbot:
         thread = thread or self.thread
         if len(thread) == 0:
             raise ValueError("No thread specified!")
-        thread_html = string_to_html(self.session.get(thread).content)
-        return count_posts(thread_html)
+        thread_html = self._get_html(thread)
+        return self._parse(count_posts, thread_html)
 
     def get_user_id(self, username: Optional[str]) -> str:
         """Returns the user ID of the specified username.
@@ -86,11 +282,40 @@ class Donbot:
         username = username or self.username
         if len(username) == 0:
             raise ValueError("No username specified!")
+        user_id = self.user_ids.get(username)
+        if user_id is not None:
+            return user_id
+
+        search_name = username.replace(" ", "+")
+        user_url = f"{self.forum_url}/search.php?keywords=&terms=all&author={search_name}"
+        user_posts_html = self._get_html(user_url)
+        user_id = self._parse(get_user_id, user_posts_html)
+        self.user_ids.add(username, user_id)
+        self.user_ids.save()
+        return user_id
+
+    def resolve_user_ids(
+        self, usernames: Iterable[str], max_workers: Optional[int] = None
+    ) -> dict[str, str]:
+        """Returns the user IDs of the specified usernames.
 
-        username = username.replace(" ", "+")
-        user_url = f"https://forum.mafiascum.net/search.php?keywords=&terms=all&author={username}"
-        user_posts_html = string_to_html(self.session.get(user_url).content)
-        return get_user_id(user_posts_html)
+        Only names the instance's resolver has never seen are searched for, in
+        parallel up to `max_workers` at a time.
+
+        Args:
+            usernames: mafiascum usernames to retrieve IDs for.
+            max_workers: Number of searches to run in parallel; defaults to the instance setting.
+        """
+        usernames = list(dict.fromkeys(usernames))
+        unknown = [name for name in usernames if name not in self.user_ids]
+        max_workers = min(max_workers or self.max_workers, len(unknown))
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(self.get_user_id, unknown))
+        else:
+            for name in unknown:
+                self.get_user_id(name)
+        return {name: self.user_ids.get(name) for name in usernames}
 
     def get_activity_overview(self, thread: Optional[str] = None) -> list:
         """Returns the activity overview of the specified thread.
@@ -102,15 +327,17 @@ class Donbot:
         if len(thread) == 0:
             raise ValueError("No thread specified!")
         thread_number = thread[thread.rfind("=") + 1 :]
-        activity_overview_html = string_to_html(
-            self.session.get(
-                f"https://forum.mafiascum.net/app.php/activity_overview/{thread_number}"
-            ).content
+        activity_overview_html = self._get_html(
+            f"{self.forum_url}/app.php/activity_overview/{thread_number}"
         )
-        return get_activity_overview(activity_overview_html)
+        return self._parse(get_activity_overview, activity_overview_html)
 
     def get_posts(
-        self, thread: Optional[str] = None, start: int = 0, end: int = -1
+        self,
+        thread: Optional[str] = None,
+        start: int = 0,
+        end: int = -1,
+        max_workers: Optional[int] = None,
     ) -> list[Post]:
         """Returns the posts in the specified thread.
 
@@ -118,29 +345,158 @@ class Donbot:
             thread: The thread to get posts from.
             start: The starting post number.
             end: The ending post number.
+            max_workers: Number of pages to fetch in parallel; defaults to the instance setting.
         """
         thread = thread or self.thread
         if len(thread) == 0:
             raise ValueError("No thread specified!")
-        base_html = string_to_html(self.session.get(thread).content)
+        if self.print_view:
+            return self._get_print_posts(thread, start, end)
 
-        posts = []
-        for thread_page_url in get_thread_page_urls(thread, base_html, start, end):
-            thread_page_html = string_to_html(
-                self.session.get(thread_page_url).content
-            )
-            posts += get_posts(thread_page_html, start, end)
+        ppp = self.posts_per_page
+        paged_thread = set_posts_per_page(thread, ppp)
+        first_page_url = f"{paged_thread}&start={get_page_start(start, ppp)}"
+        first_page_html = self._get_html(first_page_url)
+        post_count = self._parse(count_posts, first_page_html)
+        thread_page_urls = get_thread_page_urls(
+            paged_thread, first_page_html, start, end, ppp
+        )
+        posts = self._get_page_posts(
+            thread_page_urls, start, end, max_workers, {first_page_url: first_page_html}
+        )
 
+        # a full last page past the first page's post count means the thread grew
+        # since that page was served (or cached); keep reading from where we left off
+        if end == -1 and posts and posts[-1].number >= post_count:
+            last_number = posts[-1].number
+            if get_page_start(last_number + 1, ppp) > get_page_start(last_number, ppp):
+                try:
+                    posts += self.get_posts(thread, last_number + 1, end, max_workers)
+                except IncompleteReadError as error:
+                    error.posts = posts + error.posts
+                    raise
         return posts
-    
+
+    def iter_posts(
+        self, thread: Optional[str] = None, start: int = 0, end: int = -1
+    ) -> Iterator[Post]:
+        """Yields the posts in the specified thread page by page as pages arrive.
+
+        While the caller consumes one page, the next is fetched and parsed in the
+        background. Only those two pages are held in memory, and no further pages
+        are requested once the caller stops iterating.
+
+        Args:
+            thread: The thread to get posts from.
+            start: The starting post number.
+            end: The ending post number.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        ppp = self.posts_per_page
+        paged_thread = set_posts_per_page(thread, ppp)
+
+        def fetch(page_id: int) -> tuple[list[Post], Optional[int]]:
+            if self.print_view:
+                print_page_url = f"{thread}&view=print&ppp={ppp}&start={page_id}"
+                print_page_html = self._get_html(print_page_url, PRIORITY_BULK)
+                return self._parse_posts(get_print_posts, print_page_html, page_id), None
+            page_url = f"{paged_thread}&start={page_id}"
+            page_html = self._get_html(page_url, PRIORITY_BULK)
+            page_posts = self._parse_posts(get_posts, page_html, 0, -1, page_url)
+            self._observe_posts(thread, page_posts)
+            return page_posts, self._parse(count_posts, page_html)
+
+        last_number = end if end != -1 else float("inf")
+        page_id = get_page_start(start, ppp)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            next_page = executor.submit(fetch, page_id)
+            while next_page is not None:
+                page_posts, post_count = next_page.result()
+                page_id += ppp
+                page_is_full = len(page_posts) >= ppp
+                if post_count is None:
+                    has_more = page_is_full and page_id <= last_number
+                else:
+                    # as in get_posts, a full page past the post count means the
+                    # count is stale and the thread may continue
+                    has_more = page_id < min(post_count, last_number + 1) or (
+                        end == -1 and page_is_full and page_posts[-1].number >= post_count
+                    )
+                next_page = executor.submit(fetch, page_id) if has_more else None
+                for post in page_posts:
+                    if start <= post.number <= last_number:
+                        yield post
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_print_posts(self, thread: str, start: int = 0, end: int = -1) -> list[Post]:
+        """Returns the posts in the specified range from the thread's printable view.
+
+        Printable pages don't report the thread's post count, so pages are read in
+        order until one comes back short of a full page.
+
+        Args:
+            thread: The thread to get posts from.
+            start: The starting post number.
+            end: The ending post number.
+        """
+        ppp = self.posts_per_page
+        posts = []
+        page_id = get_page_start(start, ppp)
+        while end == -1 or page_id <= end:
+            print_page_url = f"{thread}&view=print&ppp={ppp}&start={page_id}"
+            print_page_html = self._get_html(print_page_url, PRIORITY_BULK)
+            page_posts = self._parse_posts(get_print_posts, print_page_html, page_id)
+            posts += [
+                post
+                for post in page_posts
+                if post.number >= start and (end == -1 or post.number <= end)
+            ]
+            if len(page_posts) < ppp:
+                break
+            page_id += ppp
+        return posts
+
+    def get_posts_by_numbers(
+        self,
+        thread: Optional[str] = None,
+        numbers: Iterable[int] = (),
+        max_workers: Optional[int] = None,
+    ) -> list[Post]:
+        """Returns the posts with the specified numbers, requesting each page at most once.
+
+        Numbers past the end of the thread are ignored.
+
+        Args:
+            thread: The thread to get posts from.
+            numbers: The post numbers to get; need not be contiguous.
+            max_workers: Number of pages to fetch in parallel; defaults to the instance setting.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        numbers = set(numbers)
+        thread_page_urls = plan_thread_page_urls(
+            set_posts_per_page(thread, self.posts_per_page), numbers, self.posts_per_page
+        )
+        posts = self._get_page_posts(thread_page_urls, max_workers=max_workers)
+        return [post for post in posts if post.number in numbers]
+
     def get_user_posts(
-            self, thread: Optional[str] = None, user: Optional[str] = None
+        self,
+        thread: Optional[str] = None,
+        user: Optional[str] = None,
+        max_workers: Optional[int] = None,
     ) -> list[Post]:
         """Returns the posts of the specified user in the specified thread.
 
         Args:
             thread:The thread to get posts from.
             user:The user to get posts from.
+            max_workers: Number of pages to fetch in parallel; defaults to the instance setting.
 
         Returns
         -------
@@ -151,18 +507,377 @@ class Donbot:
         user = user or self.username
         if len(thread) == 0:
             raise ValueError("No thread specified!")
-        user_id = self.get_user_id(user)
-        user_iso_url = f"{thread}&ppp=25&user_select%5B%5D={user_id}"
-        base_html = string_to_html(self.session.get(user_iso_url).content)
+        return self.get_iso_posts(thread, self.get_user_id(user), max_workers=max_workers)
 
-        posts = []
-        for user_iso_page_url in get_thread_page_urls(user_iso_url, base_html, 0, -1):
-            user_iso_page_html = string_to_html(
-                self.session.get(user_iso_page_url).content
+    def get_iso_posts(
+        self,
+        thread: Optional[str] = None,
+        user_id: str = "",
+        start: int = 0,
+        max_workers: Optional[int] = None,
+    ) -> list[Post]:
+        """Returns the posts in a user's isolation (iso) view of the specified thread.
+
+        Args:
+            thread: The thread to get posts from.
+            user_id: The forum's id for the user whose posts to get.
+            start: Position within the iso of the first post to get, counting from 0.
+            max_workers: Number of pages to fetch in parallel; defaults to the instance setting.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        ppp = self.posts_per_page
+        user_iso_url = f"{thread}&ppp={ppp}&user_select%5B%5D={user_id}"
+        first_page_url = f"{user_iso_url}&start={get_page_start(start, ppp)}"
+        first_page_html = self._get_html(first_page_url)
+        user_iso_page_urls = get_thread_page_urls(
+            user_iso_url, first_page_html, start, -1, ppp
+        )
+        skipped = start - get_page_start(start, ppp)
+        try:
+            posts = self._get_page_posts(
+                user_iso_page_urls, 0, -1, max_workers, {first_page_url: first_page_html}
             )
-            posts += get_posts(user_iso_page_html)
+        except IncompleteReadError as error:
+            error.posts = error.posts[skipped:]
+            raise
+        return posts[skipped:]
+
+    def _get_html(
+        self, url: str, priority: int = PRIORITY_READ, login: bool = False
+    ) -> HtmlElement:
+        """Returns the parsed HTML of a page, logging in and retrying if the forum asks to.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+            login: Whether the page is known to need an authenticated session. Such
+                pages hold forms with one-time tokens, so they are never shared
+                with other requests in flight.
+        """
+        if login:
+            self._ensure_login()
+        logins_seen = self._logins
+        page_html = self._fetch_html(url, priority, coalesce=not login)
+        if is_login_page(page_html):
+            self._ensure_login(logins_seen)
+            page_html = self._fetch_html(url, priority, coalesce=not login)
+        return page_html
+
+    def _fetch_html(
+        self, url: str, priority: int = PRIORITY_READ, coalesce: bool = True
+    ) -> HtmlElement:
+        """Returns the parsed HTML of a page, sharing any identical request already in flight.
+
+        Concurrent callers asking for the same page, e.g. a votecount and a
+        watcher reading the same thread page, wait for the first caller's
+        request and share its parsed tree, which must not be modified.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+            coalesce: Whether to share an identical request in flight. Form pages,
+                whose tokens are valid for one submission, always get their own.
+        """
+        if not coalesce:
+            return self._request_html(url, priority)
+        key = normalize_url(url)
+        with self._in_flight_lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                page_future = self._in_flight[key] = Future()
+        if in_flight is not None:
+            self.metrics.record_coalesced(get_endpoint(url))
+            return in_flight.result()
+
+        try:
+            page_html = self._request_html(url, priority)
+        except BaseException as error:
+            page_future.set_exception(error)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        page_future.set_result(page_html)
+        return page_html
+
+    def _request_html(self, url: str, priority: int = PRIORITY_READ) -> HtmlElement:
+        """Returns the parsed HTML of a page, holding a place in the limiter's window.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+        """
+        waited_from = time.perf_counter()
+        self.scheduler.acquire(url, "GET", priority)
+        started = self.limiter.acquire(priority)
+        ok, latency = False, None
+        try:
+            sent_at = time.perf_counter()
+            response = self.session.get(url, timeout=self.timeout)
+            content = response.content
+            ok = response.status_code != 429 and response.status_code < 500
+            if not getattr(response, "from_cache", False):
+                latency = time.perf_counter() - sent_at
+        except RequestException:
+            self._record_failed_request("GET", url, sent_at, sent_at - waited_from)
+            raise
+        finally:
+            self.limiter.release(started, ok, latency)
+        self._record_request(response, sent_at, sent_at - waited_from)
+        if not ok:
+            response.raise_for_status()  # still failing once the retries ran out
+        if not getattr(response, "from_cache", False):
+            self._archive(url, response, content)
+        return self._parse(string_to_html, content)
+
+    def _archive(self, url: str, response: Response, body: bytes):
+        """Saves a downloaded thread page's body in the instance's store, if it has one.
+
+        Args:
+            url: URL of the page.
+            response: The response, for its status.
+            body: The response body.
+        """
+        if (
+            self.store is not None
+            and response.status_code == 200
+            and self.store.is_storable(url, body)
+        ):
+            self.store.put(url, body)
+
+    def _get_streamed_posts(self, url: str, priority: int = PRIORITY_BULK) -> list[Post]:
+        """Returns the posts on a thread page, parsed as it downloads.
+
+        Logs in and streams the page again if the forum serves its login form.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+        """
+        logins_seen = self._logins
+        posts, is_login_page = self._stream_page(url, priority)
+        if is_login_page:
+            self._ensure_login(logins_seen)
+            posts, _ = self._stream_page(url, priority)
         return posts
 
+    def _stream_page(
+        self, url: str, priority: int = PRIORITY_BULK
+    ) -> tuple[list[Post], bool]:
+        """Returns the posts on a page, parsed chunk by chunk, and whether it was the login form.
+
+        The latency given to the limiter leaves out the time spent parsing.
+
+        Args:
+            url: URL of the page to request.
+            priority: Scheduling priority of the request; see `donbot.scheduler`.
+        """
+        parser = StreamingPageParser(url, text_only=self.text_only)
+        posts, body = [], []
+        waited_from = time.perf_counter()
+        self.scheduler.acquire(url, "GET", priority)
+        started = self.limiter.acquire(priority)
+        ok, latency, size, parsing = False, None, 0, 0.0
+        try:
+            sent_at = time.perf_counter()
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                ok = response.status_code != 429 and response.status_code < 500
+                from_cache = getattr(response, "from_cache", False)
+                if ok:
+                    # a cached body is already in memory and can't be iterated as a stream
+                    if from_cache:
+                        chunks = [response.content]
+                    else:
+                        chunks = response.iter_content(CHUNK_SIZE)
+                    for chunk in chunks:
+                        size += len(chunk)
+                        if self.store is not None and not from_cache:
+                            body.append(chunk)
+                        parsed_from = time.perf_counter()
+                        posts += parser.feed(chunk)
+                        parsing += time.perf_counter() - parsed_from
+                    parsed_from = time.perf_counter()
+                    posts += parser.close()
+                    parsing += time.perf_counter() - parsed_from
+                else:
+                    size = len(response.content)
+                if not from_cache:
+                    latency = time.perf_counter() - sent_at - parsing
+        except RequestException:
+            self._record_failed_request("GET", url, sent_at, sent_at - waited_from)
+            raise
+        finally:
+            self.limiter.release(started, ok, latency)
+        self._record_request(response, sent_at, sent_at - waited_from, size)
+        self.metrics.record_parse(ParseEvent("stream_page", parsing))
+        if not ok:
+            response.raise_for_status()  # still failing once the retries ran out
+        if body:
+            self._archive(url, response, b"".join(body))
+        return posts, parser.is_login_page
+
+    def _post(
+        self, url: str, data: dict, post_delay: Optional[float] = None, **kwargs
+    ) -> Response:
+        """Submits a form once the scheduler's POST budget for the forum allows it.
+
+        Args:
+            url: URL to submit the form to.
+            data: The form fields.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+            kwargs: Passed on to `requests.Session.post`.
+        """
+        waited_from = time.perf_counter()
+        self.scheduler.acquire(url, "POST", PRIORITY_WRITE, interval=post_delay)
+        sent_at = time.perf_counter()
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.post(url, data=data, **kwargs)
+        except RequestException:
+            self._record_failed_request("POST", url, sent_at, sent_at - waited_from)
+            raise
+        self._record_request(response, sent_at, sent_at - waited_from)
+        return response
+
+    def _record_request(
+        self, response: Response, sent_at: float, wait: float, size: Optional[int] = None
+    ):
+        """Records a completed request in the instance's metrics.
+
+        Args:
+            response: The response, with its content already read.
+            sent_at: `time.perf_counter()` value when the request was sent.
+            wait: Seconds spent waiting to send the request.
+            size: Size of the response body, if it was streamed rather than kept.
+        """
+        request = response.request
+        self.metrics.record_request(
+            RequestEvent(
+                method=request.method,
+                url=request.url,
+                endpoint=get_endpoint(request.url),
+                status=response.status_code,
+                bytes=len(response.content) if size is None else size,
+                latency=time.perf_counter() - sent_at,
+                wait=wait,
+            )
+        )
+
+    def _record_failed_request(self, method: str, url: str, sent_at: float, wait: float):
+        """Records a request that got no response, e.g. after a timeout or exhausted retries.
+
+        Args:
+            method: "GET" or "POST".
+            url: The requested URL.
+            sent_at: `time.perf_counter()` value when the request was sent.
+            wait: Seconds spent waiting to send the request.
+        """
+        self.metrics.record_request(
+            RequestEvent(
+                method=method,
+                url=url,
+                endpoint=get_endpoint(url),
+                status=None,
+                bytes=0,
+                latency=time.perf_counter() - sent_at,
+                wait=wait,
+            )
+        )
+
+    def _parse(self, operation: Callable, *args):
+        """Returns the result of a parsing function, timing it in the instance's metrics.
+
+        Args:
+            operation: A function from `donbot.operations`.
+            args: Passed on to the function.
+        """
+        with self.metrics.timed(operation.__name__):
+            return operation(*args)
+
+    def _parse_posts(self, operation: Callable, page_html: HtmlElement, *args) -> list[Post]:
+        """Returns the posts on a page, with content read as the instance is configured to.
+
+        Args:
+            operation: `get_posts` or `get_print_posts`.
+            page_html: HTML of the page.
+            args: Passed on to the function after the page.
+        """
+        with self.metrics.timed(operation.__name__):
+            return operation(page_html, *args, lazy=self.lazy_content, text_only=self.text_only)
+
+    def _observe_posts(self, thread: str, posts: list[Post]):
+        """Records the user and post ids of parsed posts in the instance's caches.
+
+        Args:
+            thread: URL of the thread, or of any of its pages, the posts are from.
+            posts: The parsed posts.
+        """
+        self.user_ids.observe_posts(posts)
+        if "t=" in thread:
+            self.post_ids.observe_posts(get_thread_id(thread), posts)
+
+    def _get_page_posts(
+        self,
+        page_urls: list[str],
+        start: int = 0,
+        end: int = -1,
+        max_workers: Optional[int] = None,
+        fetched: Optional[dict[str, HtmlElement]] = None,
+    ) -> list[Post]:
+        """Returns the posts on each page, fetching and parsing pages in parallel.
+
+        Posts are returned in page order regardless of which request finishes first.
+        A page that fails is requested once more, after the other pages of a
+        parallel read; if it fails again, `IncompleteReadError` is raised with the
+        posts before it, and a sequential read requests no further pages.
+
+        Args:
+            page_urls: URLs of the thread pages to retrieve posts from.
+            start: Lowest post number to retrieve.
+            end: Highest post number to retrieve.
+            max_workers: Number of pages to fetch in parallel; defaults to the instance setting.
+            fetched: Already-downloaded pages by URL, reused instead of requested again.
+        """
+        fetched = fetched or {}
+        max_workers = min(max_workers or self.max_workers, len(page_urls))
+
+        def fetch(page_url: str) -> list[Post]:
+            page_html = fetched.get(page_url)
+            if page_html is None and self.stream_pages:
+                page_posts = self._get_streamed_posts(page_url)
+            else:
+                if page_html is None:
+                    page_html = self._get_html(page_url, PRIORITY_BULK)
+                page_posts = self._parse_posts(get_posts, page_html, 0, -1, page_url)
+            self._observe_posts(page_url, page_posts)
+            end_number = end if end != -1 else float("inf")
+            return [post for post in page_posts if start <= post.number <= end_number]
+
+        def try_fetch(page_url: str) -> "list[Post] | RequestException":
+            try:
+                return fetch(page_url)
+            except RequestException as error:
+                return error
+
+        if max_workers <= 1:
+            page_posts = []  # requested one at a time below
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                page_posts = list(executor.map(try_fetch, page_urls))
+
+        for index, page_url in enumerate(page_urls):
+            if index == len(page_posts):
+                page_posts.append(try_fetch(page_url))
+            if isinstance(page_posts[index], RequestException):
+                page_posts[index] = try_fetch(page_url)
+            if isinstance(page_posts[index], RequestException):
+                good_posts = [post for posts in page_posts[:index] for post in posts]
+                raise IncompleteReadError(good_posts, page_url) from page_posts[index]
+        return [post for posts in page_posts for post in posts]
+
     def get_post(self, post_number: int = 0, thread: Optional[str] = None) -> Post:
         """Returns a post in the specified thread.
 
@@ -173,7 +888,7 @@ class Donbot:
         thread = thread or self.thread
         if len(thread) == 0:
             raise ValueError("No thread specified!")
-        return self.get_posts(thread, post_number, post_number + 1)[0]
+        return self.get_posts_by_numbers(thread, [post_number])[0]
 
     def make_post(
         self,
@@ -186,21 +901,82 @@ class Donbot:
         Args:
             thread: url of thread to make a post in.
             content: The content of the post.
-            post_delay: Time delay before POST requests (seconds). Prevents rate limiting.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
         """
         thread = thread or self.thread
-        post_delay = post_delay or self.postdelay
         if len(thread) == 0:
             raise ValueError("No thread specified!")
 
-        thread_id = thread[thread.find("t=") + 2 :]
-        make_post_url = (
-            f"https://forum.mafiascum.net/posting.php?mode=reply&t={thread_id}"
-        )
-        make_post_page_html = string_to_html(self.session.get(make_post_url).content)
-        make_post_form = make_submit_post_form(make_post_page_html, content)
-        time.sleep(post_delay)
-        self.session.post(make_post_url, data=make_post_form)
+        make_post_url = self._get_reply_url(thread)
+        self._submit_posting_form(make_post_url, make_submit_post_form, content, post_delay)
+
+    def prewarm(
+        self,
+        thread: Optional[str] = None,
+        post_numbers: Iterable[int] = (),
+        refresh_interval: Optional[float] = None,
+    ):
+        """Keeps the forms for posting in a thread, and for editing some of its posts, ready.
+
+        The forms are fetched now and refreshed in the background, so that
+        `make_post` and `edit_post` in the thread only send their POST request.
+
+        Args:
+            thread: thread to keep the posting form of; defaults to the instance thread.
+            post_numbers: Numbers of posts in the thread to keep edit forms of.
+            refresh_interval: If specified, seconds between refreshes of each form.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        if refresh_interval is not None:
+            self.warm_forms.refresh_interval = refresh_interval
+
+        self.warm_forms.add(self._get_reply_url(thread))
+        for post_id in self._get_post_ids(thread, post_numbers).values():
+            self.warm_forms.add(self._get_edit_post_url(post_id))
+
+    def _get_reply_url(self, thread: str) -> str:
+        """Returns the URL of the page whose form posts in the specified thread."""
+        return f"{self.forum_url}/posting.php?mode=reply&t={get_thread_id(thread)}"
+
+    def _get_edit_post_url(self, post_id: str) -> str:
+        """Returns the URL of the page whose form edits the specified post."""
+        return f"{self.forum_url}/posting.php?mode=edit&p={post_id}"
+
+    def _submit_posting_form(
+        self,
+        url: str,
+        make_form: Callable,
+        content: str,
+        post_delay: Optional[float] = None,
+    ) -> Response:
+        """Submits a posting or edit form, using a pre-warmed copy of its page if one is ready.
+
+        Posts or edits made since a warm form was fetched can outdate it, in which
+        case the forum answers with a fresh copy of the form instead of saving;
+        the submission is then repeated once with that copy.
+
+        Args:
+            url: URL of the posting or edit page.
+            make_form: `make_submit_post_form` or `get_edit_post_form`.
+            content: The content of the post.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        page_html = self.warm_forms.take(url)
+        is_warm = page_html is not None
+        if not is_warm:
+            page_html = self._get_html(url, PRIORITY_WRITE, login=True)
+        response = self._post(url, self._parse(make_form, page_html, content), post_delay)
+        if is_warm:
+            response_html = self._parse(string_to_html, response.content)
+            if is_posting_form(response_html):
+                form = self._parse(make_form, response_html, content)
+                response = self._post(url, form, post_delay)
+            self.warm_forms.refresh_taken()
+        return response
 
     def edit_post(
         self,
@@ -215,19 +991,110 @@ class Donbot:
             post_number: index of the post to edit. 
             content: the revised content of the post.
             thread: thread to edit a post in; defaults to the instance thread.
-            post_delay: Time delay before POST requests (seconds). Prevents rate limiting.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        thread = thread or self.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+
+        post_id = self._get_post_ids(thread, [post_number])[post_number]
+        self.edit_post_by_id(post_id, content, post_delay)
+
+    def edit_post_by_id(
+        self, post_id: str, content: str, post_delay: Optional[float] = None
+    ):
+        """Edits the post with the specified id.
+
+        Args:
+            post_id: The forum's id for the post to edit.
+            content: the revised content of the post.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        edit_post_url = self._get_edit_post_url(post_id)
+        self._submit_posting_form(edit_post_url, get_edit_post_form, content, post_delay)
+
+    def edit_posts(
+        self,
+        edits: dict[int, str],
+        thread: Optional[str] = None,
+        post_delay: Optional[float] = None,
+        prefetch: int = 2,
+    ):
+        """Edits several posts in the specified thread.
+
+        Post ids not already cached are looked up together, reading each page
+        once, and edit forms for upcoming posts are fetched while earlier edits
+        wait for the scheduler's POST budget.
+
+        Args:
+            edits: The revised content of each post to edit, by post number.
+            thread: thread to edit posts in; defaults to the instance thread.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+            prefetch: Number of edit forms fetched ahead of the edit being submitted.
         """
         thread = thread or self.thread
-        post_delay = post_delay or self.postdelay
         if len(thread) == 0:
             raise ValueError("No thread specified!")
 
-        post_id = self.get_post(post_number, thread).id
-        edit_post_url = f"https://forum.mafiascum.net/posting.php?mode=edit&p={post_id}"
-        edit_post_page_html = string_to_html(self.session.get(edit_post_url).content)
-        edit_post_form = get_edit_post_form(edit_post_page_html, content)
-        time.sleep(post_delay)
-        self.session.post(edit_post_url, data=edit_post_form)
+        post_ids = self._get_post_ids(thread, edits)
+        edit_queue = [(post_ids[number], content) for number, content in edits.items()]
+        with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+            edit_pages = [
+                executor.submit(self._get_edit_post_page, post_id)
+                for post_id, _ in edit_queue[: prefetch + 1]
+            ]
+            for index, (post_id, content) in enumerate(edit_queue):
+                edit_post_page_html = edit_pages[index].result()
+                if index + prefetch + 1 < len(edit_queue):
+                    upcoming_post_id = edit_queue[index + prefetch + 1][0]
+                    edit_pages.append(
+                        executor.submit(self._get_edit_post_page, upcoming_post_id)
+                    )
+                self._submit_edit(post_id, edit_post_page_html, content, post_delay)
+
+    def _get_post_ids(self, thread: str, post_numbers: Iterable[int]) -> dict[int, str]:
+        """Returns the ids of posts in a thread, reading only pages of posts not cached.
+
+        Args:
+            thread: The thread the posts are in.
+            post_numbers: The posts' numbers.
+        """
+        thread_id = get_thread_id(thread)
+        post_ids = {number: self.post_ids.get(thread_id, number) for number in post_numbers}
+        unknown = [number for number, post_id in post_ids.items() if post_id is None]
+        if unknown:
+            for post in self.get_posts_by_numbers(thread, unknown):
+                post_ids[post.number] = post.id
+        for number, post_id in post_ids.items():
+            if post_id is None:
+                raise ValueError(f"No post #{number} in thread!")
+        return post_ids
+
+    def _get_edit_post_page(self, post_id: str) -> HtmlElement:
+        """Returns the HTML of the page whose form edits the specified post."""
+        return self._get_html(self._get_edit_post_url(post_id), PRIORITY_WRITE, login=True)
+
+    def _submit_edit(
+        self,
+        post_id: str,
+        edit_post_page_html: HtmlElement,
+        content: str,
+        post_delay: Optional[float] = None,
+    ) -> Response:
+        """Edits a post using the form on a previously fetched edit page.
+
+        Args:
+            post_id: The forum's id for the post to edit.
+            edit_post_page_html: HTML of the edit page, from `_get_edit_post_page`.
+            content: the revised content of the post.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        edit_post_form = self._parse(get_edit_post_form, edit_post_page_html, content)
+        return self._post(self._get_edit_post_url(post_id), edit_post_form, post_delay)
 
     def send_pm(
         self,
@@ -242,13 +1109,40 @@ class Donbot:
             recipient: recipient(s) of the private message.
             subject: subject heading for the private message; defaults to "Re: ".
             content: content of the private message; defaults to a period.
-            post_delay: Time delay before POST requests (seconds). Prevents rate limiting.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
         """
-        post_delay = post_delay or self.postdelay
         recipients = recipients if isinstance(recipients, list) else [recipients]
-        recipient_uids = [self.get_user_id(recipient) for recipient in recipients]
-        pm_url = "https://forum.mafiascum.net/ucp.php?i=pm&mode=compose"
-        pm_page_html = string_to_html(self.session.get(pm_url).content)
-        send_pm_form = get_send_pm_form(pm_page_html, recipient_uids, content, subject)
-        time.sleep(post_delay)
-        self.session.post(pm_url, data=send_pm_form)
+        recipient_uids = list(self.resolve_user_ids(recipients).values())
+        pm_page_html = self._get_pm_compose_page()
+        self._submit_pm(pm_page_html, recipient_uids, subject, content, post_delay)
+
+    def _get_pm_compose_page(self) -> HtmlElement:
+        """Returns the HTML of the private message compose page, whose form a PM is sent with."""
+        return self._get_html(
+            f"{self.forum_url}/ucp.php?i=pm&mode=compose", PRIORITY_WRITE, login=True
+        )
+
+    def _submit_pm(
+        self,
+        pm_page_html: HtmlElement,
+        recipient_uids: list[str],
+        subject: str,
+        content: str,
+        post_delay: Optional[float] = None,
+    ) -> Response:
+        """Sends a private message using the form on a previously fetched compose page.
+
+        Args:
+            pm_page_html: HTML of the compose page, from `_get_pm_compose_page`.
+            recipient_uids: The user ids of the recipients.
+            subject: subject heading for the private message.
+            content: content of the private message.
+            post_delay: If specified, also waits this long after the forum's previous POST
+                request, for this call only.
+        """
+        pm_url = f"{self.forum_url}/ucp.php?i=pm&mode=compose"
+        send_pm_form = self._parse(
+            get_send_pm_form, pm_page_html, recipient_uids, content, subject
+        )
+        return self._post(pm_url, send_pm_form, post_delay)
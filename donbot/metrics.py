@@ -0,0 +1,208 @@
+from typing import Callable, Iterator, Optional, Union
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+import bisect
+import math
+import threading
+import time
+
+__all__ = [
+    "LATENCY_BUCKETS",
+    "get_endpoint",
+    "RequestEvent",
+    "ParseEvent",
+    "Metrics",
+]
+
+# Upper bounds (seconds) of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+
+def get_endpoint(url: str) -> str:
+    """Returns the kind of forum endpoint a URL belongs to, used to group metrics.
+
+    One of "thread", "search", "posting", "ucp", "activity" or "other".
+
+    Args:
+        url: The requested URL.
+    """
+    path = urlsplit(url).path
+    if path.endswith("viewtopic.php"):
+        return "thread"
+    if path.endswith("search.php"):
+        return "search"
+    if path.endswith("posting.php"):
+        return "posting"
+    if path.endswith("ucp.php"):
+        return "ucp"
+    if "/activity_overview/" in path:
+        return "activity"
+    return "other"
+
+
+@dataclass
+class RequestEvent:
+    """A completed or failed HTTP request, as reported to metrics hooks.
+
+    Attributes:
+        method: "GET" or "POST".
+        url: The requested URL.
+        endpoint: Kind of endpoint, from `get_endpoint`.
+        status: HTTP status code of the response, or None if the request failed
+            without one, e.g. on a connection error or timeout.
+        bytes: Size of the response body.
+        latency: Seconds from sending the request to reading the whole response,
+            or to giving up on it.
+        wait: Seconds spent waiting on the scheduler and request slots beforehand.
+    """
+    method: str
+    url: str
+    endpoint: str
+    status: Optional[int]
+    bytes: int
+    latency: float
+    wait: float
+
+
+@dataclass
+class ParseEvent:
+    """A completed parsing step, as reported to metrics hooks.
+
+    Attributes:
+        operation: Name of the parsing function, e.g. "string_to_html" or "get_posts".
+        seconds: Time the step took.
+    """
+    operation: str
+    seconds: float
+
+
+class Metrics:
+    """Thread-safe counters for the requests a Donbot makes and the pages it parses.
+
+    Requests are broken down by endpoint kind with a count, latency histogram,
+    bytes received and status codes; parsing is broken down by operation. Hooks
+    receive every event as it happens, for export to other monitoring systems.
+    """
+
+    def __init__(self, hooks: tuple[Callable, ...] = ()):
+        """Initializes empty counters.
+
+        Args:
+            hooks: Callables each passed every `RequestEvent` and `ParseEvent`.
+        """
+        self._hooks = list(hooks)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def add_hook(self, hook: Callable[[Union[RequestEvent, ParseEvent]], None]):
+        """Registers a callable to be passed every subsequent event.
+
+        Hooks run on the thread that made the request, so they should be quick.
+
+        Args:
+            hook: The callable to register.
+        """
+        self._hooks.append(hook)
+
+    def reset(self):
+        """Clears every counter."""
+        with self._lock:
+            self._requests: dict[str, dict] = {}
+            self._parsing: dict[str, dict] = {}
+
+    def record_request(self, event: RequestEvent):
+        """Counts a completed or failed request and passes it to the hooks.
+
+        Args:
+            event: The request.
+        """
+        with self._lock:
+            counters = self._request_counters(event.endpoint)
+            counters["count"] += 1
+            counters["bytes"] += event.bytes
+            counters["latency"] += event.latency
+            counters["wait"] += event.wait
+            counters["latency_histogram"][bisect.bisect_left(LATENCY_BUCKETS, event.latency)] += 1
+            counters["statuses"][event.status] = counters["statuses"].get(event.status, 0) + 1
+        self._emit(event)
+
+    def record_coalesced(self, endpoint: str):
+        """Counts a read that shared another caller's in-flight request instead of sending one.
+
+        Args:
+            endpoint: Kind of endpoint, from `get_endpoint`.
+        """
+        with self._lock:
+            self._request_counters(endpoint)["coalesced"] += 1
+
+    def _request_counters(self, endpoint: str) -> dict:
+        return self._requests.setdefault(
+            endpoint,
+            {
+                "count": 0,
+                "coalesced": 0,
+                "bytes": 0,
+                "latency": 0.0,
+                "wait": 0.0,
+                "latency_histogram": [0] * len(LATENCY_BUCKETS),
+                "statuses": {},
+            },
+        )
+
+    def record_parse(self, event: ParseEvent):
+        """Counts a completed parsing step and passes it to the hooks.
+
+        Args:
+            event: The completed parsing step.
+        """
+        with self._lock:
+            counters = self._parsing.setdefault(event.operation, {"count": 0, "seconds": 0.0})
+            counters["count"] += 1
+            counters["seconds"] += event.seconds
+        self._emit(event)
+
+    @contextmanager
+    def timed(self, operation: str) -> Iterator[None]:
+        """Records the time spent in a `with` block as a parsing step.
+
+        Args:
+            operation: Name the step is counted under.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_parse(ParseEvent(operation, time.perf_counter() - started))
+
+    def stats(self) -> dict:
+        """Returns a snapshot of every counter.
+
+        The snapshot has a "requests" dict keyed by endpoint kind, each with a
+        count, a count of reads coalesced into another caller's request, total
+        bytes, total latency and wait seconds, a latency histogram keyed by
+        bucket upper bound, and counts by status code, with requests that got
+        no response counted under None; and a "parsing" dict
+        keyed by operation, each with a count and total seconds.
+        """
+        with self._lock:
+            return {
+                "requests": {
+                    endpoint: {
+                        **counters,
+                        "latency_histogram": dict(
+                            zip(LATENCY_BUCKETS, counters["latency_histogram"])
+                        ),
+                        "statuses": dict(counters["statuses"]),
+                    }
+                    for endpoint, counters in self._requests.items()
+                },
+                "parsing": {
+                    operation: dict(counters)
+                    for operation, counters in self._parsing.items()
+                },
+            }
+
+    def _emit(self, event: Union[RequestEvent, ParseEvent]):
+        for hook in self._hooks:
+            hook(event)
@@ -0,0 +1,143 @@
+from typing import Optional
+from .donbot import Donbot
+from .operations import Post, get_thread_id
+import json
+import os
+
+__all__ = ["get_thread_id", "ThreadMirror"]
+
+
+class ThreadMirror:
+    """Local copies of threads and user isos, kept in sync by fetching only new pages.
+
+    Each feed is stored as a JSON lines file of posts in `directory`. Since the
+    posts of a feed are stored in order without gaps, the number of stored posts
+    tells which page a refresh has to start from: the last, partially synced
+    page is requested again along with any pages after it, so refreshing a long
+    thread costs one or two requests rather than one per page.
+
+    Attributes:
+        bot: Donbot instance used to fetch pages.
+        directory: Directory holding the mirrored feeds.
+    """
+
+    def __init__(self, bot: Donbot, directory: str):
+        """Initializes the mirror, creating its directory if needed.
+
+        Args:
+            bot: Donbot instance used to fetch pages.
+            directory: Directory holding the mirrored feeds.
+        """
+        self.bot = bot
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _feed_path(self, feed: str) -> str:
+        return os.path.join(self.directory, f"{feed}.jsonl")
+
+    def _state_path(self, feed: str) -> str:
+        return os.path.join(self.directory, f"{feed}.json")
+
+    def _load_state(self, feed: str) -> dict:
+        try:
+            with open(self._state_path(feed)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {"synced": 0, "last_number": -1, "bytes": 0}
+
+    def _append(self, feed: str, state: dict, posts: list[Post]):
+        """Appends new posts to a feed and then records how far it is synced.
+
+        The state file is replaced atomically after the posts are written, and
+        anything written past the recorded size is dropped before appending, so
+        an interrupted refresh leaves no partial or duplicated posts behind.
+        """
+        with open(self._feed_path(feed), "ab") as file:
+            file.truncate(state["bytes"])
+            for post in posts:
+                file.write(json.dumps(post.to_dict()).encode("utf-8") + b"\n")
+            state["bytes"] = file.tell()
+        state["synced"] += len(posts)
+        state["last_number"] = posts[-1].number
+        temp_path = f"{self._state_path(feed)}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(temp_path, self._state_path(feed))
+
+    def _load(self, feed: str) -> list[Post]:
+        state = self._load_state(feed)
+        posts = []
+        try:
+            with open(self._feed_path(feed), encoding="utf-8") as file:
+                for line in file:
+                    posts.append(Post(**json.loads(line)))
+        except FileNotFoundError:
+            pass
+        return posts[: state["synced"]]
+
+    def last_number(self, thread: str) -> int:
+        """Returns the highest post number synced for a thread, or -1 if none are.
+
+        Args:
+            thread: URL of the thread.
+        """
+        return self._load_state(get_thread_id(thread))["last_number"]
+
+    def posts(self, thread: str) -> list[Post]:
+        """Returns the locally stored posts of a thread.
+
+        Args:
+            thread: URL of the thread.
+        """
+        return self._load(get_thread_id(thread))
+
+    def refresh(self, thread: str) -> list[Post]:
+        """Fetches posts made since the last refresh of a thread and stores them.
+
+        Args:
+            thread: URL of the thread.
+
+        Returns:
+            The newly synced posts.
+        """
+        feed = get_thread_id(thread)
+        state = self._load_state(feed)
+        new_posts = self.bot.get_posts(thread, state["last_number"] + 1)
+        new_posts = [post for post in new_posts if post.number > state["last_number"]]
+        if new_posts:
+            self._append(feed, state, new_posts)
+        return new_posts
+
+    def _iso_feed(self, thread: str, user_id: str) -> str:
+        return f"{get_thread_id(thread)}-u{user_id}"
+
+    def iso_posts(self, thread: str, user_id: str) -> list[Post]:
+        """Returns the locally stored posts of a user's iso in a thread.
+
+        Args:
+            thread: URL of the thread.
+            user_id: The forum's id for the user.
+        """
+        return self._load(self._iso_feed(thread, user_id))
+
+    def refresh_iso(
+        self, thread: str, user: Optional[str] = None, user_id: Optional[str] = None
+    ) -> list[Post]:
+        """Fetches a user's posts made since the last refresh of their iso and stores them.
+
+        Args:
+            thread: URL of the thread.
+            user: Name of the user; only needed if `user_id` is not given.
+            user_id: The forum's id for the user, which saves a search request.
+
+        Returns:
+            The newly synced posts.
+        """
+        user_id = user_id or self.bot.get_user_id(user)
+        feed = self._iso_feed(thread, user_id)
+        state = self._load_state(feed)
+        new_posts = self.bot.get_iso_posts(thread, user_id, state["synced"])
+        new_posts = [post for post in new_posts if post.number > state["last_number"]]
+        if new_posts:
+            self._append(feed, state, new_posts)
+        return new_posts
@@ -1,37 +1,76 @@
-from lxml import html
+from lxml import etree, html
 from lxml.html import HtmlElement
 from math import floor
 from dataclasses import dataclass, asdict
+from typing import Iterable
+from urllib.parse import parse_qs, urlsplit
 import json
+import sys
 
 
 __all__ = [
     "load_credentials",
     "make_login_form",
+    "is_login_page",
+    "is_posting_form",
     "count_posts",
     "get_thread_page_urls",
+    "set_posts_per_page",
+    "get_thread_id",
+    "get_page_start",
+    "get_page_location",
+    "get_content",
+    "plan_thread_page_urls",
     "get_user_id",
     "get_activity_overview",
     "get_posts",
+    "get_print_posts",
     "make_submit_post_form",
     "get_edit_post_form",
 ]
 
+# Fields of `Post` whose values repeat across many posts, and are interned so
+# that posts share one copy of each value.
+INTERNED_FIELDS = ("user", "user_id", "page", "forum", "thread")
+
+
 @dataclass
 class Post:
     """Dataclass representing a post on the MafiaScum forum.
 
+    Posts are slotted, with no per-instance `__dict__`, and share one copy of
+    each of their `INTERNED_FIELDS` values, since archives hold many of them.
+
+    A post parsed with `lazy=True` keeps its content element rather than its
+    content, and serializes it the first time `content` is read. Until then the
+    post keeps the whole page's HTML alive, so posts held long after parsing
+    should have their content read or be parsed eagerly.
+
     Attributes:
         number: The post number based on its index within the thread.
         id: The unique id associated by the forum with the post.
         user: The name of the user who made the post.
         user_id: The id number associated by the forum with the user.
-        content: The content of the post (html string)
+        content: The content of the post (html string, or plain text if parsed
+            with `text_only=True`)
         time: The time the post was made (unparsed string)
         page: The url of the page of the thread containing the post.
         forum: The id of the forum the post was made in.
         thread: The url of the thread the post was made in.
     """
+    __slots__ = (
+        "number",
+        "id",
+        "user",
+        "user_id",
+        "content",
+        "time",
+        "page",
+        "forum",
+        "thread",
+        "_content_html",
+    )
+
     number: int
     id: str
     user: str
@@ -42,11 +81,70 @@ class Post:
     forum: str
     thread: str
 
+    def __post_init__(self):
+        intern_fields(self)
+
+    @classmethod
+    def lazy(cls, content_html: HtmlElement, text_only: bool = False, **fields) -> "Post":
+        """Returns a post whose content is extracted from its HTML when first read.
+
+        Args:
+            content_html: The post's content div.
+            text_only: Whether the content is extracted as plain text rather than HTML.
+            fields: Every other field of the post.
+        """
+        post = cls.__new__(cls)
+        for name, value in fields.items():
+            setattr(post, name, value)
+        post._content_html = (content_html, text_only)
+        intern_fields(post)
+        return post
+
+    def __getattr__(self, name: str):
+        # only reached for unset slots: the content of a lazy post until it is
+        # first read, or the lazy content of a post that has none
+        if name != "content":
+            raise AttributeError(name)
+        self.content = get_content(*self._content_html)
+        del self._content_html
+        return self.content
+
+    def __getstate__(self) -> dict:
+        # reading every field extracts lazy content, as HTML elements can't be pickled
+        return {name: getattr(self, name) for name in POST_FIELDS}
+
+    def __setstate__(self, state: dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+        intern_fields(self)
+
     def to_dict(self):
         """Returns the post as a dictionary.
         """
         return asdict(self)
-    
+
+
+POST_FIELDS = tuple(Post.__dataclass_fields__)
+
+
+def intern_fields(post: Post):
+    """Replaces a post's `INTERNED_FIELDS` strings with their interned copies.
+
+    Args:
+        post: The post to update in place.
+    """
+    for name in INTERNED_FIELDS:
+        value = getattr(post, name)
+        if type(value) is str:
+            setattr(post, name, sys.intern(value))
+
+
+# Thread page queries are compiled once here rather than on every call.
+POSTBODY_PATH = etree.XPath("//div[@class='postbody']")
+POST_COUNT_PATH = etree.XPath("//div[@class='pagination']/text()")
+USERNAME_CLASSES = ("username", "username-coloured")
+
+
 def string_to_html(string: str|bytes) -> HtmlElement:
     """Returns an HTML element from a string, ensuring a complete document before parsing.
 
@@ -95,6 +193,18 @@ def make_login_form(
     }
 
 
+def is_login_page(page_html: HtmlElement) -> bool:
+    """Returns whether the forum served its login form instead of the requested page.
+
+    The forum does this for pages that need an authenticated session when the
+    session is missing or has expired.
+
+    Args:
+        page_html: HTML of the served page.
+    """
+    return len(page_html.xpath("//form[@id='login']")) > 0
+
+
 def get_user_id(user_posts_html: HtmlElement) -> str:
     """Returns the numeric id that the site uses to identify a user.
 
@@ -138,28 +248,29 @@ def count_posts(thread_html: HtmlElement) -> int:
     Args:
         thread_html: HTML of a page from the thread to count posts in.
     """
-    post_count_path = "//div[@class='pagination']/text()"
-    post_count_element = next(
-        el for el in thread_html.xpath(post_count_path) if el.strip()
-    )
+    post_count_element = next(el for el in POST_COUNT_PATH(thread_html) if el.strip())
     return int("".join([c for c in post_count_element if c.isdigit()]))
 
 
 def get_thread_page_urls(
-    thread: str, thread_page_html: HtmlElement, start: int = 0, end: int = -1
+    thread: str,
+    thread_page_html: HtmlElement,
+    start: int = 0,
+    end: int = -1,
+    posts_per_page: int = 25,
 ) -> list[str]:
     """Returns the URLs of the pages of a thread.
 
     Args:
-        thread: URL of the thread.
+        thread: URL of the thread, including its `ppp` parameter if not the default.
         thread_page_html: HTML of a page from the thread.
         end: number of pages to retrieve.
+        posts_per_page: number of posts shown on each page of the thread.
     """
     end = end if end != -1 else count_posts(thread_page_html)
 
-    posts_per_page = 25
-    start_page_id = floor(start / posts_per_page) * posts_per_page
-    end_page_id = floor(end / posts_per_page) * posts_per_page
+    start_page_id = get_page_start(start, posts_per_page)
+    end_page_id = get_page_start(end, posts_per_page)
 
     return [
         f"{thread}&start={str(page_id)}"
@@ -167,39 +278,175 @@ def get_thread_page_urls(
     ]
 
 
-def get_post(post_html: HtmlElement, page_url: str = '') -> Post:  # sourcery skip: merge-dict-assign
+def get_thread_id(thread: str) -> str:
+    """Returns the forum's id for a thread from its URL.
+
+    Args:
+        thread: URL of the thread.
+    """
+    return parse_qs(urlsplit(thread).query)["t"][0]
+
+
+def set_posts_per_page(thread: str, posts_per_page: int = 25) -> str:
+    """Returns a thread URL that shows the specified number of posts per page.
+
+    The site's default of 25 posts per page leaves the URL unchanged.
+
+    Args:
+        thread: URL of the thread.
+        posts_per_page: number of posts to show on each page of the thread.
+    """
+    if posts_per_page == 25:
+        return thread
+    return f"{thread}&ppp={posts_per_page}"
+
+
+def get_page_start(post_number: int, posts_per_page: int = 25) -> int:
+    """Returns the `start` offset of the thread page containing a post.
+
+    Args:
+        post_number: number of the post within the thread.
+        posts_per_page: number of posts shown on each page of the thread.
+    """
+    return floor(post_number / posts_per_page) * posts_per_page
+
+
+def plan_thread_page_urls(
+    thread: str, post_numbers: Iterable[int], posts_per_page: int = 25
+) -> list[str]:
+    """Returns the minimal list of page URLs covering a possibly sparse set of posts.
+
+    Each page is requested at most once and pages are ordered as in the thread.
+
+    Args:
+        thread: URL of the thread.
+        post_numbers: numbers of the posts to retrieve.
+        posts_per_page: number of posts shown on each page of the thread.
+    """
+    page_starts = sorted({get_page_start(n, posts_per_page) for n in post_numbers})
+    return [f"{thread}&start={str(page_id)}" for page_id in page_starts]
+
+
+def get_page_location(page_url: str) -> tuple[str, str]:
+    """Returns the forum and thread fields shared by every post on a thread page.
+
+    Args:
+        page_url: The URL of the page.
+    """
+    query = parse_qs(urlsplit(page_url).query)
+    return query.get("f", [""])[0], query.get("t", [""])[0]
+
+
+def get_content(content_html: HtmlElement, text_only: bool = False) -> str:
+    """Returns the content of a post from its content div.
+
+    Args:
+        content_html: The post's content div.
+        text_only: Whether to return the content's plain text rather than its HTML.
+    """
+    if text_only:
+        return content_html.text_content().strip()
+    # strip the content div's own tags, <div class="content"> and </div>
+    return html.tostring(content_html, with_tail=False).decode("UTF-8")[21:-6]
+
+
+def make_post(
+    content_html: HtmlElement, lazy: bool = False, text_only: bool = False, **fields
+) -> Post:
+    """Returns a post with its content extracted now or, if `lazy`, when first read.
+
+    Args:
+        content_html: The post's content div.
+        lazy: Whether to extract the content when it is first read.
+        text_only: Whether to extract the content as plain text rather than HTML.
+        fields: Every other field of the post.
+    """
+    if lazy:
+        return Post.lazy(content_html, text_only, **fields)
+    return Post(content=get_content(content_html, text_only), **fields)
+
+
+def get_post(post_html: HtmlElement, page_url: str = '') -> Post:
     """Returns the data of a post from the post HTML.
 
     Args:
         post_html: The HTML of a post.
         page_url: The URL of the page containing the post.
     """
-    post_number_path = ".//span[contains(@class, 'post-number-bolded')]//text()"
-    post_user_path = ".//a[@class='username' or @class='username-coloured']/text()"
-    post_user_id_path = ".//a[@class='username' or @class='username-coloured']/@href"
-    post_content_path = ".//div[@class='content']"
-    post_timestamp_path = ".//p[@class='author modified']/text()"
-    post_id_path = ".//a/@href"
-
-    post = {}
-    post["number"] = int(post_html.xpath(post_number_path)[0][1:])
-    post["id"] = post_html.xpath(post_id_path)[0]
-    post["id"] = post["id"][post["id"].rfind("#") + 2 :]
-    post["user"] = post_html.xpath(post_user_path)[0]
-    post["user_id"] = post_html.xpath(post_user_id_path)[0]
-    post["user_id"] = post["user_id"][post["user_id"].rfind("=") + 1 :]
-    post["content"] = html.tostring(post_html.xpath(post_content_path)[0])
-    post["content"] = post["content"].decode("UTF-8").strip()[21:-6]
-    post["time"] = post_html.xpath(post_timestamp_path)[-1]
-    post["time"] = post["time"][post["time"].find("» ") + 2 :].strip()
-    post["page"] = page_url
-    post["forum"] = page_url[page_url.find("f=") + 2 : page_url.find("&t=")]
-    post["thread"] = page_url[page_url.find("&t=") + 3 : page_url.find("&start")]
-    return Post(**post)
+    return read_post(post_html, page_url, *get_page_location(page_url))
+
+
+def read_post(
+    post_html: HtmlElement,
+    page_url: str,
+    forum: str,
+    thread: str,
+    lazy: bool = False,
+    text_only: bool = False,
+) -> Post:
+    """Returns the data of a post from the post HTML, walking the post header once.
+
+    The post's number, id, author and time all come before its content, so the
+    walk stops at the content div and never descends into the post's body.
+
+    Args:
+        post_html: The HTML of a post.
+        page_url: The URL of the page containing the post.
+        forum: The forum field of the page, from `get_page_location`.
+        thread: The thread field of the page, from `get_page_location`.
+        lazy: Whether to extract the post's content when it is first read.
+        text_only: Whether to extract the post's content as plain text rather than HTML.
+    """
+    post_link = number_span = user_link = author_line = content = None
+    for element in post_html.iter("a", "span", "p", "div"):
+        tag, element_class = element.tag, element.get("class")
+        if tag == "a":
+            if post_link is None and element.get("href") is not None:
+                post_link = element
+            if user_link is None and element_class in USERNAME_CLASSES:
+                user_link = element
+        elif tag == "span":
+            if number_span is None and "post-number-bolded" in (element_class or ""):
+                number_span = element
+        elif tag == "p":
+            if element_class == "author modified":
+                author_line = element
+        elif element_class == "content":
+            content = element
+            break
+    if None in (post_link, number_span, user_link, author_line, content):
+        raise IndexError("Post is missing its number, id, author, time or content")
+
+    post_id = post_link.get("href")
+    user_id = user_link.get("href")
+    # the time is the author line's last text, after the author's name and a "»"
+    post_time = [
+        text
+        for text in (author_line.text, *(child.tail for child in author_line))
+        if text is not None
+    ][-1]
+    return make_post(
+        content,
+        lazy,
+        text_only,
+        number=int(next(number_span.itertext())[1:]),
+        id=post_id[post_id.rfind("#") + 2 :],
+        user=user_link.text,
+        user_id=user_id[user_id.rfind("=") + 1 :],
+        time=post_time[post_time.find("» ") + 2 :].strip(),
+        page=page_url,
+        forum=forum,
+        thread=thread,
+    )
 
 
 def get_posts(
-    thread_page_html: HtmlElement, start: int = 0, end: int | float = -1, page_url: str = ''
+    thread_page_html: HtmlElement,
+    start: int = 0,
+    end: int | float = -1,
+    page_url: str = '',
+    lazy: bool = False,
+    text_only: bool = False,
 ) -> list[Post]:
     """
     Returns a sequence of posts from a thread.
@@ -209,16 +456,60 @@ def get_posts(
         page_url: URL of the page containing the posts.
         start: Lowest post number to retrieve.
         end: Highest post number to retrieve.
+        lazy: Whether to extract each post's content when it is first read, so that
+            reads of only the other fields skip serializing it.
+        text_only: Whether to extract post content as plain text rather than HTML.
     """
     posts = []
     end = end if end != -1 else float("inf")
-    for raw_post in thread_page_html.xpath("//div[@class='postbody']"):
-        post = get_post(raw_post, page_url)
+    forum, thread = get_page_location(page_url)
+    for raw_post in POSTBODY_PATH(thread_page_html):
+        post = read_post(raw_post, page_url, forum, thread, lazy, text_only)
         if post.number >= start and post.number <= end:
             posts.append(post)
     return posts
 
 
+def get_print_posts(
+    print_page_html: HtmlElement,
+    first_number: int = 0,
+    page_url: str = '',
+    lazy: bool = False,
+    text_only: bool = False,
+) -> list[Post]:
+    """Returns every post on a page of a thread's printable view (`&view=print`).
+
+    The printable view omits post and user ids and post numbers, so `id` and
+    `user_id` are left empty and posts are numbered from the page's `start`.
+
+    Args:
+        print_page_html: HTML of a page of the printable view of a thread.
+        first_number: number of the first post on the page, i.e. its `start` offset.
+        page_url: URL of the page containing the posts.
+        lazy: Whether to extract each post's content when it is first read.
+        text_only: Whether to extract post content as plain text rather than HTML.
+    """
+    posts = []
+    forum, thread = get_page_location(page_url)
+    for index, raw_post in enumerate(print_page_html.xpath("//div[@class='post']")):
+        posts.append(
+            make_post(
+                raw_post.xpath(".//div[@class='content']")[0],
+                lazy,
+                text_only,
+                number=first_number + index,
+                id="",
+                user=raw_post.xpath(".//div[@class='author']/strong//text()")[0],
+                user_id="",
+                time=raw_post.xpath(".//div[@class='date']/strong//text()")[0].strip(),
+                page=page_url,
+                forum=forum,
+                thread=thread,
+            )
+        )
+    return posts
+
+
 def make_submit_post_form(
     make_post_page_html: HtmlElement, post_content: str
 ) -> dict[str, str]:
@@ -240,6 +531,19 @@ def make_submit_post_form(
     return post_data
 
 
+def is_posting_form(page_html: HtmlElement) -> bool:
+    """Returns whether a page holds a form for making or editing a post.
+
+    The forum answers a submission with the form again, rather than saving it,
+    when posts or edits made since the form was served outdate it.
+
+    Args:
+        page_html: HTML of the page.
+    """
+    form_path = "//input[@name='topic_cur_post_id' or @name='edit_post_message_checksum']"
+    return len(page_html.xpath(form_path)) > 0
+
+
 def get_edit_post_form(
     edit_post_page_html: HtmlElement, post_content: str
 ) -> dict[str, str]:
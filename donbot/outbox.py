@@ -0,0 +1,158 @@
+from typing import Optional
+from .donbot import Donbot
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+import hashlib
+import json
+import os
+import time
+
+__all__ = ["OutgoingPM", "PMOutbox"]
+
+
+@dataclass
+class OutgoingPM:
+    """A private message queued in a `PMOutbox`.
+
+    Attributes:
+        key: Identifies the message in the outbox journal.
+        recipients: Usernames of the recipients.
+        subject: Subject heading of the private message.
+        content: Content of the private message.
+    """
+    key: str
+    recipients: list[str]
+    subject: str
+    content: str = field(repr=False)
+
+
+class PMOutbox:
+    """Sends batches of private messages, journaling each one so a run can resume.
+
+    Every recipient is resolved before the first message goes out, and compose
+    pages for upcoming messages are fetched while earlier messages wait for the
+    scheduler's POST budget, so a batch takes about as long as its POSTs are
+    rate limited to. The journal is an append-only JSON lines file recording
+    when each message is attempted and when it is sent. Rerunning a batch with
+    the same journal skips messages already sent.
+
+    Attributes:
+        bot: Donbot instance the messages are sent with.
+        journal_path: Path of the journal file.
+        messages: Messages added to the outbox, in sending order.
+    """
+
+    def __init__(self, bot: Donbot, journal_path: str):
+        """Initializes the outbox, reading the journal of any previous run.
+
+        Args:
+            bot: Donbot instance the messages are sent with.
+            journal_path: Path of the journal file; created if it doesn't exist.
+        """
+        self.bot = bot
+        self.journal_path = journal_path
+        self.messages: list[OutgoingPM] = []
+        self._status: dict[str, str] = {}
+        try:
+            with open(journal_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:  # a line cut short by a crash
+                        continue
+                    self._status[entry["key"]] = entry["status"]
+        except FileNotFoundError:
+            pass
+
+    def add(
+        self,
+        recipients: str | list[str],
+        subject: str = "Re: ",
+        content: str = ".",
+        key: Optional[str] = None,
+    ) -> str:
+        """Queues a private message and returns its journal key.
+
+        Args:
+            recipients: recipient(s) of the private message.
+            subject: subject heading for the private message; defaults to "Re: ".
+            content: content of the private message; defaults to a period.
+            key: Identifies the message in the journal; defaults to a hash of the message.
+        """
+        recipients = recipients if isinstance(recipients, list) else [recipients]
+        if key is None:
+            message = json.dumps([recipients, subject, content])
+            key = hashlib.sha256(message.encode("utf-8")).hexdigest()[:16]
+        self.messages.append(OutgoingPM(key, recipients, subject, content))
+        return key
+
+    @property
+    def sent(self) -> list[str]:
+        """Keys of the messages the journal records as sent."""
+        return [key for key, status in self._status.items() if status == "sent"]
+
+    @property
+    def uncertain(self) -> list[str]:
+        """Keys of messages attempted in a run that stopped before confirming them.
+
+        These may or may not have been delivered, so `send_all` skips them
+        unless told otherwise.
+        """
+        return [key for key, status in self._status.items() if status == "attempted"]
+
+    def pending(self, resend_uncertain: bool = False) -> list[OutgoingPM]:
+        """Returns the queued messages that `send_all` would send.
+
+        Args:
+            resend_uncertain: Whether to include messages whose delivery is uncertain.
+        """
+        skipped = {"sent"} if resend_uncertain else {"sent", "attempted"}
+        return [pm for pm in self.messages if self._status.get(pm.key) not in skipped]
+
+    def _journal(self, key: str, status: str):
+        with open(self.journal_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps({"key": key, "status": status, "time": time.time()}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._status[key] = status
+
+    def send_all(self, prefetch: int = 2, resend_uncertain: bool = False) -> list[str]:
+        """Sends every pending message and returns the keys of those sent.
+
+        Args:
+            prefetch: Number of compose pages fetched ahead of the message being sent.
+            resend_uncertain: Whether to resend messages whose delivery is uncertain.
+
+        Raises:
+            requests.HTTPError: if the forum rejects a message; it is journaled as failed
+                and retried by the next run.
+        """
+        pending = self.pending(resend_uncertain)
+        if not pending:
+            return []
+        user_ids = self.bot.resolve_user_ids(
+            name for pm in pending for name in pm.recipients
+        )
+
+        sent = []
+        with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as executor:
+            compose_pages: list[Future] = [
+                executor.submit(self.bot._get_pm_compose_page)
+                for _ in pending[: prefetch + 1]
+            ]
+            for index, pm in enumerate(pending):
+                pm_page_html = compose_pages[index].result()
+                if index + prefetch + 1 < len(pending):
+                    compose_pages.append(executor.submit(self.bot._get_pm_compose_page))
+
+                self._journal(pm.key, "attempted")
+                recipient_uids = [user_ids[name] for name in pm.recipients]
+                response = self.bot._submit_pm(
+                    pm_page_html, recipient_uids, pm.subject, pm.content
+                )
+                if not response.ok:
+                    self._journal(pm.key, "failed")
+                    response.raise_for_status()
+                self._journal(pm.key, "sent")
+                sent.append(pm.key)
+        return sent
@@ -0,0 +1,139 @@
+from typing import TYPE_CHECKING, Optional
+from .scheduler import PRIORITY_BULK
+from lxml.html import HtmlElement
+from requests import RequestException
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .donbot import Donbot
+
+__all__ = ["WarmForms"]
+
+
+class WarmForms:
+    """Posting and edit forms fetched ahead of time, so a write needs only its POST.
+
+    Each registered form page is fetched as soon as it is added and fetched
+    again by a background thread every `refresh_interval` seconds, well within
+    the forum's form token lifetime. A form taken for a write is fetched again
+    once the write calls `refresh_taken`, since the write itself outdates it.
+
+    Attributes:
+        bot: Donbot instance the forms are fetched with.
+        refresh_interval: Seconds between refreshes of each form.
+    """
+
+    def __init__(self, bot: "Donbot", refresh_interval: float = 300.0):
+        """Initializes an empty set of forms; no thread is started until one is added.
+
+        Args:
+            bot: Donbot instance the forms are fetched with.
+            refresh_interval: Seconds between refreshes of each form.
+        """
+        self.bot = bot
+        self.refresh_interval = refresh_interval
+        self._forms: dict[str, Optional[tuple[HtmlElement, float]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._forms
+
+    def add(self, url: str):
+        """Fetches a form page now and keeps it fresh from then on.
+
+        Args:
+            url: URL of the posting or edit page.
+        """
+        with self._lock:
+            self._forms.setdefault(url, None)
+        self.refresh(url)
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def discard(self, url: str):
+        """Stops keeping a form page fresh.
+
+        Args:
+            url: URL of the posting or edit page.
+        """
+        with self._lock:
+            self._forms.pop(url, None)
+
+    def take(self, url: str) -> Optional[HtmlElement]:
+        """Returns the fresh form page for a URL, if any, leaving none until it is refetched.
+
+        Args:
+            url: URL of the posting or edit page.
+        """
+        with self._lock:
+            form = self._forms.get(url)
+            if form is None:
+                return None
+            self._forms[url] = None
+        page_html, fetched_at = form
+        if time.monotonic() - fetched_at > 2 * self.refresh_interval:
+            return None
+        return page_html
+
+    def refresh(self, url: str):
+        """Fetches a registered form page again.
+
+        Args:
+            url: URL of the posting or edit page.
+        """
+        page_html = self.bot._get_html(url, PRIORITY_BULK, login=True)
+        with self._lock:
+            if url in self._forms:
+                self._forms[url] = (page_html, time.monotonic())
+
+    def refresh_taken(self):
+        """Wakes the refresh thread to refetch the forms taken since it last ran."""
+        self._wake.set()
+
+    def close(self):
+        """Forgets every form and stops the refresh thread."""
+        with self._lock:
+            self._forms.clear()
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self._next_refresh())
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    url
+                    for url, form in self._forms.items()
+                    if form is None or now - form[1] >= self.refresh_interval
+                ]
+            for url in due:
+                try:
+                    self.refresh(url)
+                except RequestException:
+                    pass  # retried next pass; meanwhile a write fetches its own form
+
+    def _next_refresh(self) -> float:
+        """Returns the seconds until the stalest form is due for a refresh.
+
+        Forms taken for a write are left for `refresh_taken`, so that they are not
+        refetched before the write that outdates them is sent.
+        """
+        with self._lock:
+            fetched = [form[1] for form in self._forms.values() if form is not None]
+        if not fetched:
+            return self.refresh_interval
+        return max(0.0, min(fetched) + self.refresh_interval - time.monotonic())
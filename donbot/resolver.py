@@ -0,0 +1,172 @@
+from typing import Iterable, Optional
+from .operations import Post
+import json
+import os
+import threading
+
+__all__ = ["UserIdResolver", "PostIdCache"]
+
+
+class UserIdResolver:
+    """Cache of the ids the forum uses for usernames, optionally persisted to disk.
+
+    Usernames are matched case-insensitively, as on the forum. Entries are
+    added by Donbot from user searches and from the author of every post it
+    parses, so most names are known before they are ever looked up.
+
+    Attributes:
+        path: JSON file the cache is persisted to; None keeps it in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initializes the resolver, loading any previously saved entries.
+
+        Args:
+            path: JSON file the cache is persisted to; None keeps it in memory only.
+        """
+        self.path = path
+        self._user_ids: dict[str, str] = {}
+        self._unsaved = False
+        self._lock = threading.Lock()
+        if path is not None:
+            self._user_ids.update(self._read())
+
+    def _read(self) -> dict[str, str]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def __contains__(self, username: str) -> bool:
+        return username.lower() in self._user_ids
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def get(self, username: str) -> Optional[str]:
+        """Returns the id of a user if it is known.
+
+        Args:
+            username: The user's name.
+        """
+        return self._user_ids.get(username.lower())
+
+    def add(self, username: str, user_id: str):
+        """Records the id of a user.
+
+        Args:
+            username: The user's name.
+            user_id: The forum's id for the user.
+        """
+        with self._lock:
+            if self._user_ids.get(username.lower()) != user_id:
+                self._user_ids[username.lower()] = user_id
+                self._unsaved = True
+
+    def observe_posts(self, posts: Iterable[Post]):
+        """Records the author ids of parsed posts and saves any new entries.
+
+        Args:
+            posts: Posts whose `user` and `user_id` fields are recorded.
+        """
+        for post in posts:
+            if post.user and post.user_id:
+                self.add(post.user, post.user_id)
+        self.save()
+
+    def save(self):
+        """Writes new entries to disk, merged with entries saved by other processes."""
+        if self.path is None or not self._unsaved:
+            return
+        with self._lock:
+            user_ids = {**self._read(), **self._user_ids}
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(user_ids, file)
+            os.replace(temp_path, self.path)
+            self._user_ids = user_ids
+            self._unsaved = False
+
+
+class PostIdCache:
+    """Cache of the ids the forum uses for posts, by thread and post number.
+
+    Donbot records the id of every post it parses, so edits of posts it has
+    seen before, such as a votecount bot's reserved posts, skip looking the
+    post up. A post's number only changes if an earlier post is deleted, in
+    which case the next read of its page records the new id.
+
+    Attributes:
+        path: JSON file the cache is persisted to; None keeps it in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initializes the cache, loading any previously saved entries.
+
+        Args:
+            path: JSON file the cache is persisted to; None keeps it in memory only.
+        """
+        self.path = path
+        self._post_ids: dict[str, dict[str, str]] = {}
+        self._unsaved = False
+        self._lock = threading.Lock()
+        if path is not None:
+            self._post_ids.update(self._read())
+
+    def _read(self) -> dict[str, dict[str, str]]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, thread_id: str, post_number: int) -> Optional[str]:
+        """Returns the id of a post if it is known.
+
+        Args:
+            thread_id: The forum's id for the thread.
+            post_number: The post's number within the thread.
+        """
+        return self._post_ids.get(thread_id, {}).get(str(post_number))
+
+    def add(self, thread_id: str, post_number: int, post_id: str):
+        """Records the id of a post.
+
+        Args:
+            thread_id: The forum's id for the thread.
+            post_number: The post's number within the thread.
+            post_id: The forum's id for the post.
+        """
+        with self._lock:
+            thread_post_ids = self._post_ids.setdefault(thread_id, {})
+            if thread_post_ids.get(str(post_number)) != post_id:
+                thread_post_ids[str(post_number)] = post_id
+                self._unsaved = True
+
+    def observe_posts(self, thread_id: str, posts: Iterable[Post]):
+        """Records the ids of parsed posts and saves any new entries.
+
+        Args:
+            thread_id: The forum's id for the thread the posts are from.
+            posts: Posts whose `number` and `id` fields are recorded.
+        """
+        for post in posts:
+            if post.id:
+                self.add(thread_id, post.number, post.id)
+        self.save()
+
+    def save(self):
+        """Writes new entries to disk, merged with entries saved by other processes."""
+        if self.path is None or not self._unsaved:
+            return
+        with self._lock:
+            post_ids = self._read()
+            for thread_id, thread_post_ids in self._post_ids.items():
+                post_ids[thread_id] = {**post_ids.get(thread_id, {}), **thread_post_ids}
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(post_ids, file)
+            os.replace(temp_path, self.path)
+            self._post_ids = post_ids
+            self._unsaved = False
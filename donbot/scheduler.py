@@ -0,0 +1,209 @@
+from typing import Optional
+from urllib.parse import urlsplit
+import heapq
+import itertools
+import math
+import threading
+import time
+
+__all__ = [
+    "PRIORITY_WRITE",
+    "PRIORITY_READ",
+    "PRIORITY_BULK",
+    "TokenBucket",
+    "RequestScheduler",
+    "get_default_scheduler",
+]
+
+# lower values are served first when requests wait on the same budget
+PRIORITY_WRITE = 0
+PRIORITY_READ = 10
+PRIORITY_BULK = 20
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of up to `capacity`.
+
+    Attributes:
+        rate: Tokens added per second; `math.inf` for no limit.
+        capacity: Maximum number of tokens the bucket holds.
+        tokens: Tokens currently available.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """Initializes a full bucket.
+
+        Args:
+            rate: Tokens added per second; `math.inf` for no limit.
+            capacity: Maximum number of tokens the bucket holds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def time_until_token(self, now: float) -> float:
+        """Returns the seconds until a token is available, refilling the bucket first.
+
+        Args:
+            now: The current `time.monotonic()` value.
+        """
+        if math.isinf(self.rate):
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Removes a token; call only once `time_until_token` has returned 0."""
+        if not math.isinf(self.rate):
+            self.tokens -= 1
+
+
+class RequestScheduler:
+    """Rate limits requests with a token bucket per host and per budget.
+
+    GET and POST requests draw on separate budgets. Requests waiting on the
+    same budget are admitted in priority order and first come, first served
+    within a priority, so a votecount edit is not stuck behind a bulk scrape.
+    One scheduler is shared by every Donbot in the process by default, see
+    `get_default_scheduler`.
+
+    Attributes:
+        get_rate: Default GET requests per second for a host.
+        get_burst: Default number of GET requests a host allows back to back.
+        post_rate: Default POST requests per second for a host.
+        post_burst: Default number of POST requests a host allows back to back.
+    """
+
+    def __init__(
+        self,
+        get_rate: float = 10.0,
+        get_burst: float = 10.0,
+        post_rate: float = 1 / 3,
+        post_burst: float = 1.0,
+    ):
+        """Initializes the scheduler with the default budgets for every host.
+
+        Args:
+            get_rate: Default GET requests per second for a host.
+            get_burst: Default number of GET requests a host allows back to back.
+            post_rate: Default POST requests per second for a host.
+            post_burst: Default number of POST requests a host allows back to back.
+        """
+        self.get_rate = get_rate
+        self.get_burst = get_burst
+        self.post_rate = post_rate
+        self.post_burst = post_burst
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._last_sent: dict[tuple[str, str], float] = {}
+        self._waiters: dict[tuple[str, str], list] = {}
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _key(url: str, method: str) -> tuple[str, str]:
+        return urlsplit(url).netloc.lower(), "POST" if method.upper() == "POST" else "GET"
+
+    def _bucket(self, key: tuple[str, str]) -> TokenBucket:
+        if key not in self._buckets:
+            if key[1] == "POST":
+                self._buckets[key] = TokenBucket(self.post_rate, self.post_burst)
+            else:
+                self._buckets[key] = TokenBucket(self.get_rate, self.get_burst)
+        return self._buckets[key]
+
+    def configure(
+        self,
+        url: str,
+        method: str = "GET",
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        interval: Optional[float] = None,
+    ):
+        """Sets the budget for one kind of request to a host.
+
+        Args:
+            url: Any URL on the host to configure.
+            method: "GET" or "POST".
+            rate: Requests per second allowed.
+            burst: Number of requests allowed back to back.
+            interval: Alternative to `rate`: seconds between requests; 0 for no limit.
+        """
+        if interval is not None:
+            rate = 1 / interval if interval > 0 else math.inf
+        with self._condition:
+            bucket = self._bucket(self._key(url, method))
+            bucket.rate = rate if rate is not None else bucket.rate
+            bucket.capacity = burst if burst is not None else bucket.capacity
+            bucket.tokens = min(bucket.tokens, bucket.capacity)
+            self._condition.notify_all()
+
+    def require_interval(self, url: str, method: str, interval: float):
+        """Spaces one kind of request to a host at least `interval` seconds apart.
+
+        Unlike `configure`, this never loosens the budget: the host is held to
+        the longest interval any caller has required, and never to less than
+        the scheduler's default, so one client sharing the scheduler can't lift
+        another's limit.
+
+        Args:
+            url: Any URL on the host to limit.
+            method: "GET" or "POST".
+            interval: Seconds between requests; 0 leaves the budget as it is.
+        """
+        with self._condition:
+            bucket = self._bucket(self._key(url, method))
+            if interval > 0 and interval * bucket.rate > 1:
+                self.configure(url, method, interval=interval)
+
+    def acquire(
+        self,
+        url: str,
+        method: str = "GET",
+        priority: int = PRIORITY_READ,
+        interval: Optional[float] = None,
+    ):
+        """Blocks until a request may be sent under its host's budget.
+
+        Args:
+            url: URL of the request.
+            method: HTTP method of the request.
+            priority: Lower values are admitted first; see the PRIORITY_ constants.
+            interval: If specified, seconds that must also have passed since the
+                last request of the same kind to the host, for this request only.
+        """
+        key = self._key(url, method)
+        ticket = (priority, next(self._tickets))
+        with self._condition:
+            waiters = self._waiters.setdefault(key, [])
+            heapq.heappush(waiters, ticket)
+            self._condition.notify_all()
+            try:
+                while True:
+                    if waiters[0] != ticket:
+                        self._condition.wait()
+                        continue
+                    bucket = self._bucket(key)
+                    now = time.monotonic()
+                    wait = bucket.time_until_token(now)
+                    if interval is not None:
+                        last_sent = self._last_sent.get(key, -math.inf)
+                        wait = max(wait, last_sent + interval - now)
+                    if wait <= 0:
+                        bucket.take()
+                        self._last_sent[key] = now
+                        return
+                    self._condition.wait(wait)
+            finally:
+                waiters.remove(ticket)
+                heapq.heapify(waiters)
+                self._condition.notify_all()
+
+
+_default_scheduler = RequestScheduler()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """Returns the scheduler shared by every Donbot in the process."""
+    return _default_scheduler
@@ -0,0 +1,168 @@
+from typing import Iterator, Optional
+from .bulk import is_thread_page_url, page_sort_key
+from .cache import LOGIN_FORM_MARKER, normalize_url
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+__all__ = ["PageStore"]
+
+
+class PageStore:
+    """Archive of raw thread pages, compressed and deduplicated by content hash.
+
+    Each distinct page body is stored once, zlib-compressed, in a file named
+    by the SHA-256 of the body under `objects/`. An SQLite index in
+    `index.sqlite3` records every fetch as its URL, fetch time and body hash,
+    keyed by the normalized URL, so a page fetched many times unchanged costs one index row per
+    fetch. Unlike `PageCache`, nothing expires or is evicted: the store keeps
+    raw pages so that improved parsers can be rerun without the network:
+
+        posts = bulk.parse_pages(store.iter_pages())
+
+    Object files are written to a temporary name and atomically renamed, and
+    SQLite serializes writers, so several processes can share one store.
+
+    Attributes:
+        directory: Directory holding the store.
+        level: zlib compression level for new bodies.
+    """
+
+    def __init__(self, directory: str, level: int = 6):
+        """Initializes the store, creating its directory and index if needed.
+
+        Args:
+            directory: Directory holding the store.
+            level: zlib compression level for new bodies.
+        """
+        self.directory = directory
+        self.level = level
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"),
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS fetches"
+            " (key TEXT NOT NULL, url TEXT NOT NULL, fetched_at REAL NOT NULL,"
+            " digest TEXT NOT NULL)"
+        )
+        self._index.execute(
+            "CREATE INDEX IF NOT EXISTS fetches_by_key ON fetches (key, fetched_at)"
+        )
+
+    def is_storable(self, url: str, body: bytes) -> bool:
+        """Returns whether a response belongs in the store.
+
+        Only explicitly paged thread pages are stored, see
+        `bulk.is_thread_page_url`; a thread's bare URL, user iso pages,
+        printable views and login prompts served in place of a page are not.
+
+        Args:
+            url: The requested URL.
+            body: The response body.
+        """
+        return is_thread_page_url(url) and LOGIN_FORM_MARKER not in body
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def put(self, url: str, body: bytes, fetched_at: Optional[float] = None) -> str:
+        """Records a fetch of a page, storing its body unless already stored, and returns its hash.
+
+        Args:
+            url: URL the page was fetched from.
+            body: The page body.
+            fetched_at: Unix time of the fetch; defaults to now.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            try:
+                with os.fdopen(descriptor, "wb") as file:
+                    file.write(zlib.compress(body, self.level))
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._index.execute(
+                "INSERT INTO fetches VALUES (?, ?, ?, ?)",
+                (normalize_url(url), url, fetched_at, digest),
+            )
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        """Returns the stored body with a hash.
+
+        Args:
+            digest: SHA-256 of the body, as returned by `put`.
+        """
+        with open(self._path(digest), "rb") as file:
+            return zlib.decompress(file.read())
+
+    def get(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        """Returns the body of a page as last fetched, if it was ever stored.
+
+        Args:
+            url: URL of the page.
+            at: Unix time to look back from; the latest fetch at or before it is
+                returned. Defaults to the latest fetch.
+        """
+        with self._lock:
+            row = self._index.execute(
+                "SELECT digest FROM fetches WHERE key = ? AND fetched_at <= ?"
+                " ORDER BY fetched_at DESC LIMIT 1",
+                (normalize_url(url), float("inf") if at is None else at),
+            ).fetchone()
+        return None if row is None else self.read(row[0])
+
+    def fetches(self, url: str) -> list[tuple[float, str]]:
+        """Returns the fetch time and body hash of every fetch of a page, oldest first.
+
+        Args:
+            url: URL of the page.
+        """
+        with self._lock:
+            return self._index.execute(
+                "SELECT fetched_at, digest FROM fetches WHERE key = ? ORDER BY fetched_at",
+                (normalize_url(url),),
+            ).fetchall()
+
+    def iter_pages(self, thread_id: Optional[str] = None) -> Iterator[tuple[str, bytes]]:
+        """Yields the URL and latest body of each stored page, in thread order.
+
+        Each page's URL is given as it was last fetched. Pages saved with
+        different `posts_per_page` overlap; where two start at the same post,
+        the more recently fetched comes first. `bulk.parse_pages` yields each
+        post once, from the first page holding it. Bodies are only read and
+        decompressed as they are yielded.
+
+        Args:
+            thread_id: The forum's id for the thread to read pages of; defaults to
+                every thread.
+        """
+        with self._lock:
+            # SQLite takes the bare url and digest columns from the row with the MAX
+            rows = self._index.execute(
+                "SELECT url, digest, MAX(fetched_at) FROM fetches GROUP BY key"
+            ).fetchall()
+        rows.sort(key=lambda row: (*page_sort_key(row[0]), -row[2]))
+        for url, digest, _ in rows:
+            if thread_id is None or page_sort_key(url)[0] == thread_id:
+                yield url, self.read(digest)
+
+    def close(self):
+        """Closes the index."""
+        with self._lock:
+            self._index.close()
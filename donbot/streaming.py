@@ -0,0 +1,116 @@
+from typing import Iterable, Iterator, Optional
+from .operations import Post, get_page_location, read_post
+from lxml import etree, html
+from lxml.html import HtmlElement
+
+__all__ = ["CHUNK_SIZE", "StreamingPageParser", "discard", "iter_page_posts"]
+
+# Bytes read from a response at a time when streaming a page into the parser.
+CHUNK_SIZE = 16384
+
+
+class StreamingPageParser:
+    """Parses a thread page incrementally, as its bytes arrive, into posts.
+
+    Each post is read as soon as its postbody closes and is then removed from
+    the tree along with everything before it, so the parser holds about one
+    post's HTML at a time however large the page is. Content is always read
+    eagerly, since the HTML it would be read from lazily is discarded.
+
+        parser = StreamingPageParser(page_url)
+        for chunk in response.iter_content(CHUNK_SIZE):
+            for post in parser.feed(chunk):
+                ...
+        posts = parser.close()
+
+    Attributes:
+        page_url: URL of the page being parsed.
+        text_only: Whether post content is read as plain text rather than HTML.
+        post_count: Number of posts in the whole thread, once the page's
+            pagination has been parsed; None before then or if it has none.
+        is_login_page: Whether the page turned out to be the forum's login form.
+    """
+
+    def __init__(self, page_url: str = '', text_only: bool = False):
+        """Initializes a parser expecting the start of a page.
+
+        Args:
+            page_url: URL of the page being parsed.
+            text_only: Whether post content is read as plain text rather than HTML.
+        """
+        self.page_url = page_url
+        self.text_only = text_only
+        self.post_count: Optional[int] = None
+        self.is_login_page = False
+        self._forum, self._thread = get_page_location(page_url)
+        self._parser = etree.HTMLPullParser(events=("end",), tag=("div", "form"))
+        self._parser.set_element_class_lookup(html.HtmlElementClassLookup())
+
+    def feed(self, data: bytes) -> list[Post]:
+        """Parses the next chunk of the page and returns the posts it completed.
+
+        Args:
+            data: The next bytes of the page.
+        """
+        self._parser.feed(data)
+        return self._read_events()
+
+    def close(self) -> list[Post]:
+        """Finishes parsing the page and returns any posts its last chunk completed."""
+        self._parser.close()
+        return self._read_events()
+
+    def _read_events(self) -> list[Post]:
+        posts = []
+        for _, element in self._parser.read_events():
+            element_class = element.get("class")
+            if element.tag == "form":
+                self.is_login_page = self.is_login_page or element.get("id") == "login"
+            elif element_class == "postbody":
+                posts.append(
+                    read_post(
+                        element,
+                        self.page_url,
+                        self._forum,
+                        self._thread,
+                        text_only=self.text_only,
+                    )
+                )
+                discard(element)
+            elif element_class == "pagination" and self.post_count is None:
+                # as in `count_posts`, the count is the first non-blank text in the div
+                texts = (element.text, *(child.tail for child in element))
+                count = next((text for text in texts if text and text.strip()), None)
+                if count is not None:
+                    self.post_count = int("".join(c for c in count if c.isdigit()))
+        return posts
+
+
+def discard(element: HtmlElement):
+    """Empties an element and removes everything before it from a tree still being parsed.
+
+    Args:
+        element: An element whose end tag has been parsed.
+    """
+    element.clear()
+    node = element
+    while (parent := node.getparent()) is not None:
+        while node.getprevious() is not None:
+            del parent[0]
+        node = parent
+
+
+def iter_page_posts(
+    chunks: Iterable[bytes], page_url: str = '', text_only: bool = False
+) -> Iterator[Post]:
+    """Yields the posts of a thread page as its chunks are parsed.
+
+    Args:
+        chunks: The page's bytes, e.g. `response.iter_content(CHUNK_SIZE)`.
+        page_url: URL of the page.
+        text_only: Whether post content is read as plain text rather than HTML.
+    """
+    parser = StreamingPageParser(page_url, text_only)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
@@ -0,0 +1,91 @@
+from .operations import Post
+from urllib.parse import parse_qs, urlsplit
+from urllib3.util.retry import Retry
+import random
+
+__all__ = [
+    "RETRY_STATUSES",
+    "JitteredRetry",
+    "make_retry",
+    "jittered_backoff",
+    "IncompleteReadError",
+]
+
+# statuses worth retrying a GET for: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class JitteredRetry(Retry):
+    """urllib3 retry policy whose exponential backoff is randomized ("full jitter").
+
+    Each wait is drawn uniformly between zero and the usual exponential backoff,
+    so bots that hit the same outage don't retry in lockstep.
+    """
+
+    def get_backoff_time(self) -> float:
+        return random.uniform(0, super().get_backoff_time())
+
+
+def make_retry(retries: int = 3, backoff_factor: float = 0.5) -> Retry:
+    """Returns the retry policy Donbot mounts its transport adapters with.
+
+    Connection errors are retried for any request, since the request never
+    reached the forum. Read errors and `RETRY_STATUSES` are retried for GETs
+    only, honoring any Retry-After header; a POST is never sent twice. Once
+    the retries are used up, the last response is returned as is.
+
+    Args:
+        retries: Number of times a request is retried.
+        backoff_factor: Scale of the exponential backoff between retries (seconds).
+    """
+    return JitteredRetry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def jittered_backoff(attempt: int, backoff_factor: float = 0.5) -> float:
+    """Returns a randomized wait before retrying a request, as `JitteredRetry` waits.
+
+    For clients that retry requests themselves rather than through urllib3.
+
+    Args:
+        attempt: Number of times the request has already been retried.
+        backoff_factor: Scale of the exponential backoff between retries (seconds).
+    """
+    return random.uniform(0, backoff_factor * 2**attempt)
+
+
+class IncompleteReadError(Exception):
+    """Raised when a page of a multi-page read still fails after being requested again.
+
+    Pages after the failed one may have been read, but only the posts before
+    it are kept, so that a read can resume from where it stopped:
+
+        try:
+            posts = bot.get_posts(thread)
+        except IncompleteReadError as error:
+            posts = error.posts + bot.get_posts(thread, error.resume_from)
+
+    Attributes:
+        posts: Posts from the pages before the failed page, in order.
+        page_url: URL of the page that failed.
+        resume_from: Position of the failed page's first post, i.e. the `start`
+            to pass to the same read to resume it.
+    """
+
+    def __init__(self, posts: list[Post], page_url: str):
+        """Initializes the error from the posts read and the page that failed.
+
+        Args:
+            posts: Posts from the pages before the failed page, in order.
+            page_url: URL of the page that failed.
+        """
+        super().__init__(f"Failed to read {page_url}")
+        self.posts = posts
+        self.page_url = page_url
+        self.resume_from = int(parse_qs(urlsplit(page_url).query).get("start", ["0"])[0])
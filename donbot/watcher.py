@@ -0,0 +1,362 @@
+from typing import Callable, Optional
+from .donbot import Donbot
+from .operations import Post, count_posts, get_page_start, get_posts, set_posts_per_page
+from .scheduler import TokenBucket
+from dataclasses import dataclass
+from requests import RequestException
+import heapq
+import itertools
+import threading
+import time
+
+__all__ = ["ThreadWatcher", "WatchedThread", "WatchScheduler"]
+
+
+class ThreadWatcher:
+    """Polls a thread for new posts, passing only the new posts to a callback.
+
+    Each poll makes one cheap probe request. The "page" probe requests only
+    the thread's trailing page. That page holds the next post to be made, so
+    any new posts on it are read from the probe itself; more pages are only
+    requested when a poll finds more new posts than the page holds. The
+    "activity" probe totals the post counts in the thread's activity
+    overview instead, and requests pages only when the total has grown.
+
+    The time between polls grows by `backoff` after every quiet poll, up to
+    `max_interval`, and drops back to `min_interval` when new posts appear.
+
+    A bot whose session caches pages serves the trailing page from its cache
+    for `PageCache.partial_page_ttl` seconds, so `min_interval` should not be
+    shorter than that.
+
+    Attributes:
+        bot: Donbot instance used to fetch pages.
+        thread: URL of the watched thread.
+        callback: Called with the list of new posts whenever a poll finds any.
+        post_count: Number of posts in the thread as of the last poll, or None
+            before the first poll.
+        interval: Seconds to wait before the next poll.
+    """
+
+    def __init__(
+        self,
+        bot: Donbot,
+        thread: Optional[str] = None,
+        callback: Optional[Callable[[list[Post]], None]] = None,
+        post_count: Optional[int] = None,
+        min_interval: float = 30.0,
+        max_interval: float = 600.0,
+        backoff: float = 2.0,
+        probe: str = "page",
+    ):
+        """Initializes the watcher.
+
+        Args:
+            bot: Donbot instance used to fetch pages.
+            thread: URL of the thread to watch; defaults to the bot's thread.
+            callback: Called with the list of new posts whenever a poll finds any.
+            post_count: Number of posts already seen; posts after these are new.
+                Defaults to the thread's length at the first poll.
+            min_interval: Seconds between polls while the thread is active.
+            max_interval: Longest time between polls of a quiet thread (seconds).
+            backoff: Factor the interval grows by after each poll finding nothing.
+            probe: "page" to probe the trailing thread page, or "activity" to
+                probe the thread's activity overview.
+        """
+        thread = thread or bot.thread
+        if len(thread) == 0:
+            raise ValueError("No thread specified!")
+        if probe not in ("page", "activity"):
+            raise ValueError(f"Unknown probe: {probe}")
+        self.bot = bot
+        self.thread = thread
+        self.callback = callback
+        self.post_count = post_count
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.probe = probe
+        self.interval = min_interval
+
+    def poll(self) -> list[Post]:
+        """Probes the thread once and returns any new posts, passing them to the callback.
+
+        The first poll of a watcher created without a `post_count` only records
+        the thread's length and returns no posts.
+        """
+        if self.post_count is None:
+            self.post_count = self.bot.count_posts(self.thread)
+            return []
+
+        if self.probe == "page":
+            new_posts = self._probe_page()
+        else:
+            new_posts = self._probe_activity()
+
+        if new_posts:
+            self.post_count = new_posts[-1].number + 1
+            self.interval = self.min_interval
+            if self.callback is not None:
+                self.callback(new_posts)
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return new_posts
+
+    def _probe_page(self) -> list[Post]:
+        """Returns the new posts, requesting the trailing page and any pages after it."""
+        ppp = self.bot.posts_per_page
+        page_start = get_page_start(self.post_count, ppp)
+        page_url = f"{set_posts_per_page(self.thread, ppp)}&start={page_start}"
+        page_html = self.bot._get_html(page_url)
+        total = self.bot._parse(count_posts, page_html)
+        if total <= self.post_count:
+            return []
+
+        new_posts = [
+            post
+            for post in self.bot._parse_posts(get_posts, page_html, 0, -1, page_url)
+            if post.number >= self.post_count
+        ]
+        self.bot._observe_posts(self.thread, new_posts)
+        next_number = new_posts[-1].number + 1 if new_posts else self.post_count
+        if next_number < total:
+            new_posts += self.bot.get_posts(self.thread, next_number)
+        return new_posts
+
+    def _probe_activity(self) -> list[Post]:
+        """Returns the new posts, requesting pages only if the activity overview has grown."""
+        activity_overview = self.bot.get_activity_overview(self.thread)
+        total = sum(
+            int("".join(c for c in user["totalposts"] if c.isdigit()) or 0)
+            for user in activity_overview
+        )
+        if total <= self.post_count:
+            return []
+        return self.bot.get_posts(self.thread, self.post_count)
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Polls the thread until `stop` is set, waiting `interval` seconds between polls.
+
+        Args:
+            stop: Event that ends the loop when set; the loop runs forever if not given.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll()
+            stop.wait(self.interval)
+
+
+@dataclass
+class WatchedThread:
+    """A thread polled by a `WatchScheduler`.
+
+    Attributes:
+        watcher: Watcher that probes the thread.
+        deadline: Unix time of the thread's next day deadline, if any.
+        post_rate: Recent posts per second, as a moving average over polls, or None
+            until two polls have measured it.
+        next_poll: `time.monotonic()` value when the thread is next due.
+        last_poll: `time.monotonic()` value of the last poll, or None before the first.
+    """
+    watcher: ThreadWatcher
+    deadline: Optional[float] = None
+    post_rate: Optional[float] = None
+    next_poll: float = 0.0
+    last_poll: Optional[float] = None
+
+
+class WatchScheduler:
+    """Polls many threads from one loop, spending a global poll budget where it matters.
+
+    Threads wait in a queue ordered by when they are next due. Each thread's
+    interval is derived from its recent post rate, so a thread averaging a
+    post a minute is polled about every `posts_per_poll` minutes while a dead
+    one drifts out to `max_interval`. A newly watched thread is polled every
+    `min_interval` until its rate has been measured, so a hot thread is not
+    left waiting for `max_interval` after it is added. The interval is divided by `boost` when
+    the thread's day deadline is less than `deadline_window` seconds away or
+    when the next page is `boundary_posts` posts or fewer from starting. At
+    most `polls_per_second` polls are made overall; when more threads are due
+    than the budget allows, the most overdue go first. The budget counts polls,
+    not requests: a poll that finds new posts also reads the pages holding
+    them, and the bot's scheduler still limits those requests.
+
+    Attributes:
+        bot: Donbot instance shared by every watcher.
+        polls_per_second: Global budget of polls; each may make several requests.
+        min_interval: Shortest time between polls of one thread (seconds).
+        max_interval: Longest time between polls of one thread (seconds).
+        posts_per_poll: Posts expected between polls at a thread's recent rate.
+        boost: Factor a thread's interval is divided by near a deadline or page boundary.
+        deadline_window: Seconds before a deadline that its thread is boosted.
+        boundary_posts: Posts remaining on a page at which its thread is boosted.
+    """
+
+    def __init__(
+        self,
+        bot: Donbot,
+        polls_per_second: float = 0.5,
+        min_interval: float = 15.0,
+        max_interval: float = 900.0,
+        posts_per_poll: float = 1.0,
+        boost: float = 4.0,
+        deadline_window: float = 3600.0,
+        boundary_posts: int = 3,
+    ):
+        """Initializes a scheduler watching no threads.
+
+        Args:
+            bot: Donbot instance shared by every watcher.
+            polls_per_second: Global budget of polls; each may make several requests.
+            min_interval: Shortest time between polls of one thread (seconds).
+            max_interval: Longest time between polls of one thread (seconds).
+            posts_per_poll: Posts expected between polls at a thread's recent rate.
+            boost: Factor a thread's interval is divided by near a deadline or page boundary.
+            deadline_window: Seconds before a deadline that its thread is boosted.
+            boundary_posts: Posts remaining on a page at which its thread is boosted.
+        """
+        self.bot = bot
+        self.polls_per_second = polls_per_second
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.posts_per_poll = posts_per_poll
+        self.boost = boost
+        self.deadline_window = deadline_window
+        self.boundary_posts = boundary_posts
+        self._budget = TokenBucket(polls_per_second)
+        self._threads: dict[str, WatchedThread] = {}
+        self._queue: list[tuple[float, int, str]] = []
+        self._tickets = itertools.count()
+        self._lock = threading.Lock()
+
+    def watch(
+        self,
+        thread: str,
+        callback: Optional[Callable[[list[Post]], None]] = None,
+        post_count: Optional[int] = None,
+        deadline: Optional[float] = None,
+        probe: str = "page",
+    ) -> WatchedThread:
+        """Adds a thread to the queue, due for polling immediately.
+
+        Args:
+            thread: URL of the thread to watch.
+            callback: Called with the list of new posts whenever a poll finds any.
+            post_count: Number of posts already seen; defaults to the thread's
+                length at the first poll.
+            deadline: Unix time of the thread's next day deadline, if any.
+            probe: "page" or "activity"; see `ThreadWatcher`.
+        """
+        watcher = ThreadWatcher(self.bot, thread, callback, post_count, probe=probe)
+        watched = WatchedThread(watcher, deadline)
+        with self._lock:
+            self._threads[thread] = watched
+            self._enqueue(thread, watched, time.monotonic())
+        return watched
+
+    def unwatch(self, thread: str):
+        """Removes a thread from the queue.
+
+        Args:
+            thread: URL of the watched thread.
+        """
+        with self._lock:
+            self._threads.pop(thread, None)
+
+    def set_deadline(self, thread: str, deadline: Optional[float]):
+        """Sets a watched thread's next day deadline and reschedules it.
+
+        Args:
+            thread: URL of the watched thread.
+            deadline: Unix time of the deadline, or None to clear it.
+        """
+        with self._lock:
+            watched = self._threads[thread]
+            watched.deadline = deadline
+            last_poll = watched.last_poll if watched.last_poll is not None else time.monotonic()
+            self._enqueue(thread, watched, last_poll + self.interval(watched))
+
+    def interval(self, watched: WatchedThread) -> float:
+        """Returns the time to wait after polling a thread before polling it again.
+
+        Args:
+            watched: The watched thread.
+        """
+        if watched.post_rate is None:
+            interval = self.min_interval
+        elif watched.post_rate > 0:
+            interval = self.posts_per_poll / watched.post_rate
+        else:
+            interval = self.max_interval
+
+        if watched.deadline is not None:
+            if 0 < watched.deadline - time.time() <= self.deadline_window:
+                interval /= self.boost
+        post_count = watched.watcher.post_count
+        if post_count is not None:
+            ppp = self.bot.posts_per_page
+            if ppp - post_count % ppp <= self.boundary_posts:
+                interval /= self.boost
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _enqueue(self, thread: str, watched: WatchedThread, due: float):
+        watched.next_poll = due
+        heapq.heappush(self._queue, (due, next(self._tickets), thread))
+
+    def _pop_due(self, now: float) -> Optional[tuple[str, WatchedThread]]:
+        """Removes and returns the most overdue thread if it is due and the budget allows."""
+        with self._lock:
+            while self._queue:
+                due, _, thread = self._queue[0]
+                watched = self._threads.get(thread)
+                if watched is None or watched.next_poll != due:  # unwatched or rescheduled
+                    heapq.heappop(self._queue)
+                    continue
+                if due > now or self._budget.time_until_token(now) > 0:
+                    return None
+                self._budget.take()
+                heapq.heappop(self._queue)
+                return thread, watched
+            return None
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Polls every thread that is due, as far as the budget allows, and returns how many.
+
+        Args:
+            now: The current `time.monotonic()` value; read from the clock if not given.
+        """
+        now = time.monotonic() if now is None else now
+        polled = 0
+        while (due := self._pop_due(now)) is not None:
+            thread, watched = due
+            try:
+                new_posts = watched.watcher.poll()
+            except RequestException:
+                new_posts = []
+            if watched.last_poll is not None and now > watched.last_poll:
+                observed_rate = len(new_posts) / (now - watched.last_poll)
+                if watched.post_rate is None:
+                    watched.post_rate = observed_rate
+                else:
+                    watched.post_rate = 0.3 * observed_rate + 0.7 * watched.post_rate
+            watched.last_poll = now
+            with self._lock:
+                if self._threads.get(thread) is watched:
+                    self._enqueue(thread, watched, now + self.interval(watched))
+            polled += 1
+        return polled
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Polls threads as they fall due until `stop` is set.
+
+        Args:
+            stop: Event that ends the loop when set; the loop runs forever if not given.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.run_pending()
+            now = time.monotonic()
+            with self._lock:
+                next_due = self._queue[0][0] if self._queue else now + 1.0
+                wait = max(next_due - now, self._budget.time_until_token(now))
+            stop.wait(min(wait, 1.0))
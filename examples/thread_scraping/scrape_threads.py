@@ -5,14 +5,20 @@ import logging
 import json
 from scrapy.crawler import CrawlerProcess
 from lxml import html
+from donbot.bulk import parse_pages
 from donbot.operations import count_posts, get_posts
+from donbot.store import PageStore
 from tqdm import tqdm
 import os
+import sys
 
 posts_per_page = 25
 archive_path = "data/archive.txt"
 output_path = "data/posts.jsonl"
 split_output_path = "data/posts/"
+# raw pages are archived here so that `--reparse` can rerun the parser
+# without crawling again; set to None to keep only the parsed posts
+store_path = "data/pages/"
 
 class PostItem(scrapy.Item):
     number = scrapy.Field()
@@ -51,6 +57,7 @@ class MafiaScumSpider(scrapy.Spider):
         "LOG_LEVEL": logging.WARNING,
         "ITEM_PIPELINES": {"__main__.JsonWriterPipeline": 1},
     }
+    store = None  # PageStore passed in by process.crawl, if any
 
     def start_requests(self):
         "Generates scrapy.Request objects for each URL in the archive file."
@@ -77,6 +84,8 @@ class MafiaScumSpider(scrapy.Spider):
 
     def process_posts(self, response):
         "Extracts post data from a page of a thread."
+        if self.store is not None and self.store.is_storable(response.url, response.body):
+            self.store.put(response.url, response.body)
         thread_page_html = html.fromstring(response.body)
         posts = get_posts(thread_page_html, page_url=response.url)
         for post in posts:
@@ -84,10 +93,19 @@ class MafiaScumSpider(scrapy.Spider):
 
 
 if __name__ == "__main__":
-    # Start scraping...
-    process = CrawlerProcess()
-    process.crawl(MafiaScumSpider)
-    process.start()
+    store = PageStore(store_path) if store_path else None
+    if "--reparse" in sys.argv:
+        if store is None:
+            sys.exit("--reparse needs the raw page archive; set store_path first.")
+        # Parse the archived pages again, across every core, instead of scraping
+        with open(output_path, "w") as output:
+            for post in tqdm(parse_pages(store.iter_pages())):
+                output.write(json.dumps(post.to_dict()) + "\n")
+    else:
+        # Start scraping...
+        process = CrawlerProcess()
+        process.crawl(MafiaScumSpider, store=store)
+        process.start()
 
     # Separate Results into Unique Files
     posts = open(output_path)
@@ -1,7 +1,9 @@
 thread = "https://forum.mafiascum.net/viewtopic.php?t=92345"  # @param {type:"string"}
 target_user_post_number = 21  # @param {type:"integer"}
 description_path = '//span[@class="bbvote"]' # @param {type:"string"}
+cache_directory = ".donbot-cache"  # @param {type:"string"}
 
+from donbot.cache import CachingAdapter, PageCache
 import requests
 from lxml import html
 from lxml.html import HtmlElement
@@ -128,6 +130,8 @@ def get_posts(
 if __name__ == "__main__":
 
     session = requests.Session()
+    if cache_directory:
+        session.mount("https://", CachingAdapter(PageCache(cache_directory)))
     thread_page_html = html.fromstring(session.get(thread).content)
 
     # get id of user at target_user_post_number
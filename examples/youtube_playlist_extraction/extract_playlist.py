@@ -2,7 +2,9 @@
 thread = "https://forum.mafiascum.net/viewtopic.php?t=91822"  # @param {type:"string"}
 playlist_type = "regular videos"  # @param ["music", "regular videos"]
 try_to_shorten_playlist_url = False  # @param {type:"boolean"}
+cache_directory = ".donbot-cache"  # @param {type:"string"}
 
+from donbot.cache import CachingAdapter, PageCache
 from donbot.operations import get_posts, get_thread_page_urls
 import requests
 from lxml import html
@@ -37,6 +39,8 @@ def create_playlist_url(video_links: list[str]):
 if __name__ == "__main__":
 
     session = requests.Session()
+    if cache_directory:
+        session.mount("https://", CachingAdapter(PageCache(cache_directory)))
     thread_html = html.fromstring(session.get(thread).content)
     thread_urls = get_thread_page_urls(thread, thread_html)
 
@@ -11,6 +11,7 @@ setup(
     author_email='gunnjordanb@gmail.com',
     packages=find_packages(),
     install_requires=["lxml"],
+    extras_require={"async": ["aiohttp"]},
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
@@ -0,0 +1,292 @@
+"""Stand-in mafiascum forum served from a local HTTP server for offline tests."""
+
+import hashlib
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from donbot import Donbot
+from donbot.concurrency import AdaptiveLimiter
+from donbot.scheduler import RequestScheduler
+
+PAGE_TEMPLATE = """<html><head><meta charset="utf-8"><title>{title}</title></head><body>
+<div class="pagination">
+{total} posts
+</div>
+{body}
+</body></html>"""
+
+POST_TEMPLATE = """<div class="postbody"><div id="post_content{id}">
+<h3 class="first"><a href="#p{id}">Re: Test thread</a></h3>
+<p class="author modified"><span class="post-number-bolded">#{number}</span> by <strong><a href="./memberlist.php?mode=viewprofile&amp;u={user_id}" class="username">{user}</a></strong> » {time}</p>
+<div class="content">{content}</div>
+</div></div>
+"""
+
+PRINT_POST_TEMPLATE = """<div class="post">
+<h3>Re: Test thread</h3>
+<div class="date">Posted: <strong>{time}</strong></div>
+<div class="author">by <strong>{user}</strong></div>
+<div class="content">{content}</div>
+</div>
+<hr />
+"""
+
+LOGIN_PAGE = """<html><head><meta charset="utf-8"></head><body>
+<form action="./ucp.php?mode=login" method="post" id="login">
+<input type="text" name="username" />
+</form></body></html>"""
+
+FORM_TEMPLATE = """<html><head><meta charset="utf-8"></head><body><form>
+{inputs}
+</form></body></html>"""
+
+
+@dataclass
+class FakePost:
+    id: str
+    user: str
+    user_id: str
+    content: str
+    time: str
+
+
+@dataclass
+class FakeForum:
+    """State of the stand-in forum, inspected and modified by tests."""
+
+    url: str = ""
+    latency: float = 0.0
+    etags: bool = False
+    not_modified: int = 0
+    max_pms: float = math.inf
+    failures: dict = field(default_factory=dict)
+    logins: int = 0
+    sessions: set = field(default_factory=set)
+    private_threads: set = field(default_factory=set)
+    threads: dict = field(default_factory=dict)
+    users: dict = field(default_factory=lambda: {"tester": "1"})
+    pms: list = field(default_factory=list)
+    requests: list = field(default_factory=list)
+    in_flight: int = 0
+    max_in_flight: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    next_post_id: int = 1000
+
+    def add_user(self, user: str) -> str:
+        return self.users.setdefault(user, str(len(self.users) + 1))
+
+    def add_posts(self, thread_id: str, count: int, users: tuple = ("alice", "bob")):
+        posts = self.threads.setdefault(thread_id, [])
+        for _ in range(count):
+            user = users[len(posts) % len(users)]
+            self.add_post(thread_id, user, f"post {len(posts)} by {user}")
+
+    def add_post(self, thread_id: str, user: str, content: str) -> FakePost:
+        self.next_post_id += 1
+        post = FakePost(
+            id=str(self.next_post_id),
+            user=user,
+            user_id=self.add_user(user),
+            content=content,
+            time=f"Sat Aug 22, 2020 {len(self.threads.get(thread_id, [])) % 12 + 1}:00 pm",
+        )
+        self.threads.setdefault(thread_id, []).append(post)
+        return post
+
+    def thread_url(self, thread_id: str) -> str:
+        return f"{self.url}/viewtopic.php?f=1&t={thread_id}"
+
+    def make_bot(self, **kwargs) -> Donbot:
+        "Returns a bot for this forum with no rate limit and its own limiter; clears the request log."
+
+        kwargs.setdefault("post_delay", 0)
+        kwargs.setdefault("scheduler", RequestScheduler(get_rate=math.inf, post_rate=math.inf))
+        kwargs.setdefault("limiter", AdaptiveLimiter())
+        bot = Donbot("tester", "password", forum_url=self.url, **kwargs)
+        self.requests.clear()
+        return bot
+
+    def paths(self, method: str = "GET") -> list[str]:
+        return [path for m, path in self.requests if m == method]
+
+
+def render_thread_page(posts: list, start: int, ppp: int, offsets: list) -> str:
+    body = "".join(
+        POST_TEMPLATE.format(number=offsets[i], **vars(post))
+        for i, post in enumerate(posts)
+        if start <= i < start + ppp
+    )
+    return PAGE_TEMPLATE.format(title="thread", total=len(posts), body=body)
+
+
+def render_form(**values) -> str:
+    inputs = "\n".join(
+        f'<input type="hidden" name="{name}" value="{value}" />'
+        for name, value in values.items()
+    )
+    return FORM_TEMPLATE.format(inputs=inputs)
+
+
+class ForumHandler(BaseHTTPRequestHandler):
+    forum: FakeForum
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def handle_request(self, method: str):
+        forum = self.forum
+        with forum.lock:
+            forum.requests.append((method, self.path))
+            forum.in_flight += 1
+            forum.max_in_flight = max(forum.max_in_flight, forum.in_flight)
+        try:
+            time.sleep(forum.latency)
+            if self.take_failure():
+                status, body = 503, "<html><body>unavailable</body></html>"
+            else:
+                status, body = self.route(method)
+        finally:
+            with forum.lock:
+                forum.in_flight -= 1
+        data = body.encode("utf-8")
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        if forum.etags and self.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+            forum.not_modified += 1
+        self.send_response(status)
+        if forum.etags:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        if method == "POST" and self.path.startswith("/ucp.php?mode=login"):
+            with forum.lock:
+                forum.logins += 1
+                sid = f"sid{forum.logins}"
+                forum.sessions.add(sid)
+            self.send_header("Set-Cookie", f"phpbb_sid={sid}; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def take_failure(self) -> bool:
+        "Returns whether to fail this request, counting down failures scheduled for its path."
+
+        with self.forum.lock:
+            for path, remaining in self.forum.failures.items():
+                if path in self.path and remaining > 0:
+                    self.forum.failures[path] = remaining - 1
+                    return True
+        return False
+
+    def read_form(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        return {name: values[0] for name, values in form.items()}
+
+    def is_authenticated(self) -> bool:
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+        return "phpbb_sid" in cookies and cookies["phpbb_sid"].value in self.forum.sessions
+
+    def route(self, method: str) -> tuple[int, str]:
+        forum = self.forum
+        parts = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+        token = {"creation_time": "1", "form_token": "token"}
+
+        needs_login = parts.path == "/posting.php" or query.get("mode") == "compose" or (
+            parts.path == "/viewtopic.php" and query.get("t") in forum.private_threads
+        )
+        if needs_login and not self.is_authenticated():
+            return 200, LOGIN_PAGE
+
+        if parts.path == "/index.php":
+            return 200, render_form(**token)
+        if parts.path == "/ucp.php" and query.get("mode") == "login":
+            return 200, "<html><body>logged in</body></html>"
+        if parts.path == "/ucp.php" and query.get("mode") == "compose":
+            if method == "POST":
+                if len(forum.pms) >= forum.max_pms:
+                    return 503, "<html><body>unavailable</body></html>"
+                forum.pms.append(self.read_form())
+            return 200, render_form(**token)
+        if parts.path == "/search.php":
+            user_id = forum.users.get(query.get("author", ""))
+            link = (
+                f'<dt class="author"><a href="./memberlist.php?mode=viewprofile&amp;u={user_id}">x</a></dt>'
+                if user_id
+                else ""
+            )
+            return 200, f"<html><body><dl>{link}</dl></body></html>"
+        if parts.path == "/viewtopic.php":
+            posts = forum.threads.get(query.get("t"), [])
+            offsets = list(range(len(posts)))
+            if "user_select[]" in query:
+                offsets = [i for i, p in enumerate(posts) if p.user_id == query["user_select[]"]]
+                posts = [posts[i] for i in offsets]
+            start = int(query.get("start", 0))
+            ppp = int(query.get("ppp", 25))
+            if query.get("view") == "print":
+                body = "".join(PRINT_POST_TEMPLATE.format(**vars(p)) for p in posts[start : start + ppp])
+                return 200, f'<html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+            return 200, render_thread_page(posts, start, ppp, offsets)
+        if parts.path.startswith("/app.php/activity_overview/"):
+            posts = forum.threads.get(parts.path.rsplit("/", 1)[1], [])
+            rows = ""
+            for user in dict.fromkeys(p.user for p in posts):
+                total = sum(p.user == user for p in posts)
+                cells = ["-", "-", user, "-", "-", "first", "-", "last", "-", "since", "-", total]
+                rows += "<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>"
+            return 200, f"<html><body><table><tbody>{rows}</tbody></table></body></html>"
+        if parts.path == "/posting.php" and query.get("mode") == "reply":
+            posts = forum.threads.get(query["t"], [])
+            last_post_id = posts[-1].id if posts else "0"
+            if method == "POST":
+                form = self.read_form()
+                # like phpBB, a form outdated by newer posts is served again unsaved
+                if int(form["topic_cur_post_id"]) >= int(last_post_id):
+                    forum.add_post(query["t"], "tester", form["message"])
+                    return 200, "<html><body>posted</body></html>"
+            return 200, render_form(topic_cur_post_id=last_post_id, **token)
+        if parts.path == "/posting.php" and query.get("mode") == "edit":
+            post = next(
+                p for posts in forum.threads.values() for p in posts if p.id == query["p"]
+            )
+            checksum = hashlib.md5(post.content.encode("utf-8")).hexdigest()
+            if method == "POST":
+                form = self.read_form()
+                # likewise for an edit form outdated by another edit
+                if form["edit_post_message_checksum"] == checksum:
+                    post.content = form["message"]
+                    return 200, "<html><body>edited</body></html>"
+            return 200, render_form(
+                edit_post_message_checksum=checksum, edit_post_subject_checksum="b", **token
+            )
+        return 404, "<html><body>not found</body></html>"
+
+
+@pytest.fixture
+def forum():
+    "A stand-in forum server; yields its mutable state."
+
+    state = FakeForum()
+    handler = type("Handler", (ForumHandler,), {"forum": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield state
+    server.shutdown()
+    server.server_close()
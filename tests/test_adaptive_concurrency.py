@@ -0,0 +1,92 @@
+import threading
+import time
+
+from donbot.concurrency import AdaptiveLimiter
+from donbot.scheduler import PRIORITY_BULK, PRIORITY_WRITE
+
+
+def run_round(limiter: AdaptiveLimiter, latency: float = 0.1, ok: bool = True):
+    started = [limiter.acquire() for _ in range(limiter.window)]
+    for start in started:
+        limiter.release(start, ok, latency if ok else None)
+
+
+def test_window_grows_while_latency_is_flat():
+    "A fully used window should grow by about one per round of good responses"
+
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=6)
+    for _ in range(3):
+        run_round(limiter)
+    assert limiter.window == 4
+
+    for _ in range(20):
+        run_round(limiter)
+    assert limiter.window == 6
+
+
+def test_window_is_cut_once_per_round_of_errors():
+    "Errors should halve the window, but not again for requests sent before the cut"
+
+    limiter = AdaptiveLimiter(initial_limit=8)
+    run_round(limiter, ok=False)
+    assert limiter.window == 4
+
+    run_round(limiter, ok=False)
+    assert limiter.window == 2
+
+
+def test_window_is_cut_on_slow_responses():
+    "A response much slower than the baseline should cut the window"
+
+    limiter = AdaptiveLimiter(initial_limit=4)
+    run_round(limiter, latency=0.1)
+    limiter.release(limiter.acquire(), True, 1.0)
+    assert limiter.window == 2
+    assert limiter.baseline < 0.2
+
+
+def test_cached_responses_leave_window_alone():
+    "Responses without a server latency should not move the window"
+
+    limiter = AdaptiveLimiter(initial_limit=4)
+    run_round(limiter, latency=None)
+    assert limiter.limit == 4
+
+
+def test_writes_get_room_before_bulk_reads():
+    "A write waiting for room in the window should go ahead of bulk reads that queued earlier"
+
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    started = limiter.acquire()
+    order = []
+
+    def request(name, priority):
+        limiter.release(limiter.acquire(priority), latency=None)
+        order.append(name)
+
+    readers = [
+        threading.Thread(target=request, args=(f"read{i}", PRIORITY_BULK)) for i in range(3)
+    ]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.01)
+    writer = threading.Thread(target=request, args=("write", PRIORITY_WRITE))
+    writer.start()
+    time.sleep(0.01)
+    limiter.release(started, latency=None)
+    for thread in readers + [writer]:
+        thread.join()
+
+    assert order[0] == "write"
+
+
+def test_bulk_read_widens_window(forum):
+    "A bulk read from a responsive forum should run with a wider window"
+
+    forum.add_posts("1", 500)
+    forum.latency = 0.02
+    bot = forum.make_bot()
+
+    bot.get_posts(forum.thread_url("1"), max_workers=16)
+    assert bot.stats()["concurrency"]["window"] > 4
+    assert forum.max_in_flight <= bot.limiter.max_limit
@@ -0,0 +1,163 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from donbot import AsyncDonbot
+from donbot.concurrency import AdaptiveLimiter
+from donbot.scheduler import RequestScheduler
+
+
+def run(forum, operation, **kwargs):
+    "Runs an operation against a logged-in AsyncDonbot pointed at the stand-in forum."
+
+    kwargs.setdefault("post_delay", 0)
+    kwargs.setdefault("scheduler", RequestScheduler(get_rate=math.inf, post_rate=math.inf))
+    kwargs.setdefault("limiter", AdaptiveLimiter())
+
+    async def main():
+        async with AsyncDonbot("tester", "password", forum_url=forum.url, **kwargs) as bot:
+            return await operation(bot)
+
+    return asyncio.run(main())
+
+
+def test_async_login(forum):
+    "AsyncDonbot should fetch the login form and submit it"
+
+    run(forum, lambda bot: asyncio.sleep(0))
+    assert forum.paths("GET") == ["/index.php"]
+    assert forum.paths("POST") == ["/ucp.php?mode=login"]
+
+
+def test_async_count_and_get_posts(forum):
+    "AsyncDonbot should count and retrieve posts in thread order"
+
+    forum.add_posts("1", 130)
+    thread = forum.thread_url("1")
+
+    async def operation(bot):
+        return await bot.count_posts(thread), await bot.get_posts(thread, 10, 60)
+
+    count, posts = run(forum, operation)
+    assert count == 130
+    assert [post.number for post in posts] == list(range(10, 61))
+
+
+def test_async_get_user_posts_and_activity_overview(forum):
+    "AsyncDonbot should read a user's iso and the activity overview"
+
+    forum.add_posts("1", 60)
+    thread = forum.thread_url("1")
+
+    async def operation(bot):
+        return await bot.get_user_posts(thread, "alice"), await bot.get_activity_overview(thread)
+
+    posts, overview = run(forum, operation)
+    assert [post.number for post in posts] == list(range(0, 60, 2))
+    assert [row["user"] for row in overview] == ["alice", "bob"]
+    assert overview[0]["totalposts"] == "30"
+
+
+def test_async_make_and_edit_post(forum):
+    "AsyncDonbot should make a post and then edit it"
+
+    forum.add_posts("1", 3)
+    thread = forum.thread_url("1")
+
+    async def operation(bot):
+        await bot.make_post("hello", thread)
+        await bot.edit_post(3, "goodbye", thread)
+
+    run(forum, operation)
+    assert [post.content for post in forum.threads["1"]][-1] == "goodbye"
+
+
+def test_async_send_pm(forum):
+    "AsyncDonbot should resolve recipients and submit a PM"
+
+    forum.add_user("alice")
+    forum.add_user("bob")
+
+    run(forum, lambda bot: bot.send_pm(["alice", "bob"], "Role", "you are town"))
+    assert forum.pms[0]["subject"] == "Role"
+    assert "address_list[u][2]" in forum.pms[0]
+    assert "address_list[u][3]" in forum.pms[0]
+
+
+def test_async_bots_share_a_session(forum):
+    "Several AsyncDonbots should be able to share one pooled session"
+
+    forum.add_posts("1", 30)
+    forum.add_posts("2", 40)
+
+    async def main():
+        async with aiohttp.ClientSession() as session:
+            bots = [
+                AsyncDonbot("tester", "password", forum_url=forum.url, session=session)
+                for _ in range(2)
+            ]
+            counts = await asyncio.gather(
+                bots[0].count_posts(forum.thread_url("1")),
+                bots[1].count_posts(forum.thread_url("2")),
+            )
+            for bot in bots:
+                await bot.close()
+            assert not session.closed
+            return counts
+
+    assert asyncio.run(main()) == [30, 40]
+
+
+def test_async_retries_transient_errors(forum):
+    "AsyncDonbot should retry a page that briefly fails with a 503"
+
+    forum.add_posts("1", 60)
+    forum.failures["start=25"] = 2
+
+    posts = run(forum, lambda bot: bot.get_posts(forum.thread_url("1")))
+    assert [post.number for post in posts] == list(range(60))
+    assert forum.paths("GET").count("/viewtopic.php?f=1&t=1&start=25") == 3
+
+
+def test_async_raises_on_error_status(forum):
+    "AsyncDonbot should raise rather than parse an error page once retries run out"
+
+    forum.add_posts("1", 10)
+    forum.failures["t=1"] = 1
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        run(forum, lambda bot: bot.count_posts(forum.thread_url("1")), retries=0)
+
+
+def test_async_posts_per_page(forum):
+    "AsyncDonbot should request pages of the configured size"
+
+    forum.add_posts("1", 120)
+
+    posts = run(forum, lambda bot: bot.get_posts(forum.thread_url("1")), posts_per_page=50)
+    assert [post.number for post in posts] == list(range(120))
+    page_paths = [path for path in forum.paths("GET") if path.startswith("/viewtopic.php")]
+    assert page_paths == [
+        f"/viewtopic.php?f=1&t=1&ppp=50&start={start}" for start in (0, 50, 100)
+    ]
+
+
+def test_async_post_delay_uses_scheduler(forum):
+    "AsyncDonbot should space POSTs through the scheduler rather than sleeping"
+
+    forum.add_posts("1", 3)
+    thread = forum.thread_url("1")
+    scheduler = RequestScheduler(get_rate=math.inf, post_rate=math.inf)
+
+    async def operation(bot):
+        started = time.monotonic()
+        await bot.make_post("hello", thread)
+        return time.monotonic() - started
+
+    elapsed = run(forum, operation, post_delay=0.2, scheduler=scheduler)
+    assert elapsed >= 0.15
+    assert scheduler._bucket(scheduler._key(forum.url, "POST")).rate == 5
@@ -0,0 +1,60 @@
+from donbot.bulk import is_thread_page_url, iter_page_files, parse_pages
+from donbot.cache import PageCache
+
+
+def test_parse_cached_pages_in_thread_order(forum, tmp_path):
+    "Pages saved by the cache should parse across processes into posts in thread order"
+
+    forum.add_posts("1", 120)
+    forum.add_posts("2", 60)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path)))
+    expected = bot.get_posts(forum.thread_url("1")) + bot.get_posts(forum.thread_url("2"))
+
+    posts = list(parse_pages(str(tmp_path), max_workers=2, pages_per_chunk=2))
+    assert [(post.thread, post.number) for post in posts] == [
+        (post_thread, number)
+        for post_thread, count in (("1", 120), ("2", 60))
+        for number in range(count)
+    ]
+    assert [(post.id, post.content) for post in posts] == [
+        (post.id, post.content) for post in expected
+    ]
+
+
+def test_parse_page_iterator_in_process(forum, tmp_path):
+    "An iterator of raw pages should parse in order, without a pool for one worker"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path)))
+    bot.get_posts(forum.thread_url("1"))
+
+    pages = list(iter_page_files(str(tmp_path)))
+    posts = list(parse_pages(reversed(pages), max_workers=1, text_only=True))
+    assert [post.number for post in posts] == [*range(50, 60), *range(25, 50), *range(25)]
+    assert posts[-1].content == "post 24 by alice"
+
+
+def test_overlapping_cached_pages_parse_once(forum, tmp_path):
+    "Bare thread URLs, print views and overlapping page layouts should yield each post once"
+
+    forum.add_posts("1", 60)
+    cache = PageCache(str(tmp_path))
+    narrow = forum.make_bot(cache=cache)
+    narrow.count_posts(forum.thread_url("1"))
+    narrow.get_posts(forum.thread_url("1"))
+    forum.make_bot(cache=cache, posts_per_page=50).get_posts(forum.thread_url("1"))
+    forum.make_bot(cache=cache, print_view=True).get_posts(forum.thread_url("1"))
+
+    posts = list(parse_pages(str(tmp_path), max_workers=1))
+    assert [post.number for post in posts] == list(range(60))
+
+
+def test_is_thread_page_url():
+    "Only explicitly paged views of a whole thread should count as thread pages"
+
+    thread = "https://forum.mafiascum.net/viewtopic.php?f=5&t=1"
+    assert is_thread_page_url(f"{thread}&start=0")
+    assert is_thread_page_url(f"{thread}&ppp=50&start=50")
+    assert not is_thread_page_url(thread)
+    assert not is_thread_page_url(f"{thread}&view=print&ppp=25&start=0")
+    assert not is_thread_page_url(f"{thread}&ppp=25&user_select%5B%5D=3&start=0")
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+
+def test_concurrent_reads_share_one_request(forum):
+    "Concurrent reads of the same page should send a single request"
+
+    forum.add_posts("1", 30)
+    forum.latency = 0.2
+    bot = forum.make_bot()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        counts = list(executor.map(bot.count_posts, [forum.thread_url("1")] * 4))
+    assert counts == [30] * 4
+    assert len(forum.paths("GET")) == 1
+    assert bot.stats()["requests"]["thread"]["coalesced"] == 3
+
+
+def test_sequential_reads_are_not_shared(forum):
+    "A read made after an identical one has finished should send its own request"
+
+    forum.add_posts("1", 30)
+    bot = forum.make_bot()
+
+    bot.count_posts(forum.thread_url("1"))
+    forum.add_posts("1", 1)
+    assert bot.count_posts(forum.thread_url("1")) == 31
+    assert len(forum.paths("GET")) == 2
+
+
+def test_errors_reach_every_waiting_caller(forum):
+    "A failed shared request should raise in every caller waiting on it"
+
+    bot = forum.make_bot()
+    attempts = []
+
+    def failing_get(url, **kwargs):
+        attempts.append(url)
+        time.sleep(0.2)
+        raise requests.ConnectionError()
+
+    bot.session.get = failing_get
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(bot.count_posts, forum.thread_url("1")) for _ in range(3)]
+    for future in futures:
+        with pytest.raises(requests.ConnectionError):
+            future.result()
+    assert len(attempts) == 1
+
+
+def test_form_pages_are_not_shared(forum):
+    "Concurrent fetches of a form page should each get their own copy of its tokens"
+
+    forum.latency = 0.2
+    bot = forum.make_bot()
+    bot.login("tester", "password")
+    forum.requests.clear()
+
+    compose_url = f"{forum.url}/ucp.php?i=pm&mode=compose"
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: bot._get_html(compose_url, login=True), range(3)))
+    assert len(forum.paths("GET")) == 3
+    assert bot.stats()["requests"]["ucp"]["coalesced"] == 0
@@ -0,0 +1,64 @@
+import time
+
+from donbot.concurrency import MAX_CONCURRENT_REQUESTS
+
+
+def test_parallel_get_posts_keeps_thread_order(forum):
+    "Posts fetched in parallel should come back in thread order"
+
+    forum.add_posts("1", 260)
+    bot = forum.make_bot(max_workers=4)
+
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in posts] == list(range(260))
+
+
+def test_parallel_get_posts_respects_range(forum):
+    "Parallel reads should still filter to the requested post range"
+
+    forum.add_posts("1", 120)
+    bot = forum.make_bot()
+
+    posts = bot.get_posts(forum.thread_url("1"), 30, 80, max_workers=3)
+    assert [post.number for post in posts] == list(range(30, 81))
+
+
+def test_parallel_get_posts_is_faster_than_serial(forum):
+    "Fetching pages in parallel should cut wall-clock time roughly by the concurrency factor"
+
+    forum.add_posts("1", 200)
+    forum.latency = 0.05
+    bot = forum.make_bot()
+
+    started = time.perf_counter()
+    serial_posts = bot.get_posts(forum.thread_url("1"), max_workers=1)
+    serial_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    parallel_posts = bot.get_posts(forum.thread_url("1"), max_workers=4)
+    parallel_time = time.perf_counter() - started
+
+    assert parallel_posts == serial_posts
+    assert parallel_time < serial_time / 2
+
+
+def test_parallel_reads_share_global_limit(forum):
+    "No more than MAX_CONCURRENT_REQUESTS pages should be in flight at once"
+
+    forum.add_posts("1", 300)
+    forum.latency = 0.02
+    bot = forum.make_bot()
+
+    bot.get_posts(forum.thread_url("1"), max_workers=16)
+    assert forum.max_in_flight <= MAX_CONCURRENT_REQUESTS
+
+
+def test_parallel_get_user_posts(forum):
+    "Parallel iso reads should return only the user's posts, in order"
+
+    forum.add_posts("1", 90, users=("alice", "bob", "carol"))
+    bot = forum.make_bot(max_workers=4)
+
+    posts = bot.get_user_posts(forum.thread_url("1"), "bob")
+    assert [post.number for post in posts] == list(range(1, 90, 3))
+    assert {post.user for post in posts} == {"bob"}
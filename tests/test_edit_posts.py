@@ -0,0 +1,88 @@
+import pytest
+
+from donbot.resolver import PostIdCache
+
+
+def logged_in_bot(forum, **kwargs):
+    bot = forum.make_bot(**kwargs)
+    bot.login("tester", "password")
+    forum.requests.clear()
+    return bot
+
+
+def test_post_id_cache_persists(tmp_path):
+    "Post ids saved by one cache should be loaded by the next"
+
+    path = str(tmp_path / "post_ids.json")
+    first, second = PostIdCache(path), PostIdCache(path)
+    first.add("1", 26, "1027")
+    first.save()
+    second.add("1", 27, "1028")
+    second.save()
+
+    cache = PostIdCache(path)
+    assert cache.get("1", 26) == "1027"
+    assert cache.get("1", 27) == "1028"
+    assert cache.get("2", 26) is None
+
+
+def test_edit_known_post_skips_lookup(forum):
+    "Editing a post whose id is cached should need just the form and the submission"
+
+    forum.add_posts("1", 30)
+    bot = logged_in_bot(forum)
+    bot.edit_post(26, "first", forum.thread_url("1"))
+    forum.requests.clear()
+
+    bot.edit_post(26, "votecount", forum.thread_url("1"))
+    assert forum.threads["1"][26].content == "votecount"
+    assert forum.paths("GET") == [f"/posting.php?mode=edit&p={forum.threads['1'][26].id}"]
+    assert len(forum.paths("POST")) == 1
+
+
+def test_post_ids_are_learned_from_reads(forum, tmp_path):
+    "Posts read from a thread should be editable without a lookup, across instances"
+
+    forum.add_posts("1", 30)
+    path = str(tmp_path / "post_ids.json")
+    forum.make_bot(post_ids=PostIdCache(path)).get_posts(forum.thread_url("1"))
+
+    bot = logged_in_bot(forum, post_ids=PostIdCache(path))
+    bot.edit_post(3, "edited", forum.thread_url("1"))
+    assert forum.threads["1"][3].content == "edited"
+    assert len(forum.paths("GET")) == 1
+
+
+def test_edit_post_by_id(forum):
+    "A post should be editable by its id alone"
+
+    forum.add_posts("1", 5)
+    bot = logged_in_bot(forum)
+
+    bot.edit_post_by_id(forum.threads["1"][2].id, "by id")
+    assert forum.threads["1"][2].content == "by id"
+    assert len(forum.requests) == 2
+
+
+def test_edit_posts_batches_lookups(forum):
+    "A batch of edits should read each page once and then edit every post"
+
+    forum.add_posts("1", 60)
+    bot = logged_in_bot(forum)
+
+    bot.edit_posts({2: "a", 30: "b", 31: "c", 55: "d"}, forum.thread_url("1"))
+    assert [forum.threads["1"][n].content for n in (2, 30, 31, 55)] == ["a", "b", "c", "d"]
+    thread_reads = [path for path in forum.paths("GET") if path.startswith("/viewtopic.php")]
+    assert len(thread_reads) == 3
+    assert len(forum.paths("POST")) == 4
+
+
+def test_edit_posts_rejects_missing_posts(forum):
+    "Editing a post number past the end of the thread should fail before any edit"
+
+    forum.add_posts("1", 10)
+    bot = logged_in_bot(forum)
+
+    with pytest.raises(ValueError):
+        bot.edit_posts({2: "a", 40: "b"}, forum.thread_url("1"))
+    assert forum.paths("POST") == []
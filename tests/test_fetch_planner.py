@@ -0,0 +1,78 @@
+from donbot.operations import get_page_start, plan_thread_page_urls
+
+
+def test_get_page_start():
+    "Posts should map to the start offset of the page that holds them"
+
+    assert get_page_start(0) == 0
+    assert get_page_start(24) == 0
+    assert get_page_start(25) == 25
+    assert get_page_start(99, posts_per_page=50) == 50
+
+
+def test_plan_sparse_numbers():
+    "A sparse set of posts should map to one request per distinct page"
+
+    thread = "https://forum.mafiascum.net/viewtopic.php?t=1"
+    assert plan_thread_page_urls(thread, [130, 3, 24, 260, 131]) == [
+        f"{thread}&start=0",
+        f"{thread}&start=125",
+        f"{thread}&start=250",
+    ]
+
+
+def test_get_posts_reuses_first_page(forum):
+    "get_posts should not download the thread's base page in addition to its first page"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot()
+
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert len(posts) == 60
+    assert len(forum.paths("GET")) == 3
+
+
+def test_get_posts_from_later_page(forum):
+    "A read starting mid-thread should begin at the page holding the first post"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot()
+
+    posts = bot.get_posts(forum.thread_url("1"), 30, 40)
+    assert [post.number for post in posts] == list(range(30, 41))
+    assert forum.paths("GET") == ["/viewtopic.php?f=1&t=1&start=25"]
+
+
+def test_get_post_is_one_request(forum):
+    "get_post should download only the page holding the post"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot()
+
+    assert bot.get_post(24, forum.thread_url("1")).number == 24
+    assert forum.paths("GET") == ["/viewtopic.php?f=1&t=1&start=0"]
+
+
+def test_get_posts_by_numbers(forum):
+    "Sparse post numbers should be retrieved with one request per page, in thread order"
+
+    forum.add_posts("1", 200)
+    bot = forum.make_bot()
+
+    posts = bot.get_posts_by_numbers(forum.thread_url("1"), [150, 3, 7, 199, 160])
+    assert [post.number for post in posts] == [3, 7, 150, 160, 199]
+    assert len(forum.paths("GET")) == 3
+
+
+def test_edit_post_requests(forum):
+    "edit_post should need one page read, one form read and one submission"
+
+    forum.add_posts("1", 30)
+    bot = forum.make_bot()
+    bot.login("tester", "password")
+    forum.requests.clear()
+
+    bot.edit_post(26, "edited", forum.thread_url("1"))
+    assert forum.threads["1"][26].content == "edited"
+    assert len(forum.paths("GET")) == 2
+    assert len(forum.paths("POST")) == 1
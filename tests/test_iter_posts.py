@@ -0,0 +1,58 @@
+import time
+
+
+def test_iter_posts_yields_thread_in_order(forum):
+    "iter_posts should yield the same posts as get_posts"
+
+    forum.add_posts("1", 130)
+    bot = forum.make_bot()
+
+    assert list(bot.iter_posts(forum.thread_url("1"))) == bot.get_posts(forum.thread_url("1"))
+
+
+def test_iter_posts_respects_range(forum):
+    "iter_posts should only yield posts within the requested range"
+
+    forum.add_posts("1", 130)
+    bot = forum.make_bot()
+
+    posts = list(bot.iter_posts(forum.thread_url("1"), 20, 70))
+    assert [post.number for post in posts] == list(range(20, 71))
+    assert len(forum.paths("GET")) == 3
+
+
+def test_iter_posts_reads_ahead(forum):
+    "The next page should be requested while the caller consumes the current one"
+
+    forum.add_posts("1", 130)
+    bot = forum.make_bot()
+
+    posts = bot.iter_posts(forum.thread_url("1"))
+    assert next(posts).number == 0
+    time.sleep(0.2)
+    assert len(forum.paths("GET")) == 2
+    posts.close()
+
+
+def test_iter_posts_stops_fetching_when_caller_stops(forum):
+    "No further pages should be requested once the caller stops iterating"
+
+    forum.add_posts("1", 500)
+    bot = forum.make_bot()
+
+    for post in bot.iter_posts(forum.thread_url("1")):
+        if post.number == 30:
+            break
+    time.sleep(0.2)
+    assert len(forum.paths("GET")) <= 3
+
+
+def test_iter_posts_in_print_view(forum):
+    "iter_posts should also page through the printable view"
+
+    forum.add_posts("1", 120)
+    bot = forum.make_bot(posts_per_page=50, print_view=True)
+
+    posts = list(bot.iter_posts(forum.thread_url("1")))
+    assert [post.number for post in posts] == list(range(120))
+    assert len(forum.paths("GET")) == 3
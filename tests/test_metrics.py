@@ -0,0 +1,87 @@
+import math
+
+import pytest
+import requests
+
+from donbot.metrics import Metrics, ParseEvent, RequestEvent, get_endpoint
+
+
+def test_get_endpoint():
+    "URLs should be grouped by the kind of forum endpoint"
+
+    forum_url = "https://forum.mafiascum.net"
+    assert get_endpoint(f"{forum_url}/viewtopic.php?t=1&start=25") == "thread"
+    assert get_endpoint(f"{forum_url}/search.php?author=x") == "search"
+    assert get_endpoint(f"{forum_url}/posting.php?mode=reply&t=1") == "posting"
+    assert get_endpoint(f"{forum_url}/ucp.php?i=pm&mode=compose") == "ucp"
+    assert get_endpoint(f"{forum_url}/app.php/activity_overview/1") == "activity"
+    assert get_endpoint(f"{forum_url}/index.php") == "other"
+
+
+def test_latency_histogram():
+    "Request latencies should be counted in the bucket bounding them"
+
+    metrics = Metrics()
+    for latency in (0.01, 0.07, 0.07, 30.0):
+        metrics.record_request(RequestEvent("GET", "", "thread", 200, 10, latency, 0.0))
+
+    counters = metrics.stats()["requests"]["thread"]
+    assert counters["count"] == 4
+    assert counters["bytes"] == 40
+    assert counters["latency_histogram"][0.05] == 1
+    assert counters["latency_histogram"][0.1] == 2
+    assert counters["latency_histogram"][math.inf] == 1
+    assert counters["statuses"] == {200: 4}
+
+
+def test_bot_records_requests_and_parsing(forum):
+    "A thread read should be counted per endpoint and per parsing step"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot()
+    bot.get_posts(forum.thread_url("1"))
+
+    stats = bot.stats()
+    assert stats["requests"]["thread"]["count"] == 3
+    assert stats["requests"]["thread"]["statuses"] == {200: 3}
+    assert stats["requests"]["thread"]["bytes"] > 0
+    assert stats["parsing"]["string_to_html"]["count"] == 3
+    assert stats["parsing"]["get_posts"]["count"] == 3
+    assert stats["parsing"]["count_posts"]["count"] == 1
+
+
+def test_bot_records_failed_requests(forum):
+    "A request that gets no response should still be counted, with no status"
+
+    forum.add_posts("1", 10)
+    forum.latency = 0.5
+    bot = forum.make_bot(timeout=(1.0, 0.1), retries=0)
+
+    with pytest.raises(requests.RequestException):
+        bot.count_posts(forum.thread_url("1"))
+    counters = bot.stats()["requests"]["thread"]
+    assert counters["count"] == 1
+    assert counters["statuses"] == {None: 1}
+    assert counters["latency"] >= 0.1
+
+
+def test_hooks_receive_every_event(forum):
+    "Hooks should be passed each request and parsing step as it happens"
+
+    events = []
+    metrics = Metrics(hooks=[events.append])
+    forum.add_posts("1", 3)
+    bot = forum.make_bot(metrics=metrics)
+    bot.make_post("hello", forum.thread_url("1"))
+
+    requests = [event for event in events if isinstance(event, RequestEvent)]
+    assert [(event.method, event.endpoint) for event in requests] == [
+        ("GET", "other"),
+        ("POST", "ucp"),
+        ("GET", "posting"),
+        ("POST", "posting"),
+    ]
+    assert any(
+        isinstance(event, ParseEvent) and event.operation == "make_submit_post_form"
+        for event in events
+    )
@@ -0,0 +1,80 @@
+import os
+import time
+
+from donbot.cache import PageCache, normalize_url
+
+
+def test_normalize_url():
+    "Equivalent URLs should share one cache key"
+
+    assert normalize_url("HTTPS://Forum.mafiascum.net/viewtopic.php?t=5&f=1&sid=abc#p9") == (
+        normalize_url("https://forum.mafiascum.net/viewtopic.php?f=1&t=5")
+    )
+
+
+def test_full_pages_are_served_from_cache(forum, tmp_path):
+    "A second read should only request pages that were not full the first time"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path), partial_page_ttl=0))
+
+    first = bot.get_posts(forum.thread_url("1"))
+    forum.requests.clear()
+    second = bot.get_posts(forum.thread_url("1"))
+
+    assert first == second
+    assert forum.paths("GET") == ["/viewtopic.php?f=1&t=1&start=50"]
+
+
+def test_cached_first_page_does_not_hide_new_posts(forum, tmp_path):
+    "A stale post count on a cached first page should not cut off new pages"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path), partial_page_ttl=0))
+    bot.get_posts(forum.thread_url("1"))
+
+    forum.add_posts("1", 50)
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in posts] == list(range(110))
+
+
+def test_stale_pages_are_revalidated(forum, tmp_path):
+    "Stale entries should be revalidated with a conditional GET"
+
+    forum.add_posts("1", 10)
+    forum.etags = True
+    bot = forum.make_bot(cache=PageCache(str(tmp_path), partial_page_ttl=0))
+
+    first = bot.get_posts(forum.thread_url("1"))
+    second = bot.get_posts(forum.thread_url("1"))
+
+    assert first == second
+    assert len(forum.paths("GET")) == 2
+    assert forum.not_modified == 1
+
+
+def test_partial_pages_expire(forum, tmp_path):
+    "The trailing partial page should be refetched once it goes stale"
+
+    forum.add_posts("1", 10)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path), partial_page_ttl=0.05))
+
+    bot.get_posts(forum.thread_url("1"))
+    assert len(bot.get_posts(forum.thread_url("1"))) == 10
+    forum.add_posts("1", 5)
+    time.sleep(0.1)
+    assert len(bot.get_posts(forum.thread_url("1"))) == 15
+
+
+def test_eviction_bounds_cache_size(tmp_path):
+    "Eviction should drop least recently used entries until the cache fits"
+
+    cache = PageCache(str(tmp_path), max_bytes=5000)
+    for i in range(20):
+        cache.set(f"key{i}", {"expires": 0}, b"x" * 1000)
+        os.utime(cache._path(f"key{i}"), (i, i))
+    cache.evict()
+
+    assert sum(entry.stat().st_size for entry in os.scandir(tmp_path)) <= 5000
+    assert cache.get("key19") is not None
+    assert cache.get("key0") is None
@@ -0,0 +1,138 @@
+import pickle
+
+import pytest
+
+from donbot.operations import Post, count_posts, get_page_location, get_posts, string_to_html
+from donbot.cache import PageCache
+from donbot.streaming import StreamingPageParser
+
+page_url = "https://forum.mafiascum.net/viewtopic.php?f=5&t=76109&start=25"
+
+page = """<html><body>
+<div class="pagination">
+27 posts
+</div>
+<div class="postbody"><div id="post_content9001">
+<h3 class="first"><a href="#p9001">Re: Test thread</a></h3>
+<p class="author modified"><a href="./viewtopic.php?p=9001#p9001"><span>Post</span></a>
+<span class="post-number-bolded">#25</span> by <strong><a href="./memberlist.php?mode=viewprofile&amp;u=15830" class="username-coloured">Psyche</a></strong> » Mon Apr 30, 2018 6:44 pm</p>
+<div class="content">I <b>vote</b>: <a href="./memberlist.php?u=1" class="username">someone</a></div>
+</div></div>
+<div class="postbody"><div id="post_content9002">
+<h3><a href="#p9002">Re: Test thread</a></h3>
+<p class="author modified"><span class="post-number-bolded">#26</span> by <strong><a href="./memberlist.php?mode=viewprofile&amp;u=2" class="username">bob</a></strong> » Mon Apr 30, 2018 7:00 pm</p>
+<div class="content">hi</div>
+</div></div>
+</body></html>"""
+
+
+def test_parse_thread_page():
+    "A thread page should yield its post count and every field of its posts"
+
+    thread_page_html = string_to_html(page)
+    posts = get_posts(thread_page_html, page_url=page_url)
+    assert count_posts(thread_page_html) == 27
+    assert posts[0] == Post(
+        number=25,
+        id="9001",
+        user="Psyche",
+        user_id="15830",
+        content='I <b>vote</b>: <a href="./memberlist.php?u=1" class="username">someone</a>',
+        time="Mon Apr 30, 2018 6:44 pm",
+        page=page_url,
+        forum="5",
+        thread="76109",
+    )
+    assert [post.user for post in posts] == ["Psyche", "bob"]
+
+
+def test_get_posts_filters_by_number():
+    "get_posts should keep only the posts in the requested range"
+
+    posts = get_posts(string_to_html(page), start=26, page_url=page_url)
+    assert [(post.number, post.id, post.time) for post in posts] == [
+        (26, "9002", "Mon Apr 30, 2018 7:00 pm")
+    ]
+
+
+def test_post_missing_header_is_rejected():
+    "A post without an author line should fail to parse rather than yield a partial post"
+
+    broken = '<div class="postbody"><a href="#p1">x</a><div class="content">hi</div></div>'
+    with pytest.raises(IndexError):
+        get_posts(string_to_html(f"<html><body>{broken}</body></html>"))
+
+
+def test_lazy_content_matches_eager_content():
+    "A lazily parsed post should serialize its content on first read, matching an eager parse"
+
+    eager = get_posts(string_to_html(page), page_url=page_url)
+    lazy = get_posts(string_to_html(page), page_url=page_url, lazy=True)
+    assert [post.user for post in lazy] == ["Psyche", "bob"]
+    assert hasattr(lazy[0], "_content_html")
+    assert lazy == eager
+    assert not hasattr(lazy[0], "_content_html")
+    assert pickle.loads(pickle.dumps(lazy[1])) == eager[1]
+
+
+def test_text_only_content():
+    "Text-only parsing should give each post's content as plain text"
+
+    posts = get_posts(string_to_html(page), text_only=True, lazy=True)
+    assert [post.content for post in posts] == ["I vote: someone", "hi"]
+
+
+def test_bot_reads_text_only_content(forum):
+    "A text-only bot should return plain-text post content"
+
+    forum.add_post("1", "alice", "<b>vote</b> bob")
+    bot = forum.make_bot(text_only=True, lazy_content=True)
+
+    assert [post.content for post in bot.get_posts(forum.thread_url("1"))] == ["vote bob"]
+
+
+def test_streamed_page_matches_whole_page():
+    "Parsing a page chunk by chunk should give the same posts and count as parsing it whole"
+
+    data = page.encode("utf-8")
+    parser = StreamingPageParser(page_url)
+    posts = []
+    for offset in range(0, len(data), 50):
+        posts += parser.feed(data[offset : offset + 50])
+    posts += parser.close()
+    assert posts == get_posts(string_to_html(page), page_url=page_url)
+    assert parser.post_count == 27
+    assert not parser.is_login_page
+
+
+def test_bot_streams_pages(forum):
+    "A streaming bot should read every page of a thread, logging in for private ones"
+
+    forum.add_posts("1", 60)
+    forum.private_threads.add("1")
+    bot = forum.make_bot(stream_pages=True, max_workers=2)
+
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in posts] == list(range(60))
+    assert forum.logins == 1
+    assert posts == forum.make_bot().get_posts(forum.thread_url("1"))
+
+
+def test_bot_streams_cached_pages(forum, tmp_path):
+    "A streaming bot should read full pages from its cache without requesting them again"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot(stream_pages=True, cache=PageCache(str(tmp_path), partial_page_ttl=0))
+
+    first = bot.get_posts(forum.thread_url("1"))
+    second = bot.get_posts(forum.thread_url("1"))
+    assert first == second
+    assert sum("start=25" in path for path in forum.paths("GET")) == 1
+
+
+def test_page_location_ignores_other_parameters():
+    "A page's forum and thread should be read from its URL whatever else the URL holds"
+
+    assert get_page_location(page_url) == ("5", "76109")
+    assert get_page_location(f"{page_url[:-9]}&ppp=50&start=50") == ("5", "76109")
+    assert get_page_location("") == ("", "")
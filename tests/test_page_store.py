@@ -0,0 +1,86 @@
+import os
+
+from donbot.bulk import parse_pages
+from donbot.store import PageStore
+
+page_url = "https://forum.mafiascum.net/viewtopic.php?f=5&t=1&start=0"
+
+
+def count_objects(store: PageStore) -> int:
+    return sum(len(files) for _, _, files in os.walk(os.path.join(store.directory, "objects")))
+
+
+def test_store_deduplicates_and_compresses(tmp_path):
+    "Identical bodies should be stored once, compressed, with every fetch indexed"
+
+    store = PageStore(str(tmp_path))
+    body = b"<html><body>" + b"<p>same post</p>" * 1000 + b"</body></html>"
+    first = store.put(page_url, body, fetched_at=1.0)
+    second = store.put(page_url.replace("t=1", "t=2"), body, fetched_at=2.0)
+
+    assert first == second
+    assert count_objects(store) == 1
+    objects = os.path.join(str(tmp_path), "objects", first[:2], first[2:])
+    assert os.path.getsize(objects) < len(body) / 10
+    assert store.get(page_url) == body
+
+
+def test_store_looks_up_fetches_by_time(tmp_path):
+    "A page fetched several times should be readable as of any fetch"
+
+    store = PageStore(str(tmp_path))
+    store.put(page_url, b"old", fetched_at=1.0)
+    store.put(page_url, b"new", fetched_at=2.0)
+
+    assert store.get(page_url) == b"new"
+    assert store.get(page_url, at=1.5) == b"old"
+    assert store.get(page_url, at=0.5) is None
+    assert [fetched_at for fetched_at, _ in store.fetches(page_url)] == [1.0, 2.0]
+
+
+def test_bot_pages_reparse_from_store(forum, tmp_path):
+    "Pages a bot downloads should be archived and parse offline into the same posts"
+
+    forum.add_posts("1", 60)
+    forum.private_threads.add("2")
+    forum.add_posts("2", 5)
+    store = PageStore(str(tmp_path))
+    bot = forum.make_bot(store=store)
+    posts = bot.get_posts(forum.thread_url("1"))
+    bot.get_posts(forum.thread_url("2"))
+    requests_made = len(forum.requests)
+
+    reparsed = list(parse_pages(store.iter_pages("1"), max_workers=1))
+    assert [(post.id, post.user, post.content) for post in reparsed] == [
+        (post.id, post.user, post.content) for post in posts
+    ]
+    assert reparsed[0].thread == "1"
+    assert [url for url, _ in store.iter_pages("2")] == [f"{forum.thread_url('2')}&start=0"]
+    assert len(forum.requests) == requests_made
+
+
+def test_streaming_bot_archives_pages(forum, tmp_path):
+    "Pages a bot streams should be archived whole"
+
+    forum.add_posts("1", 60)
+    store = PageStore(str(tmp_path))
+    bot = forum.make_bot(store=store, stream_pages=True)
+    bot.get_posts(forum.thread_url("1"))
+
+    assert [url[-8:] for url, _ in store.iter_pages()] == ["&start=0", "start=25", "start=50"]
+
+
+def test_overlapping_pages_reparse_once(forum, tmp_path):
+    "A bare thread URL and pages of several layouts should reparse into each post once, in order"
+
+    forum.add_posts("1", 60)
+    store = PageStore(str(tmp_path))
+    narrow = forum.make_bot(store=store)
+    narrow.count_posts(forum.thread_url("1"))
+    narrow.get_posts(forum.thread_url("1"))
+    forum.make_bot(store=store, posts_per_page=50).get_posts(forum.thread_url("1"))
+
+    assert all("start=" in url for url, _ in store.iter_pages())
+    reparsed = list(parse_pages(store.iter_pages(), max_workers=1))
+    assert [post.number for post in reparsed] == list(range(60))
+    assert {post.thread for post in reparsed} == {"1"}
@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+from donbot.outbox import PMOutbox
+
+
+def make_outbox(forum, tmp_path, **kwargs) -> PMOutbox:
+    for user in ("alice", "bob", "carol"):
+        forum.add_user(user)
+    bot = forum.make_bot(**kwargs)
+    return PMOutbox(bot, str(tmp_path / "journal.jsonl"))
+
+
+def test_send_all_sends_every_message(forum, tmp_path):
+    "Every queued message should be sent once, in order"
+
+    outbox = make_outbox(forum, tmp_path)
+    for user in ("alice", "bob", "carol"):
+        outbox.add(user, "Role", f"{user}, you are town")
+
+    assert len(outbox.send_all()) == 3
+    assert [pm["message"] for pm in forum.pms] == [
+        "alice, you are town",
+        "bob, you are town",
+        "carol, you are town",
+    ]
+    assert "address_list[u][3]" in forum.pms[1]
+
+
+def test_recipients_are_resolved_up_front(forum, tmp_path):
+    "Recipients should be resolved before the first message is sent"
+
+    outbox = make_outbox(forum, tmp_path)
+    outbox.add(["alice", "bob"], "Scum chat", "hi")
+    outbox.add(["bob", "carol"], "Masons", "hello")
+    outbox.send_all()
+
+    searches = [i for i, (_, path) in enumerate(forum.requests) if "search.php" in path]
+    first_post = next(i for i, (method, _) in enumerate(forum.requests) if method == "POST")
+    assert len(searches) == 3
+    assert max(searches) < first_post
+
+
+def test_compose_pages_are_prefetched(forum, tmp_path):
+    "Compose pages for upcoming messages should be fetched before earlier ones are posted"
+
+    outbox = make_outbox(forum, tmp_path, post_delay=0.05)
+    for i in range(4):
+        outbox.add("alice", "Role", f"message {i}")
+    outbox.send_all(prefetch=2)
+
+    methods = [method for method, path in forum.requests if "mode=compose" in path]
+    assert methods[:3] == ["GET", "GET", "GET"]
+    assert methods.count("POST") == 4
+
+
+def test_resume_skips_sent_messages(forum, tmp_path):
+    "A rerun after a failure should send only the messages not yet delivered"
+
+    forum.max_pms = 2
+    outbox = make_outbox(forum, tmp_path)
+    for user in ("alice", "bob", "carol"):
+        outbox.add(user, "Role", f"{user}, you are town")
+    with pytest.raises(requests.HTTPError):
+        outbox.send_all()
+    assert len(outbox.sent) == 2
+
+    forum.max_pms = float("inf")
+    resumed = PMOutbox(outbox.bot, outbox.journal_path)
+    for user in ("alice", "bob", "carol"):
+        resumed.add(user, "Role", f"{user}, you are town")
+    assert len(resumed.send_all()) == 1
+    assert [pm["message"] for pm in forum.pms] == [
+        "alice, you are town",
+        "bob, you are town",
+        "carol, you are town",
+    ]
+
+
+def test_uncertain_messages_are_not_resent(forum, tmp_path):
+    "Messages attempted without confirmation should only be resent on request"
+
+    outbox = make_outbox(forum, tmp_path)
+    key = outbox.add("alice", "Role", "you are town")
+    outbox._journal(key, "attempted")
+
+    resumed = PMOutbox(outbox.bot, outbox.journal_path)
+    resumed.add("alice", "Role", "you are town")
+    assert resumed.uncertain == [key]
+    assert resumed.send_all() == []
+    assert resumed.send_all(resend_uncertain=True) == [key]
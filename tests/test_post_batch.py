@@ -0,0 +1,52 @@
+import pickle
+
+from donbot.batch import PostBatch
+from donbot.operations import Post
+
+
+def make_posts(count: int, id: bool = True) -> list[Post]:
+    return [
+        Post(
+            number=n,
+            id=str(9000 + n) if id else "",
+            user=f"user{n % 3}",
+            user_id=str(n % 3 + 1),
+            content=f"post {n}",
+            time="Sat Aug 22, 2020 1:00 pm",
+            page=f"https://forum.mafiascum.net/viewtopic.php?f=5&t=1&start={n // 25 * 25}",
+            forum="5",
+            thread="1",
+        )
+        for n in range(count)
+    ]
+
+
+def test_batch_round_trips_posts():
+    "A batch should give back exactly the posts it was built from"
+
+    posts = make_posts(60)
+    batch = PostBatch(posts)
+    assert len(batch) == 60
+    assert batch.to_posts() == posts
+    assert batch[-1] == posts[-1]
+    assert batch[10:20].to_posts() == posts[10:20]
+    assert PostBatch(make_posts(3, id=False)).to_posts() == make_posts(3, id=False)
+
+
+def test_batch_encodes_repeated_values_once():
+    "Authors and pages shared by many posts should be stored once each"
+
+    batch = PostBatch(make_posts(60))
+    assert len(batch.authors) == 3
+    assert len(batch.pages) == 3
+    assert batch.users[:4] == ["user0", "user1", "user2", "user0"]
+    assert batch.user_counts() == {"user0": 20, "user1": 20, "user2": 20}
+
+
+def test_posts_are_slotted_and_interned():
+    "Posts should have no instance dict and share one copy of repeated strings"
+
+    first, second = make_posts(2)
+    assert not hasattr(first, "__dict__")
+    assert first.page is second.page
+    assert pickle.loads(pickle.dumps(first)) == first
@@ -0,0 +1,89 @@
+from donbot.operations import (
+    get_print_posts,
+    get_thread_page_urls,
+    set_posts_per_page,
+    string_to_html,
+)
+
+thread = "https://forum.mafiascum.net/viewtopic.php?t=1"
+
+
+def test_set_posts_per_page():
+    "Only a non-default page size should be added to the thread URL"
+
+    assert set_posts_per_page(thread) == thread
+    assert set_posts_per_page(thread, 200) == f"{thread}&ppp=200"
+
+
+def test_page_urls_follow_page_size():
+    "Page URLs should step by the configured page size"
+
+    page_html = string_to_html('<div class="pagination">450 posts</div>')
+    assert get_thread_page_urls(f"{thread}&ppp=200", page_html, 0, -1, 200) == [
+        f"{thread}&ppp=200&start=0",
+        f"{thread}&ppp=200&start=200",
+        f"{thread}&ppp=200&start=400",
+    ]
+
+
+def test_get_posts_with_large_pages(forum):
+    "Larger pages should cover a thread in proportionally fewer requests"
+
+    forum.add_posts("1", 450)
+    bot = forum.make_bot(posts_per_page=200)
+
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in posts] == list(range(450))
+    assert forum.paths("GET") == [
+        f"/viewtopic.php?f=1&t=1&ppp=200&start={start}" for start in (0, 200, 400)
+    ]
+
+
+def test_get_posts_range_with_large_pages(forum):
+    "Range reads should start at the large page holding the first post"
+
+    forum.add_posts("1", 450)
+    bot = forum.make_bot(posts_per_page=100)
+
+    posts = bot.get_posts(forum.thread_url("1"), 150, 260)
+    assert [post.number for post in posts] == list(range(150, 261))
+    assert len(forum.paths("GET")) == 2
+
+
+def test_get_post_and_iso_with_large_pages(forum):
+    "Single posts and isos should also follow the page size"
+
+    forum.add_posts("1", 300, users=("alice", "bob", "carol"))
+    bot = forum.make_bot(posts_per_page=100)
+
+    assert bot.get_post(250, forum.thread_url("1")).number == 250
+    assert forum.paths("GET") == ["/viewtopic.php?f=1&t=1&ppp=100&start=200"]
+    assert len(bot.get_iso_posts(forum.thread_url("1"), forum.users["carol"])) == 100
+
+
+def test_get_print_posts():
+    "Printable pages should be parsed and numbered from the page's start"
+
+    page_html = string_to_html(
+        '<html><head><meta charset="utf-8"></head><body><div class="post"><h3>Re: x</h3>'
+        '<div class="date">Posted: <strong>Sat Aug 22, 2020 7:08 pm</strong></div>'
+        '<div class="author">by <strong>alice</strong></div>'
+        '<div class="content">hello <b>world</b></div></div></body></html>'
+    )
+    [post] = get_print_posts(page_html, 50)
+    assert post.number == 50
+    assert post.user == "alice"
+    assert post.time == "Sat Aug 22, 2020 7:08 pm"
+    assert post.content == "hello <b>world</b>"
+
+
+def test_get_posts_from_print_view(forum):
+    "Print view reads should return the same posts as regular reads"
+
+    forum.add_posts("1", 230)
+    bot = forum.make_bot(posts_per_page=100, print_view=True)
+
+    posts = bot.get_posts(forum.thread_url("1"), 5, 210)
+    assert [post.number for post in posts] == list(range(5, 211))
+    assert [post.content for post in posts] == [p.content for p in forum.threads["1"][5:211]]
+    assert len(forum.paths("GET")) == 3
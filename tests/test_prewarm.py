@@ -0,0 +1,82 @@
+import time
+
+
+def wait_until_warm(bot, url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while bot.warm_forms._forms.get(url) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_warm_post_needs_only_the_post(forum):
+    "A post in a prewarmed thread should send just the POST request"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.prewarm(forum.thread_url("1"))
+    forum.requests.clear()
+
+    bot.make_post("hammer", forum.thread_url("1"))
+    assert forum.requests[0] == ("POST", "/posting.php?mode=reply&t=1")
+    assert forum.threads["1"][-1].content == "hammer"
+    bot.warm_forms.close()
+
+
+def test_warm_form_is_refreshed_after_use(forum):
+    "The form taken by a post should be fetched again in time for the next post"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.prewarm(forum.thread_url("1"))
+    reply_url = bot._get_reply_url(forum.thread_url("1"))
+
+    bot.make_post("first", forum.thread_url("1"))
+    wait_until_warm(bot, reply_url)
+    forum.requests.clear()
+    bot.make_post("second", forum.thread_url("1"))
+    assert forum.requests[0][0] == "POST"
+    assert [post.content for post in forum.threads["1"][-2:]] == ["first", "second"]
+    bot.warm_forms.close()
+
+
+def test_outdated_warm_form_is_resubmitted(forum):
+    "A warm form outdated by a newer post should be resubmitted once and post once"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.prewarm(forum.thread_url("1"), refresh_interval=60)
+    forum.add_post("1", "alice", "sneaky")
+    forum.requests.clear()
+
+    bot.make_post("hammer", forum.thread_url("1"))
+    assert [method for method, _ in forum.requests[:2]] == ["POST", "POST"]
+    assert [post.content for post in forum.threads["1"][-2:]] == ["sneaky", "hammer"]
+    bot.warm_forms.close()
+
+
+def test_warm_edit_needs_only_the_post(forum):
+    "Edits of prewarmed posts should send just the POST request"
+
+    forum.add_posts("1", 30)
+    bot = forum.make_bot()
+    bot.prewarm(forum.thread_url("1"), post_numbers=[26])
+    forum.requests.clear()
+
+    bot.edit_post(26, "votecount", forum.thread_url("1"))
+    assert forum.requests[0][0] == "POST"
+    assert forum.threads["1"][26].content == "votecount"
+    bot.warm_forms.close()
+
+
+def test_close_stops_refreshing(forum):
+    "Closing the warm forms should stop the background refreshes"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.prewarm(forum.thread_url("1"), refresh_interval=0.05)
+    bot.warm_forms.close()
+    forum.requests.clear()
+
+    time.sleep(0.2)
+    assert forum.requests == []
+    assert bot._get_reply_url(forum.thread_url("1")) not in bot.warm_forms
@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+
+from donbot.scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_WRITE,
+    RequestScheduler,
+    TokenBucket,
+    get_default_scheduler,
+)
+
+host = "https://forum.mafiascum.net/viewtopic.php?t=1"
+
+
+def test_token_bucket_refills_at_rate():
+    "A drained bucket should report the wait until its next token"
+
+    bucket = TokenBucket(rate=2, capacity=1)
+    now = bucket.updated
+    assert bucket.time_until_token(now) == 0
+    bucket.take()
+    assert math.isclose(bucket.time_until_token(now), 0.5)
+    assert bucket.time_until_token(now + 0.5) == 0
+
+
+def test_scheduler_enforces_rate():
+    "Requests beyond the burst should be spaced out at the configured rate"
+
+    scheduler = RequestScheduler(get_rate=20, get_burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        scheduler.acquire(host)
+    assert time.monotonic() - started >= 0.19
+
+
+def test_get_and_post_budgets_are_separate():
+    "A drained POST budget should not hold up GET requests"
+
+    scheduler = RequestScheduler(get_rate=math.inf, post_rate=0.1)
+    scheduler.acquire(host, "POST")
+
+    started = time.monotonic()
+    scheduler.acquire(host, "GET")
+    assert time.monotonic() - started < 0.05
+
+
+def test_hosts_have_separate_budgets():
+    "Each host should draw on its own budget"
+
+    scheduler = RequestScheduler(get_rate=0.1, get_burst=1)
+    scheduler.acquire(host)
+
+    started = time.monotonic()
+    scheduler.acquire("https://example.com/")
+    assert time.monotonic() - started < 0.05
+
+
+def test_writes_jump_ahead_of_bulk_reads():
+    "A waiting write should be admitted before bulk reads that queued earlier"
+
+    scheduler = RequestScheduler(get_rate=20, get_burst=1)
+    scheduler.acquire(host)
+    order = []
+
+    def request(name, priority):
+        scheduler.acquire(host, "GET", priority)
+        order.append(name)
+
+    readers = [
+        threading.Thread(target=request, args=(f"read{i}", PRIORITY_BULK)) for i in range(4)
+    ]
+    for reader in readers:
+        reader.start()
+    time.sleep(0.01)
+    writer = threading.Thread(target=request, args=("write", PRIORITY_WRITE))
+    writer.start()
+    for thread in readers + [writer]:
+        thread.join()
+
+    assert order.index("write") <= 1
+
+
+def test_post_delay_configures_shared_post_budget(forum):
+    "Bots sharing a scheduler should space their POSTs by the configured delay"
+
+    scheduler = RequestScheduler(get_rate=math.inf, post_rate=math.inf)
+    forum.add_posts("1", 3)
+    bots = [forum.make_bot(scheduler=scheduler, post_delay=0.1) for _ in range(2)]
+
+    started = time.monotonic()
+    for bot in bots:
+        bot.make_post("hello", forum.thread_url("1"))
+    assert time.monotonic() - started >= 0.15
+    assert len(forum.threads["1"]) == 5
+
+
+def test_post_delay_is_never_loosened(forum):
+    "A bot or call with a shorter post delay should not lift another bot's POST spacing"
+
+    scheduler = RequestScheduler(get_rate=math.inf, post_rate=math.inf)
+    forum.add_posts("1", 3)
+    strict = forum.make_bot(scheduler=scheduler, post_delay=0.2)
+    lax = forum.make_bot(scheduler=scheduler, post_delay=0)
+    lax.make_post("hello", forum.thread_url("1"), post_delay=0)
+
+    started = time.monotonic()
+    strict.make_post("hello", forum.thread_url("1"))
+    strict.make_post("hello", forum.thread_url("1"), post_delay=0)
+    assert time.monotonic() - started >= 0.35
+
+
+def test_post_delay_never_lifts_scheduler_default(forum):
+    "A bot with no post delay should still be held to the scheduler's default POST budget"
+
+    scheduler = RequestScheduler(get_rate=math.inf, post_rate=5)
+    forum.make_bot(scheduler=scheduler, post_delay=0)
+
+    started = time.monotonic()
+    scheduler.acquire(forum.url, "POST")
+    scheduler.acquire(forum.url, "POST")
+    assert time.monotonic() - started >= 0.15
+
+
+def test_post_delay_applies_to_one_call(forum):
+    "A per-call post delay should space only that call from the bot's previous POST"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.make_post("hello", forum.thread_url("1"))
+
+    started = time.monotonic()
+    bot.make_post("hello", forum.thread_url("1"), post_delay=0.2)
+    assert time.monotonic() - started >= 0.15
+    started = time.monotonic()
+    bot.make_post("hello", forum.thread_url("1"))
+    assert time.monotonic() - started < 0.15
+
+
+def test_default_scheduler_is_shared():
+    "Every Donbot should use the process-wide scheduler unless given another"
+
+    assert get_default_scheduler() is get_default_scheduler()
@@ -0,0 +1,82 @@
+import os
+import stat
+
+from donbot.cache import PageCache
+
+
+def test_no_requests_on_startup(forum):
+    "Creating a bot should not contact the forum"
+
+    forum.make_bot()
+    assert forum.requests == []
+
+
+def test_public_reads_skip_login(forum):
+    "Reading a public thread should not log in"
+
+    forum.add_posts("1", 30)
+    bot = forum.make_bot()
+
+    assert len(bot.get_posts(forum.thread_url("1"))) == 30
+    assert forum.logins == 0
+
+
+def test_logs_in_before_first_write(forum):
+    "The first post should log in once, and later posts reuse the session"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+
+    bot.make_post("first", forum.thread_url("1"))
+    bot.make_post("second", forum.thread_url("1"))
+    assert forum.logins == 1
+    assert [post.content for post in forum.threads["1"][-2:]] == ["first", "second"]
+
+
+def test_logs_in_when_page_asks(forum):
+    "A login prompt in place of a private thread should log in and retry the read"
+
+    forum.add_posts("1", 30)
+    forum.private_threads.add("1")
+    bot = forum.make_bot(max_workers=2)
+
+    assert len(bot.get_posts(forum.thread_url("1"))) == 30
+    assert forum.logins == 1
+
+
+def test_expired_session_logs_in_again(forum):
+    "An expired session should be replaced transparently"
+
+    forum.add_posts("1", 3)
+    bot = forum.make_bot()
+    bot.make_post("first", forum.thread_url("1"))
+    forum.sessions.clear()
+
+    bot.make_post("second", forum.thread_url("1"))
+    assert forum.logins == 2
+    assert forum.threads["1"][-1].content == "second"
+
+
+def test_session_is_restored_from_disk(forum, tmp_path):
+    "A saved session should let a new bot post without logging in"
+
+    forum.add_posts("1", 3)
+    session_path = str(tmp_path / "session.json")
+    forum.make_bot(session_path=session_path).make_post("first", forum.thread_url("1"))
+    assert stat.S_IMODE(os.stat(session_path).st_mode) == 0o600
+
+    bot = forum.make_bot(session_path=session_path)
+    assert bot.logged_in
+    bot.make_post("second", forum.thread_url("1"))
+    assert forum.logins == 1
+    assert forum.threads["1"][-1].content == "second"
+
+
+def test_login_prompt_is_not_cached(forum, tmp_path):
+    "A login prompt served for a cached thread page should not be stored"
+
+    forum.add_posts("1", 30)
+    forum.private_threads.add("1")
+    bot = forum.make_bot(cache=PageCache(str(tmp_path / "cache")))
+
+    assert len(bot.get_posts(forum.thread_url("1"))) == 30
@@ -0,0 +1,73 @@
+from donbot.mirror import ThreadMirror
+
+
+def make_mirror(forum, directory) -> ThreadMirror:
+    return ThreadMirror(forum.make_bot(), str(directory))
+
+
+def test_first_refresh_syncs_whole_thread(forum, tmp_path):
+    "The first refresh of a thread should store every post"
+
+    forum.add_posts("1", 80)
+    mirror = make_mirror(forum, tmp_path)
+
+    assert len(mirror.refresh(forum.thread_url("1"))) == 80
+    assert [post.number for post in mirror.posts(forum.thread_url("1"))] == list(range(80))
+    assert mirror.last_number(forum.thread_url("1")) == 79
+
+
+def test_refresh_fetches_only_new_pages(forum, tmp_path):
+    "Later refreshes should request only the last partial page and any pages after it"
+
+    forum.add_posts("1", 3000)
+    mirror = make_mirror(forum, tmp_path)
+    mirror.refresh(forum.thread_url("1"))
+
+    forum.add_posts("1", 30)
+    forum.requests.clear()
+    new_posts = mirror.refresh(forum.thread_url("1"))
+
+    assert [post.number for post in new_posts] == list(range(3000, 3030))
+    assert len(forum.paths("GET")) == 2
+    assert len(mirror.posts(forum.thread_url("1"))) == 3030
+
+
+def test_quiet_refresh_is_one_request(forum, tmp_path):
+    "Refreshing a thread without new posts should cost a single request"
+
+    forum.add_posts("1", 110)
+    mirror = make_mirror(forum, tmp_path)
+    mirror.refresh(forum.thread_url("1"))
+
+    forum.requests.clear()
+    assert mirror.refresh(forum.thread_url("1")) == []
+    assert len(forum.paths("GET")) == 1
+
+
+def test_mirror_survives_restart(forum, tmp_path):
+    "A new mirror over the same directory should pick up where the last one stopped"
+
+    forum.add_posts("1", 40)
+    make_mirror(forum, tmp_path).refresh(forum.thread_url("1"))
+    forum.add_posts("1", 5)
+
+    mirror = make_mirror(forum, tmp_path)
+    assert [post.number for post in mirror.refresh(forum.thread_url("1"))] == list(range(40, 45))
+    assert [post.number for post in mirror.posts(forum.thread_url("1"))] == list(range(45))
+
+
+def test_refresh_iso(forum, tmp_path):
+    "Iso refreshes should store a user's posts and later fetch only new ones"
+
+    forum.add_posts("1", 120, users=("alice", "bob", "carol"))
+    mirror = make_mirror(forum, tmp_path)
+    user_id = forum.users["bob"]
+
+    assert len(mirror.refresh_iso(forum.thread_url("1"), "bob")) == 40
+    forum.add_posts("1", 30, users=("alice", "bob", "carol"))
+    forum.requests.clear()
+
+    new_posts = mirror.refresh_iso(forum.thread_url("1"), user_id=user_id)
+    assert [post.number for post in new_posts] == list(range(121, 150, 3))
+    assert len(forum.paths("GET")) == 2
+    assert len(mirror.iso_posts(forum.thread_url("1"), user_id)) == 50
@@ -0,0 +1,163 @@
+import math
+import time
+
+import pytest
+
+from donbot.watcher import ThreadWatcher, WatchScheduler
+
+
+def test_first_poll_records_baseline(forum):
+    "Posts made before the watcher started should not be reported"
+
+    forum.add_posts("1", 30)
+    watcher = ThreadWatcher(forum.make_bot(), forum.thread_url("1"))
+
+    assert watcher.poll() == []
+    assert watcher.post_count == 30
+
+
+def test_poll_reports_only_new_posts(forum):
+    "A poll should pass just the new posts to the callback, using one request"
+
+    forum.add_posts("1", 30)
+    received = []
+    bot = forum.make_bot()
+    watcher = ThreadWatcher(bot, forum.thread_url("1"), received.append, post_count=30)
+    forum.add_posts("1", 3)
+
+    new_posts = watcher.poll()
+    assert [post.number for post in new_posts] == [30, 31, 32]
+    assert received == [new_posts]
+    assert forum.paths("GET") == ["/viewtopic.php?f=1&t=1&start=25"]
+
+
+def test_poll_follows_posts_past_trailing_page(forum):
+    "New posts spanning several pages should all be reported in order"
+
+    forum.add_posts("1", 20)
+    watcher = ThreadWatcher(forum.make_bot(), forum.thread_url("1"), post_count=20)
+    forum.add_posts("1", 40)
+
+    assert [post.number for post in watcher.poll()] == list(range(20, 60))
+    assert watcher.post_count == 60
+
+
+def test_quiet_threads_back_off(forum):
+    "The interval should grow while nothing is posted and reset on a new post"
+
+    forum.add_posts("1", 10)
+    watcher = ThreadWatcher(
+        forum.make_bot(), forum.thread_url("1"), post_count=10, min_interval=10, max_interval=35
+    )
+
+    intervals = []
+    for _ in range(4):
+        watcher.poll()
+        intervals.append(watcher.interval)
+    assert intervals == [20, 35, 35, 35]
+
+    forum.add_posts("1", 1)
+    watcher.poll()
+    assert watcher.interval == 10
+
+
+def test_activity_probe(forum):
+    "The activity probe should only read pages once the thread has grown"
+
+    forum.add_posts("1", 30)
+    watcher = ThreadWatcher(
+        forum.make_bot(), forum.thread_url("1"), post_count=30, probe="activity"
+    )
+
+    assert watcher.poll() == []
+    assert forum.paths("GET") == ["/app.php/activity_overview/1"]
+    forum.add_posts("1", 2)
+    assert [post.number for post in watcher.poll()] == [30, 31]
+
+
+def test_unknown_probe(forum):
+    "An unknown probe should be rejected"
+
+    with pytest.raises(ValueError):
+        ThreadWatcher(forum.make_bot(), forum.thread_url("1"), probe="rss")
+
+
+def test_scheduler_polls_busy_threads_more_often(forum):
+    "A thread with recent posts should be due sooner than a quiet one"
+
+    forum.add_posts("1", 10)
+    forum.add_posts("2", 10)
+    scheduler = WatchScheduler(forum.make_bot(), polls_per_second=math.inf)
+    busy = scheduler.watch(forum.thread_url("1"), post_count=10)
+    quiet = scheduler.watch(forum.thread_url("2"), post_count=10)
+
+    now = time.monotonic()
+    assert scheduler.run_pending(now) == 2
+    forum.add_posts("1", 5)
+    assert scheduler.run_pending(now + 900) == 2
+
+    assert busy.next_poll - (now + 900) < quiet.next_poll - (now + 900)
+    assert quiet.next_poll == now + 900 + scheduler.max_interval
+
+
+def test_scheduler_polls_new_threads_soon(forum):
+    "A newly watched thread should be polled again at the shortest interval until its rate is known"
+
+    forum.add_posts("1", 10)
+    scheduler = WatchScheduler(forum.make_bot(), polls_per_second=math.inf)
+    hot = scheduler.watch(forum.thread_url("1"))
+
+    now = time.monotonic()
+    assert scheduler.run_pending(now) == 1
+    assert hot.next_poll == now + scheduler.min_interval
+    forum.add_posts("1", 3)
+    assert scheduler.run_pending(now + scheduler.min_interval) == 1
+    assert hot.post_rate == 3 / scheduler.min_interval
+    assert hot.next_poll == now + 2 * scheduler.min_interval
+
+
+def test_scheduler_stays_within_budget(forum):
+    "No more polls should be made than the global budget allows"
+
+    for thread_id in ("1", "2", "3"):
+        forum.add_posts(thread_id, 10)
+    scheduler = WatchScheduler(forum.make_bot(), polls_per_second=1)
+    for thread_id in ("1", "2", "3"):
+        scheduler.watch(forum.thread_url(thread_id), post_count=10)
+
+    now = time.monotonic()
+    assert scheduler.run_pending(now) == 1
+    assert scheduler.run_pending(now + 1) == 1
+    assert scheduler.run_pending(now + 3) == 1
+    assert len(forum.paths("GET")) == 3
+
+
+def test_scheduler_boosts_deadlines_and_page_boundaries(forum):
+    "Threads near a deadline or the start of a new page should be polled sooner"
+
+    forum.add_posts("1", 10)
+    forum.add_posts("2", 10)
+    forum.add_posts("3", 24)
+    scheduler = WatchScheduler(forum.make_bot(), polls_per_second=math.inf)
+    plain = scheduler.watch(forum.thread_url("1"), post_count=10)
+    deadline = scheduler.watch(forum.thread_url("2"), post_count=10, deadline=time.time() + 600)
+    boundary = scheduler.watch(forum.thread_url("3"), post_count=24)
+
+    now = time.monotonic()
+    scheduler.run_pending(now)
+    scheduler.run_pending(now + scheduler.min_interval)
+    assert scheduler.interval(plain) == scheduler.max_interval
+    assert scheduler.interval(deadline) == scheduler.max_interval / scheduler.boost
+    assert scheduler.interval(boundary) == scheduler.max_interval / scheduler.boost
+
+
+def test_unwatched_threads_are_not_polled(forum):
+    "A thread removed from the scheduler should not be polled again"
+
+    forum.add_posts("1", 10)
+    scheduler = WatchScheduler(forum.make_bot(), polls_per_second=math.inf)
+    scheduler.watch(forum.thread_url("1"), post_count=10)
+    scheduler.unwatch(forum.thread_url("1"))
+
+    assert scheduler.run_pending() == 0
+    assert forum.requests == []
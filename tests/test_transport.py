@@ -0,0 +1,87 @@
+import time
+
+import pytest
+import requests
+
+from donbot.cache import PageCache
+from donbot.transport import IncompleteReadError, make_retry
+
+
+def test_transient_errors_are_retried(forum):
+    "A page that fails a couple of times should be retried until it loads"
+
+    forum.add_posts("1", 60)
+    forum.failures["start=25"] = 2
+    bot = forum.make_bot(max_workers=2)
+
+    posts = bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in posts] == list(range(60))
+    assert sum("start=25" in path for path in forum.paths("GET")) == 3
+
+
+def test_failed_read_keeps_posts_before_failed_page(forum):
+    "A page that keeps failing should raise with the posts before it, ready to resume"
+
+    forum.add_posts("1", 100)
+    forum.failures["start=50"] = 4
+    bot = forum.make_bot(max_workers=3, retries=0)
+
+    with pytest.raises(IncompleteReadError) as error:
+        bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in error.value.posts] == list(range(50))
+    assert error.value.resume_from == 50
+    assert sum("start=50" in path for path in forum.paths("GET")) == 2
+
+    forum.failures.clear()
+    posts = error.value.posts + bot.get_posts(forum.thread_url("1"), error.value.resume_from)
+    assert [post.number for post in posts] == list(range(100))
+
+
+def test_failed_read_past_stale_count_keeps_earlier_posts(forum, tmp_path):
+    "A failure while following a thread past a stale post count should keep every post before it"
+
+    forum.add_posts("1", 60)
+    bot = forum.make_bot(cache=PageCache(str(tmp_path), partial_page_ttl=0), retries=0)
+    bot.get_posts(forum.thread_url("1"))
+    forum.add_posts("1", 50)
+    forum.failures["start=100"] = 2
+
+    with pytest.raises(IncompleteReadError) as error:
+        bot.get_posts(forum.thread_url("1"))
+    assert [post.number for post in error.value.posts] == list(range(100))
+    assert error.value.resume_from == 100
+
+
+def test_sequential_read_stops_at_failed_page(forum):
+    "A sequential read should request no pages after one that keeps failing"
+
+    forum.add_posts("1", 100)
+    forum.failures["start=25"] = 2
+    bot = forum.make_bot(retries=0)
+
+    with pytest.raises(IncompleteReadError) as error:
+        bot.get_posts(forum.thread_url("1"))
+    assert len(error.value.posts) == 25
+    assert not any("start=50" in path for path in forum.paths("GET"))
+
+
+def test_hung_request_times_out(forum):
+    "A request the forum takes too long to answer should fail instead of waiting"
+
+    forum.add_posts("1", 10)
+    forum.latency = 0.5
+    bot = forum.make_bot(timeout=(1.0, 0.1), retries=0)
+
+    started = time.monotonic()
+    with pytest.raises(requests.RequestException, match="timed out"):
+        bot.count_posts(forum.thread_url("1"))
+    assert time.monotonic() - started < 0.5
+
+
+def test_only_gets_are_retried_on_error_statuses():
+    "The retry policy should retry a GET on a 503 but never resend a POST"
+
+    retry = make_retry()
+    assert retry.is_retry("GET", 503)
+    assert not retry.is_retry("GET", 404)
+    assert not retry.is_retry("POST", 503)
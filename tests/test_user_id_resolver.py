@@ -0,0 +1,83 @@
+from donbot.operations import Post
+from donbot.resolver import UserIdResolver
+
+
+def make_post(user: str, user_id: str) -> Post:
+    return Post(0, "1", user, user_id, "", "", "", "", "")
+
+
+def test_resolver_is_case_insensitive():
+    "Usernames should match regardless of case"
+
+    resolver = UserIdResolver()
+    resolver.add("Psyche", "15830")
+    assert resolver.get("psyche") == "15830"
+    assert "PSYCHE" in resolver
+
+
+def test_resolver_persists_and_merges(tmp_path):
+    "Entries saved by separate resolvers over one file should all be kept"
+
+    path = str(tmp_path / "user_ids.json")
+    first, second = UserIdResolver(path), UserIdResolver(path)
+    first.observe_posts([make_post("alice", "2")])
+    second.observe_posts([make_post("bob", "3"), make_post("carol", "")])
+
+    resolver = UserIdResolver(path)
+    assert resolver.get("alice") == "2"
+    assert resolver.get("bob") == "3"
+    assert "carol" not in resolver
+
+
+def test_get_user_id_searches_once(forum):
+    "A username should only be searched for the first time it is looked up"
+
+    forum.add_user("alice")
+    bot = forum.make_bot()
+
+    assert bot.get_user_id("alice") == bot.get_user_id("Alice") == "2"
+    assert len(forum.paths("GET")) == 1
+
+
+def test_parsed_posts_populate_resolver(forum):
+    "Authors of parsed posts should resolve without a search"
+
+    forum.add_posts("1", 10, users=("alice", "bob"))
+    bot = forum.make_bot()
+    bot.get_posts(forum.thread_url("1"))
+    forum.requests.clear()
+
+    assert bot.resolve_user_ids(["alice", "bob"]) == {"alice": "2", "bob": "3"}
+    assert forum.paths("GET") == []
+
+
+def test_resolve_user_ids_only_searches_unknown_names(forum, tmp_path):
+    "Bulk resolution should search only for names never seen before"
+
+    for user in ("alice", "bob", "carol", "dave"):
+        forum.add_user(user)
+    resolver = UserIdResolver(str(tmp_path / "user_ids.json"))
+    resolver.add("alice", "2")
+    bot = forum.make_bot(user_ids=resolver, max_workers=3)
+
+    assert bot.resolve_user_ids(["alice", "bob", "carol", "dave", "bob"]) == {
+        "alice": "2",
+        "bob": "3",
+        "carol": "4",
+        "dave": "5",
+    }
+    assert len(forum.paths("GET")) == 3
+    assert UserIdResolver(resolver.path).get("dave") == "5"
+
+
+def test_send_pm_uses_resolver(forum):
+    "Sending a PM to known users should not search for them"
+
+    forum.add_posts("1", 4, users=("alice", "bob"))
+    bot = forum.make_bot()
+    bot.get_posts(forum.thread_url("1"))
+    forum.requests.clear()
+
+    bot.send_pm(["alice", "bob"], "Role", "you are town")
+    assert not any(path.startswith("/search.php") for path in forum.paths("GET"))
+    assert "address_list[u][3]" in forum.pms[0]